@@ -39,7 +39,7 @@ class Anthropic_Chat(VannaBase):
     def assistant_message(self, message: str) -> any:
         return {"role": "assistant", "content": message}
 
-    def submit_prompt(self, prompt, **kwargs) -> str:
+    def _get_message_kwargs(self, prompt) -> dict:
         if prompt is None:
             raise Exception("Prompt is None")
 
@@ -52,27 +52,50 @@ class Anthropic_Chat(VannaBase):
         for message in prompt:
             num_tokens += len(message["content"]) / 4
 
-        if self.config is not None and "model" in self.config:
-            print(
-                f"Using model {self.config['model']} for {num_tokens} tokens (approx)"
-            )
-            # claude required system message is a single filed
-            # https://docs.anthropic.com/claude/reference/messages_post
-            system_message = ''
-            no_system_prompt = []
-            for prompt_message in prompt:
-                role = prompt_message['role']
-                if role == 'system':
-                    system_message = prompt_message['content']
-                else:
-                    no_system_prompt.append({"role": role, "content": prompt_message['content']})
-
-            response = self.client.messages.create(
-                model=self.config["model"],
-                messages=no_system_prompt,
-                system=system_message,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
+        if self.config is None or "model" not in self.config:
+            raise Exception("config must contain an Anthropic model")
+
+        print(
+            f"Using model {self.config['model']} for {num_tokens} tokens (approx)"
+        )
+        # claude required system message is a single filed
+        # https://docs.anthropic.com/claude/reference/messages_post
+        system_message = ''
+        no_system_prompt = []
+        for prompt_message in prompt:
+            role = prompt_message['role']
+            if role == 'system':
+                system_message = prompt_message['content']
+            else:
+                no_system_prompt.append({"role": role, "content": prompt_message['content']})
+
+        return dict(
+            model=self.config["model"],
+            messages=no_system_prompt,
+            system=system_message,
+            max_tokens=self.max_tokens,
+            temperature=self.temperature,
+        )
+
+    def submit_prompt(self, prompt, **kwargs) -> str:
+        response = self.client.messages.create(**self._get_message_kwargs(prompt))
+
+        return response.content[0].text
+
+    def _get_async_client(self):
+        if getattr(self, "async_client", None) is None and type(self.client) is anthropic.Anthropic:
+            self.async_client = anthropic.AsyncAnthropic(
+                api_key=self.client.api_key,
+                base_url=self.client.base_url,
             )
 
+        return getattr(self, "async_client", None)
+
+    async def asubmit_prompt(self, prompt, **kwargs) -> str:
+        async_client = self._get_async_client()
+        if async_client is None:
+            return await super().asubmit_prompt(prompt, **kwargs)
+
+        response = await async_client.messages.create(**self._get_message_kwargs(prompt))
+
         return response.content[0].text
@@ -1 +1,7 @@
 from .base import VannaBase
+from .connection_pool import ConnectionPool
+from .embedding_cache import EmbeddingCache
+from .reranker import CrossEncoderReranker, HybridReranker, Reranker
+from .response_cache import MemoryResponseCache, ResponseCache
+from .schema_compaction import SchemaCompactor, compact_ddl, compact_information_schema_doc
+from .token_budget import TokenBudget, TokenCounter
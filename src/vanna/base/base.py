@@ -48,14 +48,21 @@ flowchart
 
 """
 
+import asyncio
+import functools
 import json
 import os
 import re
 import sqlite3
+import threading
+import time
 import traceback
+import uuid
 from abc import ABC, abstractmethod
-from typing import List, Tuple, Union
-from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Iterator, List, Tuple, Union
+from urllib.parse import quote_plus, urlencode, urlparse
 
 import pandas as pd
 import plotly
@@ -67,6 +74,192 @@ import sqlparse
 from ..exceptions import DependencyError, ImproperlyConfigured, ValidationError
 from ..types import TrainingPlan, TrainingPlanItem
 from ..utils import validate_config_path
+from .connection_pool import ConnectionPool
+from .embedding_cache import EmbeddingCache
+from .fetch import (
+    arrow_to_df,
+    concat_chunks,
+    fetch_df,
+    iter_arrow_batches,
+    iter_fetch,
+    limit_chunks,
+)
+from .reranker import CrossEncoderReranker, HybridReranker, Reranker
+from .schema_compaction import SchemaCompactor
+from .token_budget import (
+    DEFAULT_EXAMPLES_SHARE,
+    TokenBudget,
+    TokenCounter,
+    resolve_token_counter,
+    section_limits,
+)
+from .response_cache import MemoryResponseCache, split_prompt
+
+
+class _SharedEmbedding:
+    """
+    Holds the embedding of a question while the retrieval lookups run, so that the first
+    lookup to need it computes it and the others wait for that result.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.embedding = None
+
+
+def _embedding_hook(generate_embedding):
+    @functools.wraps(generate_embedding)
+    def wrapper(self, data, **kwargs):
+        if not isinstance(data, str):
+            return generate_embedding(self, data, **kwargs)
+
+        embedding_cache = getattr(self, "embedding_cache", None)
+        if embedding_cache is not None:
+            model_name = self._embedding_model_name()
+            embedding = embedding_cache.get(model_name, data)
+            if embedding is not None:
+                return embedding
+
+        shared = getattr(self, "_shared_embeddings", {}).get(data)
+        if shared is None:
+            embedding = generate_embedding(self, data, **kwargs)
+        else:
+            with shared.lock:
+                if shared.embedding is None:
+                    shared.embedding = generate_embedding(self, data, **kwargs)
+                embedding = shared.embedding
+
+        if embedding_cache is not None and embedding is not None:
+            embedding_cache.set(model_name, data, embedding)
+
+        return embedding
+
+    wrapper._vanna_hooked = True
+    return wrapper
+
+
+def _embeddings_hook(generate_embeddings):
+    @functools.wraps(generate_embeddings)
+    def wrapper(self, data, **kwargs):
+        embedding_cache = getattr(self, "embedding_cache", None)
+        if embedding_cache is None:
+            return generate_embeddings(self, data, **kwargs)
+
+        # Only the texts that aren't cached go to the backend
+        model_name = self._embedding_model_name()
+        embeddings = [embedding_cache.get(model_name, text) for text in data]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            computed = generate_embeddings(self, [data[i] for i in missing], **kwargs)
+            for i, embedding in zip(missing, computed):
+                embeddings[i] = embedding
+                embedding_cache.set(model_name, data[i], embedding)
+
+        return embeddings
+
+    wrapper._vanna_hooked = True
+    return wrapper
+
+
+def _lookup_response(self, response_cache, prompt):
+    embedding = None
+    if response_cache.needs_embedding:
+        _, question = split_prompt(prompt)
+        if isinstance(question, str):
+            try:
+                embedding = self.generate_embedding(question)
+            except Exception as e:
+                self.log(
+                    title="Response Cache",
+                    message=f"Could not embed the question, skipping semantic lookup: {e}",
+                )
+
+    response = response_cache.get(prompt, embedding=embedding)
+    if response is not None:
+        self.log(title="Response Cache", message="Serving cached LLM response")
+
+    return response, embedding
+
+
+def _submit_prompt_hook(submit_prompt):
+    @functools.wraps(submit_prompt)
+    def wrapper(self, prompt, **kwargs):
+        response_cache = getattr(self, "response_cache", None)
+        if response_cache is None:
+            return submit_prompt(self, prompt, **kwargs)
+
+        response, embedding = _lookup_response(self, response_cache, prompt)
+        if response is not None:
+            return response
+
+        response = submit_prompt(self, prompt, **kwargs)
+        response_cache.set(prompt, response, embedding=embedding)
+
+        return response
+
+    wrapper._vanna_hooked = True
+    return wrapper
+
+
+def _submit_prompt_stream_hook(submit_prompt_stream):
+    @functools.wraps(submit_prompt_stream)
+    def wrapper(self, prompt, **kwargs):
+        response_cache = getattr(self, "response_cache", None)
+        if response_cache is None:
+            yield from submit_prompt_stream(self, prompt, **kwargs)
+            return
+
+        response, embedding = _lookup_response(self, response_cache, prompt)
+        if response is not None:
+            yield response
+            return
+
+        chunks = []
+        for chunk in submit_prompt_stream(self, prompt, **kwargs):
+            chunks.append(chunk)
+            yield chunk
+
+        response_cache.set(prompt, "".join(chunks), embedding=embedding)
+
+    wrapper._vanna_hooked = True
+    return wrapper
+
+
+def _asubmit_prompt_hook(asubmit_prompt):
+    @functools.wraps(asubmit_prompt)
+    async def wrapper(self, prompt, **kwargs):
+        response_cache = getattr(self, "response_cache", None)
+        if response_cache is None:
+            return await asubmit_prompt(self, prompt, **kwargs)
+
+        if response_cache.needs_embedding:
+            # The semantic lookup embeds the question, which may block
+            response, embedding = await asyncio.to_thread(
+                _lookup_response, self, response_cache, prompt
+            )
+        else:
+            response, embedding = _lookup_response(self, response_cache, prompt)
+
+        if response is not None:
+            return response
+
+        response = await asubmit_prompt(self, prompt, **kwargs)
+        response_cache.set(prompt, response, embedding=embedding)
+        return response
+
+    wrapper._vanna_hooked = True
+    return wrapper
+
+
+def _training_data_hook(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self._on_training_data_changed()
+        return result
+
+    wrapper._vanna_hooked = True
+    return wrapper
 
 
 class VannaBase(ABC):
@@ -76,10 +269,115 @@ class VannaBase(ABC):
 
         self.config = config
         self.run_sql_is_set = False
+        self.connection_pool = None
+        self.arrow_fetch = self.config.get("arrow_fetch", False)
+        self.fetch_chunk_size = self.config.get("fetch_chunk_size", 10000)
         self.static_documentation = ""
         self.dialect = self.config.get("dialect", "SQL")
         self.language = self.config.get("language", None)
         self.max_tokens = self.config.get("max_tokens", 14000)
+        self.prompt_section_budgets = self.config.get("prompt_section_budgets", None)
+
+        schema_compactor = self.config.get("compact_schema", False)
+        if schema_compactor is True:
+            schema_compactor = SchemaCompactor(
+                cache_size=self.config.get("compact_schema_cache_size", 4096)
+            )
+        self.schema_compactor = schema_compactor or None
+        self.parallel_retrieval = self.config.get("parallel_retrieval", False)
+        self.retrieval_timeout_sql = self.config.get(
+            "retrieval_timeout_sql", self.config.get("retrieval_timeout", None)
+        )
+        self.retrieval_timeout_ddl = self.config.get(
+            "retrieval_timeout_ddl", self.config.get("retrieval_timeout", None)
+        )
+        self.retrieval_timeout_documentation = self.config.get(
+            "retrieval_timeout_documentation", self.config.get("retrieval_timeout", None)
+        )
+        self._shared_embeddings = {}
+
+        embedding_cache = self.config.get("embedding_cache", True)
+        if embedding_cache is True:
+            embedding_cache = EmbeddingCache(
+                max_size=self.config.get("embedding_cache_size", 1024),
+                path=self.config.get("embedding_cache_path", None),
+            )
+        self.embedding_cache = embedding_cache or None
+        on_disk = getattr(self.embedding_cache, "path", None) is not None
+        if on_disk and not self.config.get("embedding_model"):
+            # The disk tier outlives the instance, so a name derived from the backend could serve
+            # another model's vectors after switching models
+            raise ValueError(
+                "Set 'embedding_model' in the config to use the on-disk embedding cache "
+                "(embedding_cache_path). Cached embeddings are keyed on it."
+            )
+
+        response_cache = self.config.get("response_cache", None)
+        if response_cache is True:
+            response_cache = MemoryResponseCache(
+                max_size=self.config.get("response_cache_size", 256),
+                ttl=self.config.get("response_cache_ttl", 3600),
+                similarity_threshold=self.config.get("response_cache_similarity_threshold", None),
+            )
+        self.response_cache = response_cache or None
+
+        # Built on first use: with two mixins, VannaBase.__init__ runs twice per instance, and the
+        # vector store only sets its n_results attributes after it
+        if not hasattr(self, "_reranker"):
+            self._reranker = None
+            self._reranker_lock = threading.Lock()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        # Route the methods every backend implements through the shared layers in VannaBase: the
+        # embedding cache and concurrent-retrieval embedding sharing, the LLM response cache, and
+        # invalidation of cached state when the training data changes.
+        hooks = {
+            "generate_embedding": _embedding_hook,
+            "generate_embeddings": _embeddings_hook,
+            "submit_prompt": _submit_prompt_hook,
+            "submit_prompt_stream": _submit_prompt_stream_hook,
+            "asubmit_prompt": _asubmit_prompt_hook,
+            "add_ddl": _training_data_hook,
+            "add_documentation": _training_data_hook,
+            "add_ddl_batch": _training_data_hook,
+            "add_documentation_batch": _training_data_hook,
+            "remove_training_data": _training_data_hook,
+        }
+        for name, hook in hooks.items():
+            method = cls.__dict__.get(name)
+            if callable(method) and not getattr(method, "_vanna_hooked", False):
+                setattr(cls, name, hook(method))
+
+    def _on_training_data_changed(self):
+        """
+        Called after `add_ddl`, `add_documentation`, their `_batch` variants or
+        `remove_training_data` changes the training set. Clears every cache whose entries depend on
+        the retrieved context.
+        """
+        response_cache = getattr(self, "response_cache", None)
+        if response_cache is not None:
+            response_cache.clear()
+
+    def _embedding_model_name(self) -> str:
+        """
+        Name of the embedding model, used to namespace the embedding cache. Set `embedding_model` in
+        the config to make it explicit; otherwise it is derived from the backend, which is only good
+        enough for the in-memory tier: the on-disk tier requires `embedding_model`.
+        """
+        for model_name in (
+            self.config.get("embedding_model"),
+            getattr(self, "fastembed_model", None),
+        ):
+            if isinstance(model_name, str):
+                return model_name
+
+        embedding_function = getattr(self, "embedding_function", None)
+        if embedding_function is not None:
+            return str(getattr(embedding_function, "model_name", type(embedding_function).__name__))
+
+        return type(self).__name__
 
     def load_prompt_from_file(self, file_path):
         with open(file_path, 'r', encoding='utf-8') as f:
@@ -105,6 +403,8 @@ class VannaBase(ABC):
 
         Uses the LLM to generate a SQL query that answers a question. It runs the following methods:
 
+        - [`get_related_context`][vanna.base.base.VannaBase.get_related_context]
+
         - [`get_similar_question_sql`][vanna.base.base.VannaBase.get_similar_question_sql]
 
         - [`get_related_ddl`][vanna.base.base.VannaBase.get_related_ddl]
@@ -123,52 +423,270 @@ class VannaBase(ABC):
         Returns:
             str: The SQL query that answers the question.
         """
-        if self.config is not None:
-            initial_prompt = self.config.get("initial_prompt", None)
-        else:
-            initial_prompt = None
-        question_sql_list = self.get_similar_question_sql(question, **kwargs)
-        ddl_list = self.get_related_ddl(question, **kwargs)
-        doc_list = self.get_related_documentation(question, **kwargs)
+        question_sql_list, ddl_list, doc_list = self._get_sql_context(question, **kwargs)
+        prompt = self._sql_prompt(question, question_sql_list, ddl_list, doc_list, **kwargs)
+        llm_response = self.submit_prompt(prompt, **kwargs)
+        self.log(title="LLM Response", message=llm_response)
+
+        intermediate_sql, message = self._intermediate_sql(llm_response, allow_llm_to_see_data)
+        if message is not None:
+            return message
+
+        if intermediate_sql is not None:
+            try:
+                df = self.run_sql(intermediate_sql)
+                prompt = self._sql_prompt(
+                    question,
+                    question_sql_list,
+                    ddl_list,
+                    doc_list,
+                    intermediate=(intermediate_sql, df),
+                    **kwargs
+                )
+                llm_response = self.submit_prompt(prompt, **kwargs)
+                self.log(title="LLM Response", message=llm_response)
+            except Exception as e:
+                return f"Error running intermediate SQL: {e}"
+
+        return self.extract_sql(llm_response)
+
+    def generate_sql_stream(self, question: str, **kwargs) -> Iterator[str]:
+        """
+        Example:
+        ```python
+        chunks = []
+        for chunk in vn.generate_sql_stream("What are the top 10 customers by sales?"):
+            print(chunk, end="")
+            chunks.append(chunk)
+        sql = vn.extract_sql("".join(chunks))
+        ```
+
+        Streaming variant of [`generate_sql`][vanna.base.base.VannaBase.generate_sql]. It retrieves
+        the context and builds the same prompt, then yields the LLM response as it is generated
+        using [`submit_prompt_stream`][vanna.base.base.VannaBase.submit_prompt_stream]. Intermediate
+        SQL is not run; pass the joined response to
+        [`extract_sql`][vanna.base.base.VannaBase.extract_sql] to get the final query.
+
+        Args:
+            question (str): The question to generate a SQL query for.
+
+        Returns:
+            Iterator[str]: Chunks of the LLM response.
+        """
+        prompt = self._sql_prompt(question, *self._get_sql_context(question, **kwargs), **kwargs)
+
+        yield from self.submit_prompt_stream(prompt, **kwargs)
+
+    def _get_sql_context(self, question: str, **kwargs) -> Tuple[list, list, list]:
+        """
+        The context of the SQL prompt:
+        [`get_related_context`][vanna.base.base.VannaBase.get_related_context] passed through
+        [`_rerank_context`][vanna.base.base.VannaBase._rerank_context]. The async path is
+        [`_aget_sql_context`][vanna.base.base.VannaBase._aget_sql_context].
+        """
+        # Build the reranker first, so the vector store already over-fetches for it
+        self.reranker
+        return self._rerank_context(question, *self.get_related_context(question, **kwargs))
+
+    def _sql_prompt(
+        self,
+        question: str,
+        question_sql_list: list,
+        ddl_list: list,
+        doc_list: list,
+        intermediate: Union[Tuple[str, pd.DataFrame], None] = None,
+        **kwargs,
+    ) -> list:
+        """
+        Build and log the SQL prompt for `generate_sql`, `generate_sql_stream` and `agenerate_sql`.
+        With `intermediate`, the (intermediate SQL, its results) the LLM asked for are added to the
+        documentation.
+        """
+        if intermediate is not None:
+            intermediate_sql, df = intermediate
+            doc_list = doc_list + [
+                "The following is a pandas DataFrame with the results of the intermediate SQL "
+                f"query {intermediate_sql}: \n"
+                + df.to_markdown()
+            ]
+
         prompt = self.get_sql_prompt(
-            initial_prompt=initial_prompt,
+            initial_prompt=self.config.get("initial_prompt", None),
             question=question,
             question_sql_list=question_sql_list,
             ddl_list=ddl_list,
             doc_list=doc_list,
             **kwargs,
         )
-        self.log(title="SQL Prompt", message=prompt)
-        llm_response = self.submit_prompt(prompt, **kwargs)
-        self.log(title="LLM Response", message=llm_response)
+        self.log(
+            title="Final SQL Prompt" if intermediate is not None else "SQL Prompt", message=prompt
+        )
+        return prompt
+
+    def _intermediate_sql(
+        self, llm_response: str, allow_llm_to_see_data: bool
+    ) -> Tuple[Union[str, None], Union[str, None]]:
+        """
+        Check whether the LLM asked for an intermediate query to introspect the data.
+
+        Returns:
+            Tuple[str, str]: The intermediate SQL to run, or None; and the message to return instead
+            of SQL when the LLM may not see the data, or None.
+        """
+        if 'intermediate_sql' not in llm_response:
+            return None, None
+
+        if not allow_llm_to_see_data:
+            return (
+                None,
+                "The LLM is not allowed to see the data in your database. Your question requires "
+                "database introspection to generate the necessary SQL. Please set "
+                "allow_llm_to_see_data=True to enable this.",
+            )
+
+        intermediate_sql = self.extract_sql(llm_response)
+        self.log(title="Running Intermediate SQL", message=intermediate_sql)
+        return intermediate_sql, None
+
+    def get_related_context(self, question: str, **kwargs) -> Tuple[list, list, list]:
+        """
+        Example:
+        ```python
+        question_sql_list, ddl_list, doc_list = vn.get_related_context(
+            "What are the top 10 customers by sales?"
+        )
+        ```
+
+        Retrieves the context used to generate SQL for a question: similar question-SQL pairs,
+        related DDL and related documentation.
 
-        if 'intermediate_sql' in llm_response:
-            if not allow_llm_to_see_data:
-                return "The LLM is not allowed to see the data in your database. Your question requires database introspection to generate the necessary SQL. Please set allow_llm_to_see_data=True to enable this."
+        By default the three lookups run one after another. Set `parallel_retrieval` to `True` in
+        the config to run them concurrently on a thread pool. In that mode the question is only
+        embedded once and shared by the three lookups, and each lookup is bounded by
+        `retrieval_timeout_sql`, `retrieval_timeout_ddl` and `retrieval_timeout_documentation` (all
+        defaulting to `retrieval_timeout`, in seconds). A lookup that times out or fails contributes
+        an empty list instead of stalling SQL generation. A timed-out lookup can't be interrupted:
+        it keeps running on its own thread until the vector store returns, but later calls don't
+        wait for it.
+
+        Args:
+            question (str): The question to retrieve context for.
 
-            if allow_llm_to_see_data:
-                intermediate_sql = self.extract_sql(llm_response)
+        Returns:
+            Tuple[list, list, list]: The similar question-SQL pairs, the related DDL and the related
+            documentation.
+        """
+        lookups = [
+            ("sql", self.get_similar_question_sql, self.retrieval_timeout_sql),
+            ("ddl", self.get_related_ddl, self.retrieval_timeout_ddl),
+            ("documentation", self.get_related_documentation, self.retrieval_timeout_documentation),
+        ]
+
+        if not self.parallel_retrieval:
+            return tuple(lookup(question, **kwargs) for _, lookup, _ in lookups)
+
+        shared = self._shared_embeddings.setdefault(question, _SharedEmbedding())
+        # Threads of their own for every call: on a shared bounded pool, stalled lookups that
+        # outlive their timeout would take up the workers and queue every later question behind them
+        executor = ThreadPoolExecutor(
+            max_workers=len(lookups), thread_name_prefix="vanna-retrieval"
+        )
+        try:
+            start = time.monotonic()
+            futures = [
+                (name, executor.submit(lookup, question, **kwargs), timeout)
+                for name, lookup, timeout in lookups
+            ]
 
+            results = []
+            for name, future, timeout in futures:
+                remaining = (
+                    None if timeout is None else max(0.0, start + timeout - time.monotonic())
+                )
                 try:
-                    self.log(title="Running Intermediate SQL", message=intermediate_sql)
-                    df = self.run_sql(intermediate_sql)
-
-                    prompt = self.get_sql_prompt(
-                        initial_prompt=initial_prompt,
-                        question=question,
-                        question_sql_list=question_sql_list,
-                        ddl_list=ddl_list,
-                        doc_list=doc_list+[f"The following is a pandas DataFrame with the results of the intermediate SQL query {intermediate_sql}: \n" + df.to_markdown()],
-                        **kwargs,
+                    results.append(future.result(timeout=remaining))
+                except FutureTimeoutError:
+                    self.log(
+                        title="Retrieval Timeout",
+                        message=f"{name} lookup exceeded {timeout}s, continuing without it",
                     )
-                    self.log(title="Final SQL Prompt", message=prompt)
-                    llm_response = self.submit_prompt(prompt, **kwargs)
-                    self.log(title="LLM Response", message=llm_response)
+                    results.append([])
                 except Exception as e:
-                    return f"Error running intermediate SQL: {e}"
-
-
-        return self.extract_sql(llm_response)
+                    self.log(
+                        title="Retrieval Error",
+                        message=f"{name} lookup failed, continuing without it: {e}",
+                    )
+                    results.append([])
+
+            return tuple(results)
+        finally:
+            executor.shutdown(wait=False)
+            if self._shared_embeddings.get(question) is shared:
+                self._shared_embeddings.pop(question, None)
+
+    @property
+    def reranker(self) -> Union[Reranker, None]:
+        """
+        The reranker configured with `reranker`, built on first use. Building it also raises the
+        number of results the vector store retrieves to `rerank_candidates` (default 20) on this
+        instance, unless `n_results` (or `n_results_sql` etc.) is set in the config, so the reranker
+        has candidates to choose from.
+        """
+        if self._reranker is None and self.config.get("reranker"):
+            with self._reranker_lock:
+                if self._reranker is None:
+                    reranker = self.config["reranker"]
+                    if reranker is True or reranker == "cross-encoder":
+                        reranker = CrossEncoderReranker(
+                            model_name=self.config.get(
+                                "rerank_model", "cross-encoder/ms-marco-MiniLM-L-6-v2"
+                            ),
+                            batch_size=self.config.get("rerank_batch_size", 32),
+                            cache_size=self.config.get("rerank_cache_size", 4096),
+                        )
+                    elif reranker in ("hybrid", "bm25"):
+                        reranker = HybridReranker()
+                    self.reranker = reranker
+        return self._reranker
+
+    @reranker.setter
+    def reranker(self, reranker: Union[Reranker, None]) -> None:
+        self._reranker = reranker
+        if reranker is None or "n_results" in self.config:
+            return
+
+        # The vector stores copy n_results from the config into these attributes; the config itself
+        # is left alone, since other instances may be built from the same dict
+        candidates = self.config.get("rerank_candidates", 20)
+        for name in ("n_results", "n_results_sql", "n_results_ddl", "n_results_documentation"):
+            if name in vars(self) and name not in self.config:
+                setattr(self, name, max(getattr(self, name), candidates))
+
+    def _rerank_context(
+        self, question: str, question_sql_list: list, ddl_list: list, doc_list: list
+    ) -> Tuple[list, list, list]:
+        """
+        Pass the retrieved context through the reranker, if one is configured with `reranker` (True
+        or "cross-encoder" for a local cross-encoder, "hybrid" for BM25 fused with the vector
+        ranking, or a [`Reranker`][vanna.base.reranker.Reranker]). Only the best `rerank_top_k_sql`,
+        `rerank_top_k_ddl` and `rerank_top_k_documentation` items (all defaulting to `rerank_top_k`,
+        5) are kept.
+        """
+        reranker = self.reranker
+        if reranker is None:
+            return question_sql_list, ddl_list, doc_list
+
+        top_k = self.config.get("rerank_top_k", 5)
+        return tuple(
+            reranker.rerank_groups(
+                question,
+                [
+                    (question_sql_list, self.config.get("rerank_top_k_sql", top_k)),
+                    (ddl_list, self.config.get("rerank_top_k_ddl", top_k)),
+                    (doc_list, self.config.get("rerank_top_k_documentation", top_k)),
+                ],
+            )
+        )
 
     def extract_sql(self, llm_response: str) -> str:
         """
@@ -554,12 +1072,36 @@ class VannaBase(ABC):
                 and df[col].astype(str).map(len).max() < max_len]
             ].copy()
     """
+        summary = self.submit_prompt(self._get_summary_prompt(question, df), **kwargs)
+
+        return summary
+
+    def generate_summary_stream(self, question: str, df: pd.DataFrame, **kwargs) -> Iterator[str]:
+        """
+        **Example:**
+        ```python
+        for chunk in vn.generate_summary_stream("What are the top 10 customers by sales?", df):
+            print(chunk, end="")
+        ```
+
+        Streaming variant of [`generate_summary`][vanna.base.base.VannaBase.generate_summary].
+
+        Args:
+            question (str): The question that was asked.
+            df (pd.DataFrame): The results of the SQL query.
+
+        Returns:
+            Iterator[str]: Chunks of the summary as the LLM generates them.
+        """
+        yield from self.submit_prompt_stream(self._get_summary_prompt(question, df), **kwargs)
+
+    def _get_summary_prompt(self, question: str, df: pd.DataFrame) -> list:
         df_preview = (
             df.head(1).to_markdown(index=False)
             if not df.empty else "No hi ha dades per mostrar."
         )
-        
-        message_log = [
+
+        return [
             self.system_message(
                 f"You are a helpful data assistant. The user asked the question: '{question}'\n\nThe following is a pandas DataFrame with the results of the query: \n{df_preview}\n\n"
             ),
@@ -569,10 +1111,6 @@ class VannaBase(ABC):
             ),
         ]
 
-        summary = self.submit_prompt(message_log, **kwargs)
-
-        return summary
-
     
     
     def generate_map_code(self, question: str = None, sql: str = None, df_metadata: str = None, **kwargs) -> str:
@@ -608,6 +1146,25 @@ class VannaBase(ABC):
     def generate_embedding(self, data: str, **kwargs) -> List[float]:
         pass
 
+    def generate_embeddings(self, data: List[str], **kwargs) -> List[List[float]]:
+        """
+        Embed several texts. Backends whose model takes a batch override this; the default calls
+        `generate_embedding` for each text on `embedding_workers` threads (config, defaults to 4),
+        which helps with remote embedding APIs.
+
+        Args:
+            data (List[str]): The texts to embed.
+
+        Returns:
+            List[List[float]]: One embedding per text, in order.
+        """
+        workers = getattr(self, "config", {}).get("embedding_workers", 4)
+        if workers <= 1 or len(data) <= 1:
+            return [self.generate_embedding(text, **kwargs) for text in data]
+
+        with ThreadPoolExecutor(max_workers=min(workers, len(data))) as executor:
+            return list(executor.map(lambda text: self.generate_embedding(text, **kwargs), data))
+
     # ----------------- Use Any Database to Store and Retrieve Context ----------------- #
     @abstractmethod
     def get_similar_question_sql(self, question: str, **kwargs) -> list:
@@ -688,6 +1245,48 @@ class VannaBase(ABC):
         """
         pass
 
+    def add_question_sql_batch(self, question_sql: List[Tuple[str, str]], **kwargs) -> List[str]:
+        """
+        Add several question/SQL pairs to the training data. Backends that can embed and write many
+        documents at once override this; the default calls `add_question_sql` for each pair.
+
+        Args:
+            question_sql (List[Tuple[str, str]]): The (question, sql) pairs to add.
+
+        Returns:
+            List[str]: The IDs of the training data that was added, in order.
+        """
+        return [
+            self.add_question_sql(question=question, sql=sql, **kwargs)
+            for question, sql in question_sql
+        ]
+
+    def add_ddl_batch(self, ddls: List[str], **kwargs) -> List[str]:
+        """
+        Add several DDL statements to the training data. The default calls `add_ddl` for each
+        statement.
+
+        Args:
+            ddls (List[str]): The DDL statements to add.
+
+        Returns:
+            List[str]: The IDs of the training data that was added, in order.
+        """
+        return [self.add_ddl(ddl, **kwargs) for ddl in ddls]
+
+    def add_documentation_batch(self, documentation: List[str], **kwargs) -> List[str]:
+        """
+        Add several pieces of documentation to the training data. The default calls
+        `add_documentation` for each.
+
+        Args:
+            documentation (List[str]): The documentation to add.
+
+        Returns:
+            List[str]: The IDs of the training data that was added, in order.
+        """
+        return [self.add_documentation(doc, **kwargs) for doc in documentation]
+
     @abstractmethod
     def get_training_data(self, **kwargs) -> pd.DataFrame:
         """
@@ -735,24 +1334,61 @@ class VannaBase(ABC):
     def assistant_message(self, message: str) -> any:
         pass
 
+    @property
+    def token_counter(self) -> TokenCounter:
+        """
+        The [`TokenCounter`][vanna.base.token_budget.TokenCounter] prompts are measured with. It
+        uses the `tokenizer` config value (a tokenizer object, or a tiktoken encoding or model
+        name), else the tokenizer the LLM class loaded (`Hf`, `ModeloAMB`), else tiktoken's encoding
+        for the `model` config value, else `len / 4`.
+        """
+        counter = getattr(self, "_token_counter", None)
+        if counter is None:
+            config = getattr(self, "config", None) or {}
+            # vars() rather than getattr: local-model backends expose their lazily loaded weights as
+            # `model`
+            model = config.get("model", vars(self).get("model"))
+            counter = resolve_token_counter(
+                tokenizer=config.get("tokenizer", None),
+                loaded_tokenizer=getattr(self, "tokenizer", None),
+                model=model if isinstance(model, str) else None,
+                cache_size=config.get("token_count_cache_size", 4096),
+            )
+            self._token_counter = counter
+        return counter
+
     def str_to_approx_token_count(self, string: str) -> int:
-        return len(string) / 4
+        return self.token_counter.count(string)
+
+    def _add_section_to_prompt(
+        self, initial_prompt: str, header: str, items: list, max_tokens: int
+    ) -> str:
+        # The prompt is counted once and each item once, instead of recounting the growing prompt
+        # for every item
+        if len(items) == 0:
+            return initial_prompt
+
+        parts = [initial_prompt, header]
+        budget = TokenBudget(self.str_to_approx_token_count, max_tokens)
+        budget.spend(initial_prompt)
+        budget.spend(header)
+
+        for item in items:
+            if budget.try_spend(item):
+                parts.append(item)
+
+        return "".join(parts)
 
     def add_ddl_to_prompt(
         self, initial_prompt: str, ddl_list: list[str], max_tokens: int = 14000
     ) -> str:
-        if len(ddl_list) > 0:
-            initial_prompt += "\n===Tables \n"
-
-            for ddl in ddl_list:
-                if (
-                    self.str_to_approx_token_count(initial_prompt)
-                    + self.str_to_approx_token_count(ddl)
-                    < max_tokens
-                ):
-                    initial_prompt += f"{ddl}\n\n"
+        schema_compactor = getattr(self, "schema_compactor", None)
+        if schema_compactor is not None:
+            ddl_list = [schema_compactor.compact_ddl(ddl) for ddl in ddl_list]
 
-        return initial_prompt
+        return self._add_section_to_prompt(
+            initial_prompt, "\n===Tables \n", [f"{ddl}\n\n" for ddl in ddl_list], max_tokens
+        )
 
     def add_documentation_to_prompt(
         self,
@@ -760,34 +1396,38 @@ class VannaBase(ABC):
         documentation_list: list[str],
         max_tokens: int = 14000,
     ) -> str:
-        if len(documentation_list) > 0:
-            initial_prompt += "\n===Additional Context \n\n"
-
-            for documentation in documentation_list:
-                if (
-                    self.str_to_approx_token_count(initial_prompt)
-                    + self.str_to_approx_token_count(documentation)
-                    < max_tokens
-                ):
-                    initial_prompt += f"{documentation}\n\n"
+        schema_compactor = getattr(self, "schema_compactor", None)
+        if schema_compactor is not None:
+            documentation_list = [
+                schema_compactor.compact_documentation(documentation)
+                for documentation in documentation_list
+            ]
 
-        return initial_prompt
+        return self._add_section_to_prompt(
+            initial_prompt,
+            "\n===Additional Context \n\n",
+            [f"{documentation}\n\n" for documentation in documentation_list],
+            max_tokens,
+        )
 
     def add_sql_to_prompt(
         self, initial_prompt: str, sql_list: list[str], max_tokens: int = 14000
     ) -> str:
-        if len(sql_list) > 0:
-            initial_prompt += "\n===Question-SQL Pairs\n\n"
-
-            for question in sql_list:
-                if (
-                    self.str_to_approx_token_count(initial_prompt)
-                    + self.str_to_approx_token_count(question["sql"])
-                    < max_tokens
-                ):
-                    initial_prompt += f"{question['question']}\n{question['sql']}\n\n"
+        return self._add_section_to_prompt(
+            initial_prompt,
+            "\n===Question-SQL Pairs\n\n",
+            [f"{question['question']}\n{question['sql']}\n\n" for question in sql_list],
+            max_tokens,
+        )
 
-        return initial_prompt
+    def _section_max_tokens(self, prompt: str, limits: dict, section: str, available: int) -> int:
+        """
+        The `max_tokens` to fill `section` of `prompt` with: the whole prompt budget, or less if
+        `prompt_section_budgets` gives the section a share of it.
+        """
+        if limits[section] >= available:
+            return available
+        return min(available, self.str_to_approx_token_count(prompt) + limits[section])
 
     def get_sql_prompt(
         self,
@@ -812,6 +1452,10 @@ class VannaBase(ABC):
 
         This method is used to generate a prompt for the LLM to generate SQL.
 
+        With `compact_schema` set in the config, DDL and information schema documentation are
+        rewritten as `table(col type, ...)` with only their primary and foreign keys, so more tables
+        fit in `max_tokens`.
+
         Args:
             question (str): The question to generate SQL for.
             question_sql_list (list): A list of questions and their corresponding SQL statements.
@@ -826,18 +1470,7 @@ class VannaBase(ABC):
             initial_prompt = f"You are a {self.dialect} expert. " + \
             "Please help to generate a SQL query to answer the question. Your response should ONLY be based on the given context and follow the response guidelines and format instructions. "
 
-        initial_prompt = self.add_ddl_to_prompt(
-            initial_prompt, ddl_list, max_tokens=self.max_tokens
-        )
-
-        if self.static_documentation != "":
-            doc_list.append(self.static_documentation)
-
-        initial_prompt = self.add_documentation_to_prompt(
-            initial_prompt, doc_list, max_tokens=self.max_tokens
-        )
-
-        initial_prompt += (
+        response_guidelines = (
             "===Response Guidelines \n"
             "1. If the provided context is sufficient, please generate a valid SQL query without any explanations for the question. \n"
             "2. If the provided context is almost sufficient but requires knowledge of a specific string in a particular column, please generate an intermediate SQL query to find the distinct strings in that column. Prepend the query with a comment saying intermediate_sql \n"
@@ -847,15 +1480,54 @@ class VannaBase(ABC):
             f"6. Ensure that the output SQL is {self.dialect}-compliant and executable, and free of syntax errors. \n"
         )
 
-        message_log = [self.system_message(initial_prompt)]
+        # The guidelines and the question always go in; the sections share what is left of
+        # max_tokens, the question/SQL examples first, then the DDL, then the documentation. The
+        # examples are capped at DEFAULT_EXAMPLES_SHARE unless prompt_section_budgets sets their
+        # share, so the DDL always gets room.
+        available = (
+            self.max_tokens
+            - self.str_to_approx_token_count(response_guidelines)
+            - self.str_to_approx_token_count(question)
+        )
+        shares = {"sql": DEFAULT_EXAMPLES_SHARE, **(self.prompt_section_budgets or {})}
+        limits = section_limits(available, ["sql", "ddl", "documentation"], shares)
 
+        examples = []
+        example_budget = TokenBudget(self.str_to_approx_token_count, limits["sql"])
         for example in question_sql_list:
             if example is None:
                 print("example is None")
             else:
                 if example is not None and "question" in example and "sql" in example:
-                    message_log.append(self.user_message(example["question"]))
-                    message_log.append(self.assistant_message(example["sql"]))
+                    tokens = self.str_to_approx_token_count(example["question"])
+                    tokens += self.str_to_approx_token_count(example["sql"])
+                    if example_budget.fits(tokens):
+                        example_budget.used += tokens
+                        examples.append(example)
+        available -= example_budget.used
+
+        initial_prompt = self.add_ddl_to_prompt(
+            initial_prompt,
+            ddl_list,
+            max_tokens=self._section_max_tokens(initial_prompt, limits, "ddl", available),
+        )
+
+        if self.static_documentation != "":
+            doc_list.append(self.static_documentation)
+
+        initial_prompt = self.add_documentation_to_prompt(
+            initial_prompt,
+            doc_list,
+            max_tokens=self._section_max_tokens(initial_prompt, limits, "documentation", available),
+        )
+
+        initial_prompt += response_guidelines
+
+        message_log = [self.system_message(initial_prompt)]
+
+        for example in examples:
+            message_log.append(self.user_message(example["question"]))
+            message_log.append(self.assistant_message(example["sql"]))
 
         message_log.append(self.user_message(question))
 
@@ -870,25 +1542,37 @@ class VannaBase(ABC):
         **kwargs,
     ) -> list:
         initial_prompt = f"The user initially asked the question: '{question}': \n\n"
+        instruction = (
+            "Generate a list of unique followup questions that the user might ask about this data. "
+            "Respond with a list of questions, one per line. "
+            "Do not answer with any explanations -- just the unique questions."
+        )
+
+        available = self.max_tokens - self.str_to_approx_token_count(instruction)
+        limits = section_limits(
+            available, ["ddl", "documentation", "sql"], self.prompt_section_budgets
+        )
 
         initial_prompt = self.add_ddl_to_prompt(
-            initial_prompt, ddl_list, max_tokens=self.max_tokens
+            initial_prompt,
+            ddl_list,
+            max_tokens=self._section_max_tokens(initial_prompt, limits, "ddl", available),
         )
 
         initial_prompt = self.add_documentation_to_prompt(
-            initial_prompt, doc_list, max_tokens=self.max_tokens
+            initial_prompt,
+            doc_list,
+            max_tokens=self._section_max_tokens(initial_prompt, limits, "documentation", available),
         )
 
         initial_prompt = self.add_sql_to_prompt(
-            initial_prompt, question_sql_list, max_tokens=self.max_tokens
+            initial_prompt,
+            question_sql_list,
+            max_tokens=self._section_max_tokens(initial_prompt, limits, "sql", available),
         )
 
         message_log = [self.system_message(initial_prompt)]
-        message_log.append(
-            self.user_message(
-                "Generate a list of unique followup questions that the user might ask about this data. Respond with a list of questions, one per line. Do not answer with any explanations -- just the unique questions."
-            )
-        )
+        message_log.append(self.user_message(instruction))
 
         return message_log
 
@@ -915,6 +1599,32 @@ class VannaBase(ABC):
         """
         pass
 
+    def submit_prompt_stream(self, prompt, **kwargs) -> Iterator[str]:
+        """
+        Example:
+        ```python
+        for chunk in vn.submit_prompt_stream(
+            [
+                vn.system_message("You are a helpful data assistant."),
+                vn.user_message("What does the customers table contain?"),
+            ]
+        ):
+            print(chunk, end="")
+        ```
+
+        This method is used to submit a prompt to the LLM and receive the response as it is
+        generated. LLM backends that support streaming override it. The default implementation
+        yields the full response of [`submit_prompt`][vanna.base.base.VannaBase.submit_prompt] as a
+        single chunk.
+
+        Args:
+            prompt (any): The prompt to submit to the LLM.
+
+        Returns:
+            Iterator[str]: Chunks of the response from the LLM.
+        """
+        yield self.submit_prompt(prompt, **kwargs)
+
     def generate_question(self, sql: str, **kwargs) -> str:
         response = self.submit_prompt(
             [
@@ -963,6 +1673,22 @@ class VannaBase(ABC):
         chart_type: str = None,
         **kwargs
     ) -> str:
+        message_log = self._get_plotly_prompt(question, sql, df_metadata, chart_type)
+
+        # Llamar al LLM
+        plotly_code = self.submit_prompt(message_log, **kwargs)
+    
+        # Limpiar el código si hace falta
+        return self._sanitize_plotly_code(self._extract_python_code(plotly_code))
+
+
+    def _get_plotly_prompt(
+        self,
+        question: str = None,
+        sql: str = None,
+        df_metadata: str = None,
+        chart_type: str = None,
+    ) -> list:
         # Cargar el prompt base desde archivo externo
         base_prompt = self.load_prompt_from_file('prompts/initial_prompt_graficas.txt')
 
@@ -988,7 +1714,7 @@ class VannaBase(ABC):
             )
     
         # Construir el message_log para enviar al LLM
-        message_log = [
+        return [
             self.system_message(system_msg),
             self.user_message(
                 "Assumeix que ja existeix un DataFrame anomenat `df` amb les dades. "
@@ -996,12 +1722,6 @@ class VannaBase(ABC):
                 "Mostra només el codi Python amb Plotly per visualitzar `df`, sense cap explicació addicional."
             ),
         ]
-    
-        # Llamar al LLM
-        plotly_code = self.submit_prompt(message_log, **kwargs)
-    
-        # Limpiar el código si hace falta
-        return self._sanitize_plotly_code(self._extract_python_code(plotly_code))
 
 
     # ----------------- Connect to Any Database to run the Generated SQL ----------------- #
@@ -1065,7 +1785,7 @@ class VannaBase(ABC):
             **kwargs
         )
 
-        def run_sql_snowflake(sql: str) -> pd.DataFrame:
+        def execute(sql: str):
             cs = conn.cursor()
 
             if role is not None:
@@ -1075,14 +1795,51 @@ class VannaBase(ABC):
                 cs.execute(f"USE WAREHOUSE {warehouse}")
             cs.execute(f"USE DATABASE {database}")
 
-            cur = cs.execute(sql)
+            return cs.execute(sql)
+
+        def fetch_chunks(sql: str) -> Iterator[pd.DataFrame]:
+            cur = execute(sql)
+            columns = [desc[0] for desc in cur.description]
+
+            batches = cur.get_result_batches()
+            if batches is None:
+                # Results that didn't come back in Arrow format have no batches
+                yield from iter_fetch(cur, chunk_size=self.fetch_chunk_size, columns=columns)
+                return
+
+            # Result batches are downloaded one at a time, as they are consumed
+            empty = True
+            for batch in batches:
+                df = arrow_to_df(batch.to_arrow()) if self.arrow_fetch else batch.to_pandas()
+                if len(df) == 0:
+                    continue
+
+                empty = False
+                yield df
 
-            results = cur.fetchall()
+            if empty:
+                yield pd.DataFrame([], columns=columns)
 
-            # Create a pandas dataframe from the results
-            df = pd.DataFrame(results, columns=[desc[0] for desc in cur.description])
+        def run_sql_snowflake(
+            sql: str, max_rows: int = None, stream: bool = False
+        ) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+            if stream or max_rows is not None:
+                chunks = limit_chunks(fetch_chunks(sql), max_rows)
+                return chunks if stream else concat_chunks(chunks)
 
-            return df
+            cur = execute(sql)
+
+            if self.arrow_fetch:
+                table = cur.fetch_arrow_all()
+                if table is not None:
+                    return arrow_to_df(table)
+
+                # fetch_arrow_all returns None when the query has no rows
+                return pd.DataFrame([], columns=[desc[0] for desc in cur.description])
+
+            return fetch_df(cur, chunk_size=self.fetch_chunk_size)
+
+        run_sql_snowflake.supports_stream = True
 
         self.dialect = "Snowflake SQL"
         self.run_sql = run_sql_snowflake
@@ -1133,6 +1890,12 @@ class VannaBase(ABC):
         user: str = None,
         password: str = None,
         port: int = None,
+        pool: bool = False,
+        pool_min_size: int = 1,
+        pool_max_size: int = 10,
+        pool_recycle: float = 3600,
+        pool_timeout: float = 30,
+        pool_health_check: bool = True,
         **kwargs
     ):
 
@@ -1154,6 +1917,18 @@ class VannaBase(ABC):
             user (str): The postgres user.
             password (str): The postgres password.
             port (int): The postgres Port.
+            pool (bool): Keep a pool of open connections shared by every thread, instead of opening
+                a connection per query. Defaults to False.
+            pool_min_size (int): Number of connections opened up front. Defaults to 1.
+            pool_max_size (int): Maximum number of open connections. Defaults to 10.
+            pool_recycle (float): Seconds after which a connection is replaced. Defaults to 3600.
+            pool_timeout (float): Seconds to wait for a free connection before raising. Defaults to
+                30.
+            pool_health_check (bool): Run `SELECT 1` on a connection before handing it out. Defaults
+                to True.
+
+        With `arrow_fetch` set in the config and `adbc-driver-postgresql` installed, queries run
+        through the ADBC driver and results are fetched as Arrow tables instead of Python tuples.
         """
 
         try:
@@ -1195,58 +1970,150 @@ class VannaBase(ABC):
         if not port:
             raise ImproperlyConfigured("Please set your postgres port")
 
-        conn = None
+        use_adbc = False
+        db_errors = (psycopg2.Error,)
 
-        try:
-            conn = psycopg2.connect(
-                host=host,
-                dbname=dbname,
-                user=user,
-                password=password,
-                port=port,
-                **kwargs
-            )
-        except psycopg2.Error as e:
-            raise ValidationError(e)
+        if self.arrow_fetch:
+            try:
+                import adbc_driver_manager.dbapi
+                import adbc_driver_postgresql.dbapi
+
+                use_adbc = True
+                db_errors = (psycopg2.Error, adbc_driver_manager.dbapi.Error)
+            except ImportError:
+                self.log(
+                    title="Arrow Fetch",
+                    message=(
+                        "adbc-driver-postgresql is not installed, fetching results with psycopg2"
+                    ),
+                )
 
         def connect_to_db():
+            if use_adbc:
+                credentials = f"{quote_plus(str(user))}:{quote_plus(str(password))}"
+                uri = f"postgresql://{credentials}@{host}:{port}/{dbname}"
+                if kwargs:
+                    uri += "?" + urlencode(kwargs)
+                return adbc_driver_postgresql.dbapi.connect(uri)
+
             return psycopg2.connect(host=host, dbname=dbname,
                         user=user, password=password, port=port, **kwargs)
 
+        if pool:
+            def ping(conn):
+                with conn.cursor() as cs:
+                    cs.execute("SELECT 1")
 
-        def run_sql_postgres(sql: str) -> Union[pd.DataFrame, None]:
-            conn = None
             try:
-                conn = connect_to_db()  # Initial connection attempt
-                cs = conn.cursor()
+                self.connection_pool = ConnectionPool(
+                    connect_to_db,
+                    ping=ping if pool_health_check else None,
+                    min_size=pool_min_size,
+                    max_size=pool_max_size,
+                    recycle=pool_recycle,
+                    timeout=pool_timeout,
+                )
+            except db_errors as e:
+                raise ValidationError(e)
+        else:
+            # Check the credentials up front, like the pooled mode does
+            try:
+                connect_to_db().close()
+            except db_errors as e:
+                raise ValidationError(e)
+
+        def execute(conn, sql: str) -> pd.DataFrame:
+            with conn.cursor() as cs:
                 cs.execute(sql)
-                results = cs.fetchall()
 
-                # Create a pandas dataframe from the results
-                df = pd.DataFrame(results, columns=[desc[0] for desc in cs.description])
+                if use_adbc:
+                    return arrow_to_df(cs.fetch_arrow_table())
+
+                return fetch_df(cs, chunk_size=self.fetch_chunk_size)
+
+        def fetch_pooled(sql: str) -> Union[pd.DataFrame, None]:
+            for attempt in range(2):
+                entry = self.connection_pool.acquire()
+                conn = entry[0]
+                try:
+                    df = execute(conn, sql)
+                except db_errors as e:
+                    broken = bool(getattr(conn, "closed", False))
+                    self.connection_pool.release(entry, discard=broken)
+                    if broken and attempt == 0:
+                        # The connection dropped mid-query: retry once on a fresh one
+                        continue
+                    raise ValidationError(e)
+                except Exception:
+                    self.connection_pool.release(
+                        entry, discard=bool(getattr(conn, "closed", False))
+                    )
+                    raise
+
+                self.connection_pool.release(entry)
                 return df
 
-            except psycopg2.InterfaceError as e:
+        def fetch(sql: str) -> Union[pd.DataFrame, None]:
+            conn = None
+            try:
+                conn = connect_to_db()
+                return execute(conn, sql)
+
+            except psycopg2.InterfaceError:
                 # Attempt to reconnect and retry the operation
                 if conn:
                     conn.close()  # Ensure any existing connection is closed
                 conn = connect_to_db()
-                cs = conn.cursor()
-                cs.execute(sql)
-                results = cs.fetchall()
+                return execute(conn, sql)
 
-                # Create a pandas dataframe from the results
-                df = pd.DataFrame(results, columns=[desc[0] for desc in cs.description])
-                return df
-
-            except psycopg2.Error as e:
+            except db_errors as e:
                 if conn:
                     conn.rollback()
-                    raise ValidationError(e)
+                raise ValidationError(e)
 
-            except Exception as e:
-                        conn.rollback()
-                        raise e
+            finally:
+                if conn:
+                    conn.close()
+
+        def fetch_chunks(sql: str) -> Iterator[pd.DataFrame]:
+            if pool:
+                entry = self.connection_pool.acquire()
+                conn = entry[0]
+            else:
+                conn = connect_to_db()
+
+            try:
+                if use_adbc:
+                    with conn.cursor() as cs:
+                        cs.execute(sql)
+                        yield from iter_arrow_batches(cs.fetch_record_batch())
+                else:
+                    # A named cursor lives on the server, so rows are transferred fetch_chunk_size
+                    # at a time
+                    with conn.cursor(name=f"vanna_{uuid.uuid4().hex}") as cs:
+                        cs.itersize = self.fetch_chunk_size
+                        cs.execute(sql)
+                        yield from iter_fetch(cs, chunk_size=self.fetch_chunk_size)
+            except db_errors as e:
+                raise ValidationError(e)
+            finally:
+                if pool:
+                    self.connection_pool.release(
+                        entry, discard=bool(getattr(conn, "closed", False))
+                    )
+                else:
+                    conn.close()
+
+        def run_sql_postgres(
+            sql: str, max_rows: int = None, stream: bool = False
+        ) -> Union[pd.DataFrame, Iterator[pd.DataFrame], None]:
+            if stream or max_rows is not None:
+                chunks = limit_chunks(fetch_chunks(sql), max_rows)
+                return chunks if stream else concat_chunks(chunks)
+
+            return fetch_pooled(sql) if pool else fetch(sql)
+
+        run_sql_postgres.supports_stream = True
 
         self.dialect = "PostgreSQL"
         self.run_sql_is_set = True
@@ -1260,6 +2127,12 @@ class VannaBase(ABC):
         user: str = None,
         password: str = None,
         port: int = None,
+        pool: bool = False,
+        pool_min_size: int = 1,
+        pool_max_size: int = 10,
+        pool_recycle: float = 3600,
+        pool_timeout: float = 30,
+        pool_health_check: bool = True,
         **kwargs
     ):
 
@@ -1301,10 +2174,8 @@ class VannaBase(ABC):
         if not port:
             raise ImproperlyConfigured("Please set your MySQL port")
 
-        conn = None
-
-        try:
-            conn = pymysql.connect(
+        def connect_to_db():
+            return pymysql.connect(
                 host=host,
                 user=user,
                 password=password,
@@ -1313,30 +2184,54 @@ class VannaBase(ABC):
                 cursorclass=pymysql.cursors.DictCursor,
                 **kwargs
             )
-        except pymysql.Error as e:
-            raise ValidationError(e)
 
-        def run_sql_mysql(sql: str) -> Union[pd.DataFrame, None]:
-            if conn:
-                try:
-                    conn.ping(reconnect=True)
-                    cs = conn.cursor()
-                    cs.execute(sql)
-                    results = cs.fetchall()
+        def execute(conn, sql: str) -> pd.DataFrame:
+            with conn.cursor() as cs:
+                cs.execute(sql)
+                return fetch_df(cs, chunk_size=self.fetch_chunk_size)
 
-                    # Create a pandas dataframe from the results
-                    df = pd.DataFrame(
-                        results, columns=[desc[0] for desc in cs.description]
-                    )
-                    return df
+        if pool:
+            try:
+                self.connection_pool = ConnectionPool(
+                    connect_to_db,
+                    ping=(lambda conn: conn.ping(reconnect=False)) if pool_health_check else None,
+                    min_size=pool_min_size,
+                    max_size=pool_max_size,
+                    recycle=pool_recycle,
+                    timeout=pool_timeout,
+                )
+            except pymysql.Error as e:
+                raise ValidationError(e)
 
-                except pymysql.Error as e:
-                    conn.rollback()
-                    raise ValidationError(e)
+            def run_sql_mysql(sql: str) -> Union[pd.DataFrame, None]:
+                with self.connection_pool.connection() as conn:
+                    try:
+                        return execute(conn, sql)
+                    except pymysql.Error as e:
+                        raise ValidationError(e)
 
-                except Exception as e:
-                    conn.rollback()
-                    raise e
+        else:
+            try:
+                conn = connect_to_db()
+            except pymysql.Error as e:
+                raise ValidationError(e)
+
+            # A single connection can't run two queries at once, so serialize the callers
+            lock = threading.Lock()
+
+            def run_sql_mysql(sql: str) -> Union[pd.DataFrame, None]:
+                with lock:
+                    try:
+                        conn.ping(reconnect=True)
+                        return execute(conn, sql)
+
+                    except pymysql.Error as e:
+                        conn.rollback()
+                        raise ValidationError(e)
+
+                    except Exception as e:
+                        conn.rollback()
+                        raise e
 
         self.run_sql_is_set = True
         self.run_sql = run_sql_mysql
@@ -1407,6 +2302,9 @@ class VannaBase(ABC):
         def run_sql_clickhouse(sql: str) -> Union[pd.DataFrame, None]:
             if conn:
                 try:
+                    if self.arrow_fetch:
+                        return arrow_to_df(conn.query_arrow(sql))
+
                     result = conn.query(sql)
                     results = result.result_rows
 
@@ -1490,15 +2388,15 @@ class VannaBase(ABC):
                     if sql.endswith(';'): #fix for a known problem with Oracle db where an extra ; will cause an error.
                         sql = sql[:-1]
 
+                    if self.arrow_fetch and hasattr(conn, "fetch_df_all"):
+                        # python-oracledb 3+ fetches straight into Arrow buffers
+                        import pyarrow
+
+                        return arrow_to_df(pyarrow.table(conn.fetch_df_all(statement=sql)))
+
                     cs = conn.cursor()
                     cs.execute(sql)
-                    results = cs.fetchall()
-
-                    # Create a pandas dataframe from the results
-                    df = pd.DataFrame(
-                        results, columns=[desc[0] for desc in cs.description]
-                    )
-                    return df
+                    return fetch_df(cs, chunk_size=self.fetch_chunk_size)
 
                 except oracledb.Error as e:
                     conn.rollback()
@@ -1591,6 +2489,9 @@ class VannaBase(ABC):
         def run_sql_bigquery(sql: str) -> Union[pd.DataFrame, None]:
             if conn:
                 job = conn.query(sql)
+                if self.arrow_fetch:
+                    return arrow_to_df(job.result().to_arrow())
+
                 df = job.result().to_dataframe()
                 return df
             return None
@@ -1641,9 +2542,42 @@ class VannaBase(ABC):
         if init_sql:
             conn.query(init_sql)
 
-        def run_sql_duckdb(sql: str):
+        def fetch_chunks(sql: str) -> Iterator[pd.DataFrame]:
+            # A cursor has its own result set, so a half-read stream doesn't block other queries
+            cur = conn.cursor()
+            try:
+                cur.execute(sql)
+
+                try:
+                    import pyarrow  # noqa: F401
+                except ImportError:
+                    yield from iter_fetch(cur, chunk_size=self.fetch_chunk_size)
+                    return
+
+                if hasattr(cur, "to_arrow_reader"):
+                    reader = cur.to_arrow_reader(self.fetch_chunk_size)
+                else:
+                    reader = cur.fetch_record_batch(self.fetch_chunk_size)
+                yield from iter_arrow_batches(reader, arrow_backed=self.arrow_fetch)
+            finally:
+                cur.close()
+
+        def run_sql_duckdb(sql: str, max_rows: int = None, stream: bool = False):
+            if stream or max_rows is not None:
+                chunks = limit_chunks(fetch_chunks(sql), max_rows)
+                return chunks if stream else concat_chunks(chunks)
+
+            if self.arrow_fetch:
+                table = conn.query(sql).arrow()
+                # Recent DuckDB versions return a RecordBatchReader instead of a Table
+                if hasattr(table, "read_all"):
+                    table = table.read_all()
+                return arrow_to_df(table)
+
             return conn.query(sql).to_df()
 
+        run_sql_duckdb.supports_stream = True
+
         self.dialect = "DuckDB SQL"
         self.run_sql = run_sql_duckdb
         self.run_sql_is_set = True
@@ -1793,13 +2727,7 @@ class VannaBase(ABC):
                 sql = sql[:-1]
             cs = conn.cursor()
             cs.execute(sql)
-            results = cs.fetchall()
-
-            # Create a pandas dataframe from the results
-            df = pd.DataFrame(
-              results, columns=[desc[0] for desc in cs.description]
-            )
-            return df
+            return fetch_df(cs, chunk_size=self.fetch_chunk_size)
 
           except presto.Error as e:
             print(e)
@@ -1890,13 +2818,7 @@ class VannaBase(ABC):
           try:
             cs = conn.cursor()
             cs.execute(sql)
-            results = cs.fetchall()
-
-            # Create a pandas dataframe from the results
-            df = pd.DataFrame(
-              results, columns=[desc[0] for desc in cs.description]
-            )
-            return df
+            return fetch_df(cs, chunk_size=self.fetch_chunk_size)
 
           except hive.Error as e:
             print(e)
@@ -1928,6 +2850,35 @@ class VannaBase(ABC):
             "You need to connect to a database first by running vn.connect_to_snowflake(), vn.connect_to_postgres(), similar function, or manually set vn.run_sql"
         )
 
+    def run_sql_stream(self, sql: str, max_rows: int = None, **kwargs) -> Iterator[pd.DataFrame]:
+        """
+        Example:
+        ```python
+        for df in vn.run_sql_stream("SELECT * FROM my_table", max_rows=100000):
+            print(len(df))
+        ```
+
+        Run a SQL query and yield the results as DataFrame chunks.
+
+        The Postgres, Snowflake and DuckDB connectors read the rows through server-side cursors,
+        result batches and record batch readers, so only one chunk is held in memory at a time and
+        no more than `max_rows` rows are transferred. For other connectors the full result of
+        [`run_sql`][vanna.base.base.VannaBase.run_sql] is yielded as a single chunk.
+
+        Args:
+            sql (str): The SQL query to run.
+            max_rows (int): Stop after this many rows. Defaults to None, which reads every row.
+
+        Returns:
+            Iterator[pd.DataFrame]: Chunks of the results of the SQL query.
+        """
+        if getattr(self.run_sql, "supports_stream", False):
+            yield from self.run_sql(sql, max_rows=max_rows, stream=True, **kwargs)
+            return
+
+        df = self.run_sql(sql, **kwargs)
+        yield df if max_rows is None else df.head(max_rows)
+
     def ask(
       self,
       question: Union[str, None] = None,
@@ -2042,6 +2993,214 @@ class VannaBase(ABC):
           return (None if print_results else (sql, None, None))
 
 
+    # ----------------- Async API ----------------- #
+
+    def _overrides(self, name: str) -> bool:
+        # Whether a backend replaced a VannaBase method, e.g. to post-process generate_sql
+        return getattr(type(self), name) is not getattr(VannaBase, name)
+
+    async def asubmit_prompt(self, prompt, **kwargs) -> str:
+        """
+        Example:
+        ```python
+        response = await vn.asubmit_prompt(
+            [vn.user_message("What does the customers table contain?")]
+        )
+        ```
+
+        Async variant of [`submit_prompt`][vanna.base.base.VannaBase.submit_prompt]. LLM backends
+        with an async client override it; the default runs `submit_prompt` in a worker thread so the
+        event loop is never blocked.
+
+        Args:
+            prompt (any): The prompt to submit to the LLM.
+
+        Returns:
+            str: The response from the LLM.
+        """
+        return await asyncio.to_thread(self.submit_prompt, prompt, **kwargs)
+
+    async def aget_related_context(self, question: str, **kwargs) -> Tuple[list, list, list]:
+        """
+        Async variant of [`get_related_context`][vanna.base.base.VannaBase.get_related_context].
+        Remote vector stores override it; the default runs `get_related_context` in a worker thread.
+        """
+        return await asyncio.to_thread(self.get_related_context, question, **kwargs)
+
+    async def arun_sql(self, sql: str, **kwargs) -> pd.DataFrame:
+        """
+        Example:
+        ```python
+        df = await vn.arun_sql("SELECT * FROM my_table")
+        ```
+
+        Async variant of [`run_sql`][vanna.base.base.VannaBase.run_sql]. The query runs in a worker
+        thread.
+        """
+        return await asyncio.to_thread(self.run_sql, sql, **kwargs)
+
+    async def agenerate_sql(self, question: str, allow_llm_to_see_data=False, **kwargs) -> str:
+        """
+        Example:
+        ```python
+        sql = await vn.agenerate_sql("What are the top 10 customers by sales?")
+        ```
+
+        Async variant of [`generate_sql`][vanna.base.base.VannaBase.generate_sql]. Retrieval, the
+        LLM calls and the intermediate SQL go through
+        [`aget_related_context`][vanna.base.base.VannaBase.aget_related_context],
+        [`asubmit_prompt`][vanna.base.base.VannaBase.asubmit_prompt] and
+        [`arun_sql`][vanna.base.base.VannaBase.arun_sql]. Backends that override `generate_sql` have
+        it run in a worker thread instead, so their post-processing still applies.
+
+        Args:
+            question (str): The question to generate a SQL query for.
+            allow_llm_to_see_data (bool): Whether to allow the LLM to see the data (for the purposes of introspecting the data to generate the final SQL).
+
+        Returns:
+            str: The SQL query that answers the question.
+        """
+        if self._overrides("generate_sql"):
+            return await asyncio.to_thread(
+                self.generate_sql, question, allow_llm_to_see_data=allow_llm_to_see_data, **kwargs
+            )
+
+        question_sql_list, ddl_list, doc_list = await self._aget_sql_context(question, **kwargs)
+        prompt = self._sql_prompt(question, question_sql_list, ddl_list, doc_list, **kwargs)
+        llm_response = await self.asubmit_prompt(prompt, **kwargs)
+        self.log(title="LLM Response", message=llm_response)
+
+        intermediate_sql, message = self._intermediate_sql(llm_response, allow_llm_to_see_data)
+        if message is not None:
+            return message
+
+        if intermediate_sql is not None:
+            try:
+                df = await self.arun_sql(intermediate_sql)
+                prompt = self._sql_prompt(
+                    question,
+                    question_sql_list,
+                    ddl_list,
+                    doc_list,
+                    intermediate=(intermediate_sql, df),
+                    **kwargs
+                )
+                llm_response = await self.asubmit_prompt(prompt, **kwargs)
+                self.log(title="LLM Response", message=llm_response)
+            except Exception as e:
+                return f"Error running intermediate SQL: {e}"
+
+        return self.extract_sql(llm_response)
+
+    async def _aget_sql_context(self, question: str, **kwargs) -> Tuple[list, list, list]:
+        """
+        Async variant of [`_get_sql_context`][vanna.base.base.VannaBase._get_sql_context]. Reranking
+        runs in a worker thread.
+        """
+        if self.config.get("reranker") and self._reranker is None:
+            # Loading a cross-encoder blocks, so it happens in a worker thread
+            await asyncio.to_thread(lambda: self.reranker)
+
+        question_sql_list, ddl_list, doc_list = await self.aget_related_context(question, **kwargs)
+        if self.reranker is None:
+            return question_sql_list, ddl_list, doc_list
+
+        return await asyncio.to_thread(
+            self._rerank_context, question, question_sql_list, ddl_list, doc_list
+        )
+
+    async def agenerate_summary(self, question: str, df: pd.DataFrame, **kwargs) -> str:
+        """
+        Async variant of [`generate_summary`][vanna.base.base.VannaBase.generate_summary].
+        """
+        if self._overrides("generate_summary"):
+            return await asyncio.to_thread(self.generate_summary, question, df, **kwargs)
+
+        return await self.asubmit_prompt(self._get_summary_prompt(question, df), **kwargs)
+
+    async def agenerate_plotly_code(
+        self,
+        question: str = None,
+        sql: str = None,
+        df_metadata: str = None,
+        chart_type: str = None,
+        **kwargs
+    ) -> str:
+        """
+        Async variant of [`generate_plotly_code`][vanna.base.base.VannaBase.generate_plotly_code].
+        """
+        if self._overrides("generate_plotly_code"):
+            return await asyncio.to_thread(
+                self.generate_plotly_code,
+                question=question,
+                sql=sql,
+                df_metadata=df_metadata,
+                chart_type=chart_type,
+                **kwargs,
+            )
+
+        message_log = self._get_plotly_prompt(question, sql, df_metadata, chart_type)
+        plotly_code = await self.asubmit_prompt(message_log, **kwargs)
+
+        return self._sanitize_plotly_code(self._extract_python_code(plotly_code))
+
+    async def aask(
+        self,
+        question: str,
+        auto_train: bool = True,
+        visualize: bool = True,
+        allow_llm_to_see_data: bool = False,
+    ) -> Tuple[
+        Union[str, None],
+        Union[pd.DataFrame, None],
+        Union[plotly.graph_objs.Figure, None],
+    ]:
+        """
+        **Example:**
+        ```python
+        sql, df, fig = await vn.aask("What are the top 10 customers by sales?")
+        ```
+
+        Non-interactive async variant of [`ask`][vanna.base.base.VannaBase.ask] for servers: it
+        generates the SQL, runs it, optionally trains on the result and generates a chart, without
+        printing or prompting for input.
+
+        Returns:
+            Tuple[str, pd.DataFrame, plotly.graph_objs.Figure]: The SQL, its results and the chart.
+            Steps that could not run are None.
+        """
+        sql = await self.agenerate_sql(
+            question=question, allow_llm_to_see_data=allow_llm_to_see_data
+        )
+
+        if self.run_sql_is_set is False:
+            return sql, None, None
+
+        try:
+            df = await self.arun_sql(sql)
+        except Exception as e:
+            self.log(title="Couldn't run sql", message=str(e))
+            return sql, None, None
+
+        if len(df) > 0 and auto_train:
+            await asyncio.to_thread(self.add_question_sql, question=question, sql=sql)
+
+        if not visualize:
+            return sql, df, None
+
+        try:
+            plotly_code = await self.agenerate_plotly_code(
+                question=question,
+                sql=sql,
+                df_metadata=f"Running df.dtypes gives:\n {df.dtypes}",
+            )
+            fig = self.get_plotly_figure(plotly_code=plotly_code, df=df)
+        except Exception as e:
+            self.log(title="Couldn't run plotly code", message=str(e))
+            return sql, df, None
+
+        return sql, df, fig
+
     def train(
         self,
         question: str = None,
@@ -2089,13 +3248,40 @@ class VannaBase(ABC):
             return self.add_ddl(ddl)
 
         if plan:
-            for item in plan._plan:
-                if item.item_type == TrainingPlanItem.ITEM_TYPE_DDL:
-                    self.add_ddl(item.item_value)
-                elif item.item_type == TrainingPlanItem.ITEM_TYPE_IS:
-                    self.add_documentation(item.item_value)
-                elif item.item_type == TrainingPlanItem.ITEM_TYPE_SQL:
-                    self.add_question_sql(question=item.item_name, sql=item.item_value)
+            self._train_plan(plan)
+
+    def _train_plan(self, plan: TrainingPlan) -> List[str]:
+        """
+        Add the items of a training plan with the `add_*_batch` methods, `train_batch_size` items at
+        a time (config, defaults to 100).
+        """
+        batch_size = getattr(self, "config", {}).get("train_batch_size", 100)
+
+        ddls = [
+            item.item_value
+            for item in plan._plan
+            if item.item_type == TrainingPlanItem.ITEM_TYPE_DDL
+        ]
+        documentation = [
+            item.item_value
+            for item in plan._plan
+            if item.item_type == TrainingPlanItem.ITEM_TYPE_IS
+        ]
+        question_sql = [
+            (item.item_name, item.item_value)
+            for item in plan._plan
+            if item.item_type == TrainingPlanItem.ITEM_TYPE_SQL
+        ]
+
+        ids = []
+        for items, add_batch in (
+            (ddls, self.add_ddl_batch),
+            (documentation, self.add_documentation_batch),
+            (question_sql, self.add_question_sql_batch),
+        ):
+            for start in range(0, len(items), batch_size):
+                ids.extend(add_batch(items[start:start + batch_size]))
+        return ids
 
     def _get_databases(self) -> List[str]:
         try:
@@ -0,0 +1,240 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Union
+
+from ..exceptions import ConnectionError
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of DB-API connections, used by the pooled mode of
+    [`VannaBase.connect_to_postgres`][vanna.base.base.VannaBase.connect_to_postgres] and
+    [`VannaBase.connect_to_mysql`][vanna.base.base.VannaBase.connect_to_mysql].
+
+    One pool is shared by every thread that calls `run_sql`, e.g. the Flask request threads. A
+    connection is borrowed by a single thread at a time and is rolled back before it goes back to
+    the pool.
+
+    Args:
+        connect (Callable): Function that opens a new connection.
+        ping (Callable): Function that raises if a connection is no longer usable. Defaults to None,
+            which skips health checks.
+        min_size (int): Number of connections opened up front and kept open. Defaults to 1.
+        max_size (int): Maximum number of open connections. Defaults to 10.
+        recycle (float): Number of seconds after which a connection is closed and replaced. Defaults
+            to 3600. None keeps connections open forever.
+        timeout (float): Number of seconds to wait for a free connection before raising
+            `ConnectionError`. Defaults to 30.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        ping: Union[Callable[[Any], None], None] = None,
+        min_size: int = 1,
+        max_size: int = 10,
+        recycle: Union[float, None] = 3600,
+        timeout: Union[float, None] = 30,
+    ):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError("The pool needs 0 <= min_size <= max_size and max_size >= 1")
+
+        self._connect = connect
+        self._ping = ping
+        self.min_size = min_size
+        self.max_size = max_size
+        self.recycle = recycle
+        self.timeout = timeout
+
+        # Idle connections as (connection, created_at) tuples, most recently released last
+        self._idle = deque()
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+        self.borrows = 0
+        self.timeouts = 0
+        self.created = 0
+        self.closed = 0
+        self.health_check_failures = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+        for _ in range(min_size):
+            self._idle.append((self._open(), time.monotonic()))
+
+    def _open(self):
+        connection = self._connect()
+        with self._condition:
+            self._size += 1
+            self.created += 1
+        return connection
+
+    def _close(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+        with self._condition:
+            self._size -= 1
+            self.closed += 1
+            self._condition.notify()
+
+    def _is_usable(self, connection, created_at: float) -> bool:
+        if self.recycle is not None and time.monotonic() - created_at > self.recycle:
+            return False
+
+        if self._ping is None:
+            return True
+
+        try:
+            self._ping(connection)
+            return True
+        except Exception:
+            self.health_check_failures += 1
+            return False
+
+    def acquire(self):
+        """
+        Borrow a connection, waiting up to `timeout` seconds for one to become free. Raises
+        `ConnectionError` once the pool is closed.
+
+        Returns:
+            tuple: The connection and the time it was opened, to hand back to `release`.
+        """
+        start = time.monotonic()
+        deadline = None if self.timeout is None else start + self.timeout
+
+        while True:
+            with self._condition:
+                while not self._closed and not self._idle and self._size >= self.max_size:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        self.timeouts += 1
+                        raise ConnectionError(
+                            f"Timed out after {self.timeout}s "
+                            "waiting for a connection from the pool"
+                        )
+                    self._condition.wait(remaining)
+
+                if self._closed:
+                    raise ConnectionError("The connection pool is closed")
+
+                entry = self._idle.pop() if self._idle else None
+                if entry is None:
+                    # Reserve the slot before connecting so other threads respect max_size
+                    self._size += 1
+
+            if entry is None:
+                try:
+                    connection = self._connect()
+                except Exception:
+                    with self._condition:
+                        self._size -= 1
+                        self._condition.notify()
+                    raise
+
+                with self._condition:
+                    self.created += 1
+                entry = (connection, time.monotonic())
+            elif not self._is_usable(*entry):
+                self._close(entry[0])
+                continue
+
+            waited = time.monotonic() - start
+            with self._condition:
+                self.borrows += 1
+                self.wait_time_total += waited
+                self.wait_time_max = max(self.wait_time_max, waited)
+
+            return entry
+
+    def release(self, entry, discard: bool = False):
+        """
+        Hand a borrowed connection back to the pool. Pass `discard=True` if the connection is
+        broken. Once the pool is closed, the connection is closed instead.
+        """
+        connection, created_at = entry
+        discard = discard or self._closed
+
+        if not discard:
+            try:
+                # Never hand an open transaction to the next borrower
+                connection.rollback()
+            except Exception:
+                discard = True
+
+        if discard:
+            self._close(connection)
+            return
+
+        with self._condition:
+            if not self._closed:
+                self._idle.append((connection, created_at))
+                self._condition.notify()
+                return
+
+        self._close(connection)
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager that borrows a connection and releases it afterwards.
+
+        **Example:**
+        ```python
+        with pool.connection() as conn:
+            cs = conn.cursor()
+            cs.execute("SELECT 1")
+        ```
+        """
+        entry = self.acquire()
+        try:
+            yield entry[0]
+        except BaseException:
+            self.release(entry, discard=not self._is_alive(entry[0]))
+            raise
+        else:
+            self.release(entry)
+
+    def _is_alive(self, connection) -> bool:
+        # psycopg2 exposes `closed` as an int, pymysql as `open`
+        if getattr(connection, "closed", 0):
+            return False
+        return getattr(connection, "open", True)
+
+    def close(self):
+        """
+        Close every idle connection and stop lending connections: `acquire` raises `ConnectionError`
+        from now on, including in threads already waiting for a connection. Connections that are
+        borrowed are closed when they are released.
+        """
+        with self._condition:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._condition.notify_all()
+
+        for connection, _ in idle:
+            self._close(connection)
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "borrows": self.borrows,
+                "timeouts": self.timeouts,
+                "created": self.created,
+                "closed": self.closed,
+                "health_check_failures": self.health_check_failures,
+                "wait_time_total": self.wait_time_total,
+                "wait_time_max": self.wait_time_max,
+                "wait_time_avg": self.wait_time_total / self.borrows if self.borrows else 0.0,
+            }
@@ -0,0 +1,103 @@
+import json
+import sqlite3
+import threading
+from typing import List, Union
+
+from ..utils import LRUCache, deterministic_uuid
+
+
+class EmbeddingCache:
+    """
+    Two-tier cache for embeddings, shared by every vector store backend through
+    [`VannaBase.generate_embedding`][vanna.base.base.VannaBase.generate_embedding].
+
+    Entries are keyed on the embedding model name plus `deterministic_uuid(text)`. The first tier is
+    a bounded in-memory LRU. The optional second tier is a SQLite file on local disk, so embeddings
+    survive restarts and can be shared by several processes on the same host.
+
+    Args:
+        max_size (int): Maximum number of embeddings kept in memory. Defaults to 1024.
+        path (str): Path of the SQLite file used as the on-disk tier. Defaults to None, which
+            disables the disk tier.
+    """
+
+    def __init__(self, max_size: int = 1024, path: Union[str, None] = None):
+        self.memory = LRUCache(max_size=max_size)
+        self.path = path
+        self.disk_hits = 0
+        self._disk = None
+        self._disk_lock = threading.Lock()
+
+        if path is not None:
+            self._disk = sqlite3.connect(path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings "
+                "(key TEXT PRIMARY KEY, embedding TEXT NOT NULL)"
+            )
+            self._disk.commit()
+
+    @staticmethod
+    def key(model_name: str, data: str) -> str:
+        return f"{model_name}:{deterministic_uuid(data)}"
+
+    @property
+    def hits(self) -> int:
+        return self.memory.hits + self.disk_hits
+
+    @property
+    def misses(self) -> int:
+        # A disk hit is first counted as a miss of the memory tier
+        return self.memory.misses - self.disk_hits
+
+    def get(self, model_name: str, data: str) -> Union[List[float], None]:
+        key = self.key(model_name, data)
+
+        embedding = self.memory.get(key)
+        if embedding is not None or self._disk is None:
+            return embedding
+
+        with self._disk_lock:
+            row = self._disk.execute(
+                "SELECT embedding FROM embeddings WHERE key = ?", (key,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        self.disk_hits += 1
+        embedding = json.loads(row[0])
+        self.memory.set(key, embedding)
+        return embedding
+
+    def set(self, model_name: str, data: str, embedding: List[float]) -> None:
+        key = self.key(model_name, data)
+        self.memory.set(key, embedding)
+
+        if self._disk is not None:
+            with self._disk_lock:
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO embeddings (key, embedding) VALUES (?, ?)",
+                    (key, json.dumps([float(x) for x in embedding])),
+                )
+                self._disk.commit()
+
+    def clear(self) -> None:
+        self.memory.clear()
+
+        if self._disk is not None:
+            with self._disk_lock:
+                self._disk.execute("DELETE FROM embeddings")
+                self._disk.commit()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.memory),
+            "max_size": self.memory.max_size,
+            "hits": self.hits,
+            "memory_hits": self.memory.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.memory.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,126 @@
+from typing import Iterator, List, Union
+
+import pandas as pd
+
+DEFAULT_CHUNK_SIZE = 10000
+
+
+def arrow_to_df(table) -> pd.DataFrame:
+    """
+    Convert a `pyarrow.Table` (or anything exposing `to_pandas`) into a DataFrame backed by Arrow
+    memory.
+
+    The columns use `pd.ArrowDtype`, so the Arrow buffers are reused instead of being copied into
+    NumPy arrays.
+    """
+    try:
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+    except (AttributeError, TypeError):
+        # Older pandas versions don't have ArrowDtype
+        return table.to_pandas()
+
+
+def iter_fetch(
+    cursor, chunk_size: int = DEFAULT_CHUNK_SIZE, columns: Union[List[str], None] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield the rows of an executed DB-API cursor as DataFrames of at most `chunk_size` rows, using
+    `fetchmany`.
+
+    Args:
+        cursor (any): A DB-API cursor on which `execute` has been called.
+        chunk_size (int): Number of rows per chunk. Defaults to 10000.
+        columns (List[str]): Column names. Defaults to the names in `cursor.description`.
+    """
+    empty = True
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+
+        # Server-side cursors only fill in the description after the first fetch
+        if columns is None:
+            columns = [desc[0] for desc in cursor.description]
+
+        if not rows:
+            break
+
+        empty = False
+        yield pd.DataFrame(rows, columns=columns)
+
+    if empty:
+        yield pd.DataFrame([], columns=columns)
+
+
+def iter_arrow_batches(reader, arrow_backed: bool = True) -> Iterator[pd.DataFrame]:
+    """
+    Yield the record batches of a `pyarrow.RecordBatchReader` as DataFrames.
+
+    Args:
+        reader (pyarrow.RecordBatchReader): The reader to consume.
+        arrow_backed (bool): Keep the Arrow buffers with `pd.ArrowDtype` columns instead of
+            converting to NumPy.
+    """
+    empty = True
+    for batch in reader:
+        empty = False
+        yield arrow_to_df(batch) if arrow_backed else batch.to_pandas()
+
+    if empty:
+        table = reader.schema.empty_table()
+        yield arrow_to_df(table) if arrow_backed else table.to_pandas()
+
+
+def limit_chunks(
+    chunks: Iterator[pd.DataFrame], max_rows: Union[int, None] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Pass chunks through until `max_rows` rows have been yielded, then close the underlying iterator
+    so the database cursor is released without reading the remaining rows.
+    """
+    if max_rows is None:
+        yield from chunks
+        return
+
+    remaining = max_rows
+    try:
+        for chunk in chunks:
+            if len(chunk) >= remaining:
+                yield chunk.iloc[:remaining]
+                return
+
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def concat_chunks(chunks: Iterator[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenate DataFrame chunks into a single DataFrame.
+
+    Every chunk is kept until they are concatenated, so memory peaks at about twice the size of the
+    result. Consume the chunks one at a time, e.g. through
+    [`run_sql_stream`][vanna.base.base.VannaBase.run_sql_stream], to keep memory bounded.
+    """
+    chunks = list(chunks)
+    if len(chunks) == 1:
+        return chunks[0]
+
+    return pd.concat(chunks, ignore_index=True)
+
+
+def fetch_df(
+    cursor, chunk_size: int = DEFAULT_CHUNK_SIZE, columns: Union[List[str], None] = None
+) -> pd.DataFrame:
+    """
+    Read every row of an executed DB-API cursor into a DataFrame.
+
+    Rows are fetched with `fetchmany` and the chunks are concatenated at the end, so this doesn't
+    lower peak memory compared to `fetchall`: about twice the size of the result is held while
+    concatenating. Whether rows come from the server in chunks at all depends on the cursor;
+    client-side cursors, such as the default psycopg2 cursor, have already buffered the whole result
+    when `execute` returns. Use [`iter_fetch`][vanna.base.fetch.iter_fetch] on a server-side cursor
+    to keep memory bounded.
+    """
+    return concat_chunks(iter_fetch(cursor, chunk_size=chunk_size, columns=columns))
@@ -0,0 +1,190 @@
+import hashlib
+import math
+import re
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import List, Tuple
+
+from ..exceptions import DependencyError
+from ..utils import LRUCache
+
+
+def document_text(document) -> str:
+    """
+    Text of a retrieved item: question/SQL pairs are dicts, DDL and documentation are strings.
+    """
+    if isinstance(document, dict):
+        return " ".join(str(value) for value in document.values() if value is not None)
+    return str(document)
+
+
+class Reranker(ABC):
+    """
+    Define the interface for the reranking stage that
+    [`VannaBase.get_related_context`][vanna.base.base.VannaBase.get_related_context] results go
+    through before they are put in the prompt.
+    """
+
+    @abstractmethod
+    def score(self, query: str, documents: List[str]) -> List[float]:
+        """
+        Score how relevant each document is to the query. Higher is more relevant.
+
+        Args:
+            query (str): The question.
+            documents (List[str]): The candidate texts, in the order the vector store returned them.
+        """
+        pass
+
+    def rerank(self, query: str, documents: list, top_k: int) -> list:
+        """
+        Keep the `top_k` most relevant of the retrieved items, most relevant first.
+        """
+        if len(documents) <= 1:
+            return list(documents)[:top_k]
+
+        scores = self.score(query, [document_text(document) for document in documents])
+        return self._top_k(documents, scores, top_k)
+
+    def rerank_groups(self, query: str, groups: List[Tuple[list, int]]) -> List[list]:
+        """
+        Rerank several lists of retrieved items (question/SQL pairs, DDL, documentation) for the
+        same query, each with its own `top_k`.
+        """
+        return [self.rerank(query, documents, top_k) for documents, top_k in groups]
+
+    @staticmethod
+    def _top_k(documents: list, scores: List[float], top_k: int) -> list:
+        order = sorted(range(len(documents)), key=lambda i: scores[i], reverse=True)
+        return [documents[i] for i in order[:top_k]]
+
+
+class CrossEncoderReranker(Reranker):
+    """
+    Rerank with a local cross-encoder from sentence-transformers, which reads the question and each
+    candidate together and is more accurate than the bi-encoder distance the vector store ranked by.
+
+    Pairs are scored in batches of `batch_size`, and scores are kept in an LRU cache so candidates
+    that come back for a repeated question aren't scored again.
+
+    Args:
+        model_name (str): Cross-encoder model. Defaults to "cross-encoder/ms-marco-MiniLM-L-6-v2".
+        batch_size (int): Number of pairs per forward pass. Defaults to 32.
+        cache_size (int): Number of cached (question, candidate) scores. Defaults to 4096.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+        batch_size: int = 32,
+        cache_size: int = 4096,
+    ):
+        try:
+            from sentence_transformers import CrossEncoder
+        except ImportError:
+            raise DependencyError(
+                "SentenceTransformer is not installed. "
+                "Please install it with 'pip install sentence-transformers'."
+            )
+
+        self.model = CrossEncoder(model_name)
+        self.batch_size = batch_size
+        self.cache = LRUCache(max_size=cache_size)
+
+    @staticmethod
+    def _key(query: str, document: str) -> str:
+        return hashlib.sha256(f"{query}\x00{document}".encode("utf-8")).hexdigest()
+
+    def score(self, query: str, documents: List[str]) -> List[float]:
+        keys = [self._key(query, document) for document in documents]
+        scores = [self.cache.get(key) for key in keys]
+
+        missing = [i for i, score in enumerate(scores) if score is None]
+        if missing:
+            predicted = self.model.predict(
+                [(query, documents[i]) for i in missing],
+                batch_size=self.batch_size,
+                show_progress_bar=False,
+            )
+            for i, score in zip(missing, predicted):
+                scores[i] = float(score)
+                self.cache.set(keys[i], scores[i])
+
+        return scores
+
+    def rerank_groups(self, query: str, groups: List[Tuple[list, int]]) -> List[list]:
+        # Cross-encoder scores don't depend on the other candidates, so all groups share one batched
+        # scoring pass
+        texts = [document_text(document) for documents, _ in groups for document in documents]
+        scores = self.score(query, texts) if texts else []
+
+        results, start = [], 0
+        for documents, top_k in groups:
+            results.append(self._top_k(documents, scores[start:start + len(documents)], top_k))
+            start += len(documents)
+        return results
+
+
+class HybridReranker(Reranker):
+    """
+    Rerank without a model by fusing the vector store's ranking with a BM25 keyword ranking over the
+    candidates, using reciprocal rank fusion. Identifiers such as table and column names match
+    exactly under BM25, which the embedding distance tends to blur.
+
+    Args:
+        k (int): Reciprocal rank fusion constant. Defaults to 60.
+        bm25_weight (float): Weight of the BM25 ranking; the vector ranking gets `1 - bm25_weight`.
+            Defaults to 0.6, so that where the two rankings disagree, the keyword evidence breaks
+            the tie.
+        k1 (float): BM25 term frequency saturation. Defaults to 1.5.
+        b (float): BM25 length normalization. Defaults to 0.75.
+    """
+
+    def __init__(self, k: int = 60, bm25_weight: float = 0.6, k1: float = 1.5, b: float = 0.75):
+        self.k = k
+        self.bm25_weight = bm25_weight
+        self.k1 = k1
+        self.b = b
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        # snake_case identifiers count both as a whole and by their parts
+        tokens = re.findall(r"\w+", text.lower())
+        return tokens + [
+            part for token in tokens if "_" in token for part in token.split("_") if part
+        ]
+
+    def bm25(self, query: str, documents: List[str]) -> List[float]:
+        tokenized = [Counter(self.tokenize(document)) for document in documents]
+        lengths = [sum(counts.values()) for counts in tokenized]
+        average_length = sum(lengths) / len(lengths) or 1.0
+
+        scores = [0.0] * len(documents)
+        for term in set(self.tokenize(query)):
+            frequency = sum(1 for counts in tokenized if term in counts)
+            if frequency == 0:
+                continue
+
+            idf = math.log(1 + (len(documents) - frequency + 0.5) / (frequency + 0.5))
+            for i, counts in enumerate(tokenized):
+                tf = counts.get(term, 0)
+                if tf:
+                    norm = self.k1 * (1 - self.b + self.b * lengths[i] / average_length)
+                    scores[i] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores
+
+    def score(self, query: str, documents: List[str]) -> List[float]:
+        bm25 = self.bm25(query, documents)
+        bm25_rank = {
+            i: rank
+            for rank, i in enumerate(
+                sorted(range(len(documents)), key=lambda i: bm25[i], reverse=True)
+            )
+        }
+
+        # The documents arrive in vector-distance order
+        return [
+            self.bm25_weight / (self.k + bm25_rank[i] + 1)
+            + (1 - self.bm25_weight) / (self.k + i + 1)
+            for i in range(len(documents))
+        ]
@@ -0,0 +1,190 @@
+import hashlib
+import json
+import re
+import threading
+from abc import ABC, abstractmethod
+from typing import List, Union
+
+import numpy as np
+
+from ..utils import LRUCache
+
+
+class ResponseCache(ABC):
+    """
+    Define the interface for a cache of LLM responses used by
+    [`VannaBase.submit_prompt`][vanna.base.base.VannaBase.submit_prompt].
+    """
+
+    @abstractmethod
+    def get(self, prompt, embedding: Union[List[float], None] = None) -> Union[str, None]:
+        """
+        Get the cached response for a prompt, or None if there is no usable entry.
+
+        Args:
+            prompt (any): The prompt that is about to be submitted to the LLM.
+            embedding (List[float]): The embedding of the prompt's question, used for semantic
+                lookups.
+        """
+        pass
+
+    @abstractmethod
+    def set(self, prompt, response: str, embedding: Union[List[float], None] = None):
+        """
+        Store the response the LLM returned for a prompt.
+        """
+        pass
+
+    @abstractmethod
+    def clear(self):
+        """
+        Remove every entry, e.g. because the training data changed.
+        """
+        pass
+
+    @property
+    def needs_embedding(self) -> bool:
+        """
+        Whether `get` and `set` make use of the question embedding.
+        """
+        return False
+
+
+def _normalize_content(content):
+    if isinstance(content, str):
+        return re.sub(r"\s+", " ", content).strip()
+    if isinstance(content, dict):
+        return {key: _normalize_content(value) for key, value in content.items()}
+    if isinstance(content, (list, tuple)):
+        return [_normalize_content(value) for value in content]
+    return content
+
+
+def prompt_hash(prompt) -> str:
+    """
+    Hash of a prompt (a message list or a plain string) with whitespace normalized.
+    """
+    normalized = json.dumps(
+        _normalize_content(prompt), sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def split_prompt(prompt):
+    """
+    Split a message list into its context (every message except the last one) and the trailing
+    question. Returns (None, None) if the prompt isn't a message list ending with a user message.
+    """
+    if not isinstance(prompt, list) or len(prompt) == 0:
+        return None, None
+
+    question = prompt[-1]
+    if not isinstance(question, dict) or question.get("role") != "user":
+        return None, None
+
+    return prompt[:-1], question.get("content")
+
+
+class MemoryResponseCache(ResponseCache):
+    """
+    In-memory response cache with LRU and TTL eviction.
+
+    An exact hit is served when the normalized message list was seen before. If
+    `similarity_threshold` is set, a semantic hit is also served when the context messages (system
+    prompt with the retrieved DDL/documentation, and the example question-SQL pairs) are unchanged
+    and the cosine similarity between the question embeddings is at least the threshold.
+
+    Args:
+        max_size (int): Maximum number of responses to keep. Defaults to 256.
+        ttl (float): Number of seconds a response stays valid. Defaults to 3600.
+        similarity_threshold (float): Minimum cosine similarity for a semantic hit, e.g. 0.95.
+            Defaults to None, which only serves exact hits.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 256,
+        ttl: Union[float, None] = 3600,
+        similarity_threshold: Union[float, None] = None,
+    ):
+        self.responses = LRUCache(max_size=max_size, ttl=ttl)
+        self.similarity_threshold = similarity_threshold
+        self.semantic_hits = 0
+        self._questions = {}
+        self._lock = threading.Lock()
+
+    @property
+    def needs_embedding(self) -> bool:
+        return self.similarity_threshold is not None
+
+    def get(self, prompt, embedding: Union[List[float], None] = None) -> Union[str, None]:
+        response = self.responses.get(prompt_hash(prompt))
+        if response is not None or embedding is None or self.similarity_threshold is None:
+            return response
+
+        context, _ = split_prompt(prompt)
+        if context is None:
+            return None
+
+        with self._lock:
+            candidates = list(self._questions.get(prompt_hash(context), []))
+
+        query = np.asarray(embedding, dtype=np.float32)
+        query_norm = np.linalg.norm(query)
+        if query_norm == 0:
+            return None
+
+        best_key, best_similarity = None, self.similarity_threshold
+        for key, candidate in candidates:
+            if key not in self.responses or candidate.shape != query.shape:
+                continue
+
+            similarity = float(np.dot(query, candidate) / (query_norm * np.linalg.norm(candidate)))
+            if similarity >= best_similarity:
+                best_key, best_similarity = key, similarity
+
+        if best_key is None:
+            return None
+
+        response = self.responses.get(best_key)
+        if response is not None:
+            self.semantic_hits += 1
+
+        return response
+
+    def set(self, prompt, response: str, embedding: Union[List[float], None] = None):
+        if response is None:
+            return
+
+        key = prompt_hash(prompt)
+        self.responses.set(key, response)
+
+        if embedding is None or self.similarity_threshold is None:
+            return
+
+        context, _ = split_prompt(prompt)
+        if context is None:
+            return
+
+        with self._lock:
+            # Drop entries whose response was evicted so the semantic index stays bounded
+            questions = [
+                (existing_key, candidate)
+                for existing_key, candidate in self._questions.get(prompt_hash(context), [])
+                if existing_key != key and existing_key in self.responses
+            ]
+            questions.append((key, np.asarray(embedding, dtype=np.float32)))
+            self._questions[prompt_hash(context)] = questions
+
+            for context_key in [
+                k for k, v in self._questions.items() if not any(q in self.responses for q, _ in v)
+            ]:
+                del self._questions[context_key]
+
+    def clear(self):
+        self.responses.clear()
+        with self._lock:
+            self._questions.clear()
+
+    def stats(self) -> dict:
+        return {**self.responses.stats(), "semantic_hits": self.semantic_hits}
@@ -0,0 +1,276 @@
+import re
+from typing import List, Union
+
+import sqlparse
+from sqlparse import sql as sql_tokens
+from sqlparse import tokens as T
+
+from ..utils import LRUCache, deterministic_uuid
+
+# Words that end the type of a column definition and start its constraints
+_COLUMN_CONSTRAINTS = {
+    "NOT", "NULL", "DEFAULT", "PRIMARY", "REFERENCES", "UNIQUE", "CHECK", "CONSTRAINT", "COLLATE",
+    "GENERATED", "AUTO_INCREMENT", "AUTOINCREMENT", "IDENTITY", "COMMENT", "ON", "AS", "ENCODE",
+    "MASKING",
+}
+_TABLE_CONSTRAINTS = (
+    "CONSTRAINT", "PRIMARY", "FOREIGN", "UNIQUE", "CHECK", "INDEX", "KEY", "EXCLUDE", "FULLTEXT",
+    "SPATIAL",
+)
+
+_INFORMATION_SCHEMA_DOC = re.compile(
+    r"^The following columns are in the (?P<table>.+?) table in the (?P<database>.+?) database:"
+    r"\s*\n(?P<markdown>\|.*)",
+    re.DOTALL,
+)
+
+
+def _unquote(name: str) -> str:
+    return ".".join(
+        part.strip('`"[]') for part in re.findall(r'"[^"]*"|`[^`]*`|\[[^\]]*\]|[^.\s]+', name)
+    )
+
+
+def _names(text: str) -> List[str]:
+    return [_unquote(name.strip()) for name in text.split(",") if name.strip()]
+
+
+def _split_definitions(parenthesis: sql_tokens.Parenthesis) -> List[str]:
+    # Only commas at the top level separate definitions; those inside e.g. DECIMAL(10, 2) don't
+    definitions, current, depth = [], [], 0
+    for token in parenthesis.flatten():
+        if token.match(T.Punctuation, "("):
+            depth += 1
+            if depth == 1:
+                continue
+        elif token.match(T.Punctuation, ")"):
+            depth -= 1
+            if depth == 0:
+                break
+        elif depth == 1 and token.match(T.Punctuation, ","):
+            definitions.append("".join(current))
+            current = []
+            continue
+        elif token.ttype in T.Comment:
+            # Definitions are joined onto one line, where a `--` comment would swallow everything
+            # after it
+            current.append(" ")
+            continue
+        current.append(str(token))
+    definitions.append("".join(current))
+    return [" ".join(definition.split()) for definition in definitions if definition.strip()]
+
+
+def _table_and_columns(statement: sql_tokens.Statement):
+    """
+    The table name and the parenthesized column definitions of a CREATE TABLE statement, or
+    (None, None).
+    """
+    if statement.get_type() != "CREATE":
+        return None, None
+
+    tokens = [token for token in statement.tokens if not token.is_whitespace]
+    keywords = [token.normalized for token in tokens if token.ttype in T.Keyword]
+    if "TABLE" not in keywords:
+        return None, None
+
+    table = None
+    for token in tokens:
+        if isinstance(token, sql_tokens.Function):
+            # CREATE TABLE orders(id INT, ...) without a space parses as a function call
+            parenthesis = next(
+                (t for t in token.tokens if isinstance(t, sql_tokens.Parenthesis)), None
+            )
+            return _unquote(token.get_name() or str(token.tokens[0])), parenthesis
+        if isinstance(token, sql_tokens.Identifier) and table is None:
+            table = _unquote(str(token))
+        elif isinstance(token, sql_tokens.Parenthesis) and table is not None:
+            return table, token
+    return None, None
+
+
+def _compact_create_table(table: str, definitions: List[str]) -> Union[str, None]:
+    columns, primary_key, foreign_keys, table_foreign_keys = [], set(), {}, []
+
+    for definition in definitions:
+        words = definition.split()
+        first = words[0].upper()
+
+        if first in _TABLE_CONSTRAINTS:
+            if first == "CONSTRAINT":
+                definition = " ".join(words[2:])
+
+            match = re.match(r"PRIMARY\s+KEY\s*\(([^)]*)\)", definition, re.IGNORECASE)
+            if match:
+                primary_key.update(_names(match.group(1)))
+
+            match = re.match(
+                r"FOREIGN\s+KEY\s*\(([^)]*)\)\s*REFERENCES\s+([^\s(]+)\s*\(([^)]*)\)",
+                definition,
+                re.IGNORECASE,
+            )
+            if match:
+                local, target, remote = (
+                    _names(match.group(1)),
+                    _unquote(match.group(2)),
+                    _names(match.group(3)),
+                )
+                if len(local) == 1:
+                    foreign_keys[local[0]] = f"{target}.{remote[0] if remote else local[0]}"
+                else:
+                    table_foreign_keys.append(
+                        f"FK({', '.join(local)})->{target}({', '.join(remote)})"
+                    )
+            continue
+
+        name = _unquote(words[0])
+        type_words = []
+        for word in words[1:]:
+            if word.upper() in _COLUMN_CONSTRAINTS:
+                break
+            type_words.append(word)
+
+        if re.search(r"\bPRIMARY\s+KEY\b", definition, re.IGNORECASE):
+            primary_key.add(name)
+
+        match = re.search(r"\bREFERENCES\s+([^\s(]+)\s*(?:\(([^)]*)\))?", definition, re.IGNORECASE)
+        if match:
+            remote = _names(match.group(2) or "")
+            foreign_keys[name] = f"{_unquote(match.group(1))}.{remote[0] if remote else name}"
+
+        column_type = " ".join(type_words)
+        match = re.search(r"\bCOMMENT\s+'((?:[^']|'')*)'", definition, re.IGNORECASE)
+        if match:
+            column_type += f" /* {match.group(1)} */"
+
+        columns.append((name, column_type))
+
+    if not columns:
+        return None
+
+    parts = []
+    for name, column_type in columns:
+        part = f"{name} {column_type}".strip()
+        if name in primary_key:
+            part += " PK"
+        if name in foreign_keys:
+            part += f" FK->{foreign_keys[name]}"
+        parts.append(part)
+
+    return f"{table}({', '.join(parts + table_foreign_keys)})"
+
+
+def compact_ddl(ddl: str) -> str:
+    """
+    Rewrite the CREATE TABLE statements in `ddl` as `table(col type, ...)`, keeping only the primary
+    and foreign keys of the constraints. Columns are marked `PK` and `FK->table.column`; SQL
+    comments inside the column list are dropped, `COMMENT '...'` clauses are kept as `/* ... */`.
+    Statements other than CREATE TABLE, and statements that can't be parsed, are kept as they are.
+
+    Example:
+    ```python
+    compact_ddl(
+        "CREATE TABLE orders "
+        "(id INT NOT NULL PRIMARY KEY, customer_id INT REFERENCES customers(id))"
+    )
+    # orders(id INT PK, customer_id INT FK->customers.id)
+    ```
+    """
+    compacted = []
+    for statement in sqlparse.parse(ddl):
+        text = str(statement).strip()
+        if not text:
+            continue
+
+        table, parenthesis = _table_and_columns(statement)
+        compact = (
+            _compact_create_table(table, _split_definitions(parenthesis))
+            if parenthesis is not None
+            else None
+        )
+        compacted.append(compact or text)
+
+    return "\n".join(compacted) if compacted else ddl
+
+
+def compact_information_schema_doc(documentation: str) -> str:
+    """
+    Rewrite the markdown column tables of
+    [`get_training_plan_generic`][vanna.base.base.VannaBase.get_training_plan_generic] as
+    `database.schema.table(col type, ...)`, with column comments kept as `/* ... */`. Other
+    documentation is returned as it is.
+    """
+    match = _INFORMATION_SCHEMA_DOC.match(documentation)
+    if match is None:
+        return documentation
+
+    rows = [
+        [cell.strip() for cell in line.strip().strip("|").split("|")]
+        for line in match.group("markdown").splitlines()
+        if line.strip().startswith("|")
+    ]
+    if len(rows) < 3:
+        return documentation
+
+    header = [cell.lower() for cell in rows[0]]
+
+    def position(*names):
+        return next((i for i, cell in enumerate(header) for name in names if name in cell), None)
+
+    column, data_type, comment, schema = (
+        position("column_name"),
+        position("data_type"),
+        position("comment"),
+        position("table_schema"),
+    )
+    if column is None:
+        return documentation
+
+    parts = []
+    for row in rows[2:]:
+        if len(row) != len(header):
+            return documentation
+        part = f"{row[column]} {row[data_type] if data_type is not None else ''}".strip()
+        if comment is not None and row[comment] not in ("", "nan", "None"):
+            part += f" /* {row[comment]} */"
+        parts.append(part)
+
+    table = match.group("table")
+    if schema is not None and rows[2][schema] not in ("", "nan", "None"):
+        table = f"{rows[2][schema]}.{table}"
+    return f"{match.group('database')}.{table}({', '.join(parts)})"
+
+
+class SchemaCompactor:
+    """
+    Compaction stage for the schema context that goes into prompts: DDL is rewritten with
+    [`compact_ddl`][vanna.base.schema_compaction.compact_ddl] and the information schema
+    documentation with
+    [`compact_information_schema_doc`][vanna.base.schema_compaction.compact_information_schema_doc].
+
+    Results are cached under the same content-derived id the vector stores give the training data,
+    so each DDL is parsed once.
+
+    Args:
+        cache_size (int): Number of cached compacted texts. Defaults to 4096.
+    """
+
+    def __init__(self, cache_size: int = 4096):
+        self.cache = LRUCache(max_size=cache_size)
+
+    def _cached(self, kind: str, text: str, compact) -> str:
+        key = f"{deterministic_uuid(text)}-{kind}"
+        compacted = self.cache.get(key)
+        if compacted is None:
+            try:
+                compacted = compact(text)
+            except Exception:
+                compacted = text
+            self.cache.set(key, compacted)
+        return compacted
+
+    def compact_ddl(self, ddl: str) -> str:
+        return self._cached("ddl", ddl, compact_ddl)
+
+    def compact_documentation(self, documentation: str) -> str:
+        return self._cached("doc", documentation, compact_information_schema_doc)
@@ -0,0 +1,202 @@
+import logging
+import math
+from typing import Callable, Dict, List, Union
+
+from ..exceptions import DependencyError
+from ..utils import LRUCache
+
+# Share of the SQL prompt budget the question/SQL examples may take unless `prompt_section_budgets`
+# says otherwise, so they can't crowd out the DDL
+DEFAULT_EXAMPLES_SHARE = 0.25
+
+
+class TokenCounter:
+    """
+    Count tokens with a model's tokenizer, caching the count of every text it has seen so DDL,
+    documentation and question/SQL pairs that come back for later questions aren't tokenized again.
+
+    Without an `encode` function the count falls back to the `len(text) / 4` approximation.
+
+    Args:
+        encode (Callable[[str], list]): Turns a text into its token ids.
+        cache_size (int): Number of cached counts. Defaults to 4096.
+        max_cached_chars (int): Longer texts, such as whole assembled prompts, are counted without
+            being cached. Defaults to 20000.
+    """
+
+    def __init__(
+        self,
+        encode: Union[Callable[[str], list], None] = None,
+        cache_size: int = 4096,
+        max_cached_chars: int = 20000,
+    ):
+        self.encode = encode
+        self.cache = LRUCache(max_size=cache_size)
+        self.max_cached_chars = max_cached_chars
+
+    @property
+    def approximate(self) -> bool:
+        return self.encode is None
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+
+        cacheable = len(text) <= self.max_cached_chars
+        tokens = self.cache.get(text) if cacheable else None
+        if tokens is None:
+            tokens = len(self.encode(text)) if self.encode is not None else math.ceil(len(text) / 4)
+            if cacheable:
+                self.cache.set(text, tokens)
+        return tokens
+
+    @classmethod
+    def from_tokenizer(cls, tokenizer, cache_size: int = 4096) -> "TokenCounter":
+        """
+        Wrap an already loaded tokenizer: a Hugging Face tokenizer (as loaded by `Hf` and
+        `ModeloAMB`), a tiktoken encoding, or anything else with an `encode` method.
+        """
+        module = type(tokenizer).__module__ or ""
+        if module.startswith("tiktoken"):
+            # Text that happens to contain e.g. "<|endoftext|>" is counted as plain text instead of
+            # raising
+            return cls(
+                lambda text: tokenizer.encode(text, disallowed_special=()), cache_size=cache_size
+            )
+        if module.startswith("transformers"):
+            return cls(
+                lambda text: tokenizer.encode(text, add_special_tokens=False), cache_size=cache_size
+            )
+        return cls(tokenizer.encode, cache_size=cache_size)
+
+    @classmethod
+    def from_tiktoken(cls, name: str, cache_size: int = 4096) -> "TokenCounter":
+        """
+        Use the tiktoken encoding `name`, which is either an encoding ("cl100k_base", "o200k_base")
+        or a model name.
+        """
+        try:
+            import tiktoken
+        except ImportError:
+            raise DependencyError(
+                "tiktoken is not installed. Please install it with 'pip install tiktoken'."
+            )
+
+        try:
+            encoding = tiktoken.get_encoding(name)
+        except ValueError:
+            encoding = tiktoken.encoding_for_model(name)
+        return cls.from_tokenizer(encoding, cache_size=cache_size)
+
+
+def resolve_token_counter(
+    tokenizer=None,
+    loaded_tokenizer=None,
+    model: Union[str, None] = None,
+    cache_size: int = 4096,
+) -> TokenCounter:
+    """
+    Pick the tokenizer prompts are measured with, in order of preference:
+
+    1. `tokenizer` from the config: a tokenizer object, or a tiktoken encoding or model name.
+    2. The tokenizer the LLM class already loaded (`Hf`, `ModeloAMB`).
+    3. The tiktoken encoding of `model`, if tiktoken is installed and knows the model.
+    4. The `len(text) / 4` approximation.
+
+    tiktoken downloads an encoding the first time it is used; when that fails, e.g. offline, the
+    approximation is used instead of failing every prompt.
+    """
+    if tokenizer is not None:
+        if isinstance(tokenizer, str):
+            return _tiktoken_counter(tokenizer, cache_size)
+        return TokenCounter.from_tokenizer(tokenizer, cache_size=cache_size)
+
+    if loaded_tokenizer is not None and hasattr(loaded_tokenizer, "encode"):
+        return TokenCounter.from_tokenizer(loaded_tokenizer, cache_size=cache_size)
+
+    if isinstance(model, str):
+        try:
+            return _tiktoken_counter(model, cache_size)
+        except (DependencyError, KeyError):
+            pass
+
+    return TokenCounter(cache_size=cache_size)
+
+
+def _tiktoken_counter(name: str, cache_size: int) -> TokenCounter:
+    # A missing tiktoken or an unknown name still raises; failing to load a known encoding falls
+    # back to len / 4
+    try:
+        return TokenCounter.from_tiktoken(name, cache_size=cache_size)
+    except (DependencyError, KeyError):
+        raise
+    except Exception as e:
+        logging.warning(
+            f"Could not load the tiktoken encoding for {name!r}, approximating token counts: {e}"
+        )
+        return TokenCounter(cache_size=cache_size)
+
+
+class TokenBudget:
+    """
+    Running token total of a prompt being assembled. Items are added only while they fit in
+    `max_tokens`, and each item is counted once, so filling a section is linear in the number of
+    items.
+
+    Args:
+        count (Callable[[str], int]): Counts the tokens of a piece of text, e.g.
+            `TokenCounter.count`.
+        max_tokens (int): Size of the budget.
+        used (int): Tokens already spent, e.g. by the initial prompt.
+    """
+
+    def __init__(self, count: Callable[[str], int], max_tokens: int, used: int = 0):
+        self.count = count
+        self.max_tokens = max_tokens
+        self.used = used
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.max_tokens - self.used)
+
+    def fits(self, tokens: int) -> bool:
+        return self.used + tokens <= self.max_tokens
+
+    def spend(self, text: str) -> int:
+        tokens = self.count(text)
+        self.used += tokens
+        return tokens
+
+    def try_spend(self, text: str) -> bool:
+        """
+        Spend the tokens of `text` if it fits in the budget, and report whether it did.
+        """
+        tokens = self.count(text)
+        if not self.fits(tokens):
+            return False
+        self.used += tokens
+        return True
+
+
+def section_limits(
+    available: int,
+    sections: List[str],
+    shares: Union[Dict[str, float], None] = None,
+) -> Dict[str, int]:
+    """
+    Split `available` tokens between prompt sections. `shares` maps a section to a fraction of
+    `available` (values up to 1) or an absolute token count (values above 1). Sections without a
+    share can use everything that is left, so with no shares every section may use the whole budget,
+    first come first served.
+    """
+    shares = shares or {}
+    limits = {}
+    for section in sections:
+        share = shares.get(section, None)
+        if share is None:
+            limits[section] = available
+        elif share <= 1:
+            limits[section] = int(available * share)
+        else:
+            limits[section] = min(available, int(share))
+    return limits
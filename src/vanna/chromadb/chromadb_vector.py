@@ -1,5 +1,5 @@
 import json
-from typing import List
+from typing import List, Tuple
 
 import chromadb
 import pandas as pd
@@ -62,6 +62,9 @@ class ChromaDB_VectorStore(VannaBase):
             return embedding[0]
         return embedding
 
+    def generate_embeddings(self, data: List[str], **kwargs) -> List[List[float]]:
+        return list(self.embedding_function(list(data)))
+
     def add_question_sql(self, question: str, sql: str, **kwargs) -> str:
         question_sql_json = json.dumps(
             {
@@ -97,6 +100,34 @@ class ChromaDB_VectorStore(VannaBase):
         )
         return id
 
+    def _add_batch(self, collection, documents: List[str], ids: List[str]) -> List[str]:
+        # Chroma rejects a batch that repeats an id; the ids are derived from the content, so
+        # repeats are duplicates
+        unique = dict(zip(ids, documents))
+        if unique:
+            collection.add(
+                documents=list(unique.values()),
+                embeddings=self.generate_embeddings(list(unique.values())),
+                ids=list(unique.keys()),
+            )
+        return ids
+
+    def add_question_sql_batch(self, question_sql: List[Tuple[str, str]], **kwargs) -> List[str]:
+        documents = [
+            json.dumps({"question": question, "sql": sql}, ensure_ascii=False)
+            for question, sql in question_sql
+        ]
+        ids = [deterministic_uuid(document) + "-sql" for document in documents]
+        return self._add_batch(self.sql_collection, documents, ids)
+
+    def add_ddl_batch(self, ddls: List[str], **kwargs) -> List[str]:
+        ids = [deterministic_uuid(ddl) + "-ddl" for ddl in ddls]
+        return self._add_batch(self.ddl_collection, ddls, ids)
+
+    def add_documentation_batch(self, documentation: List[str], **kwargs) -> List[str]:
+        ids = [deterministic_uuid(doc) + "-doc" for doc in documentation]
+        return self._add_batch(self.documentation_collection, documentation, ids)
+
     def get_training_data(self, **kwargs) -> pd.DataFrame:
         sql_data = self.sql_collection.get()
 
@@ -235,7 +266,7 @@ class ChromaDB_VectorStore(VannaBase):
     def get_similar_question_sql(self, question: str, **kwargs) -> list:
         return ChromaDB_VectorStore._extract_documents(
             self.sql_collection.query(
-                query_texts=[question],
+                query_embeddings=[self.generate_embedding(question)],
                 n_results=self.n_results_sql,
             )
         )
@@ -243,7 +274,7 @@ class ChromaDB_VectorStore(VannaBase):
     def get_related_ddl(self, question: str, **kwargs) -> list:
         return ChromaDB_VectorStore._extract_documents(
             self.ddl_collection.query(
-                query_texts=[question],
+                query_embeddings=[self.generate_embedding(question)],
                 n_results=self.n_results_ddl,
             )
         )
@@ -251,7 +282,7 @@ class ChromaDB_VectorStore(VannaBase):
     def get_related_documentation(self, question: str, **kwargs) -> list:
         return ChromaDB_VectorStore._extract_documents(
             self.documentation_collection.query(
-                query_texts=[question],
+                query_embeddings=[self.generate_embedding(question)],
                 n_results=self.n_results_documentation,
             )
         )
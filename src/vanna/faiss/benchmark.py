@@ -0,0 +1,164 @@
+"""
+Recall-versus-latency benchmark of the approximate FAISS index types against the exact flat index.
+
+```bash
+python -m vanna.faiss.benchmark training_data
+```
+"""
+import glob
+import json
+import os
+import time
+from typing import Dict, List, Union
+
+import numpy as np
+import pandas as pd
+
+from ..exceptions import DependencyError
+from .faiss import build_index, default_nlist, set_search_params
+
+DEFAULT_SETTINGS = [
+    {"index_type": "hnsw", "ef_search": 16},
+    {"index_type": "hnsw", "ef_search": 64},
+    {"index_type": "hnsw", "ef_search": 256},
+    {"index_type": "ivf_flat", "nprobe": 1},
+    {"index_type": "ivf_flat", "nprobe": 8},
+    {"index_type": "ivf_flat", "nprobe": 32},
+    {"index_type": "ivf_pq", "nprobe": 8},
+    {"index_type": "ivf_pq", "nprobe": 32},
+]
+
+
+def load_training_data_questions(path: str = "training_data") -> List[Dict[str, str]]:
+    """
+    Read the question/SQL pairs of every `*/questions.json` file under `path`, e.g. the bundled
+    `training_data` directory.
+    """
+    pairs = []
+    for filename in sorted(glob.glob(os.path.join(path, "*", "questions.json"))):
+        with open(filename, "r") as f:
+            pairs.extend(
+                {"question": item["question"], "sql": item["answer"]} for item in json.load(f)
+            )
+    return pairs
+
+
+def _search_latency(index, queries: np.ndarray, k: int):
+    start = time.perf_counter()
+    _, ids = index.search(queries, k)
+    elapsed = time.perf_counter() - start
+    return ids, elapsed / len(queries) * 1000
+
+
+def benchmark_index_types(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int = 10,
+    settings: Union[List[dict], None] = None,
+) -> pd.DataFrame:
+    """
+    Measure recall@k and per-query latency of approximate indexes against the exact flat index.
+
+    Args:
+        vectors (np.ndarray): float32 corpus of shape (n, dim).
+        queries (np.ndarray): float32 queries of shape (q, dim).
+        k (int): Number of neighbours per query.
+        settings (List[dict]): Index settings to compare: `index_type` plus any of `nlist`,
+            `nprobe`, `hnsw_m`, `ef_construction`, `ef_search`, `pq_m`, `pq_nbits`. Defaults to
+            `DEFAULT_SETTINGS`.
+
+    Returns:
+        pd.DataFrame: One row per setting with the build time, the latency in ms per query and the
+            recall@k.
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    queries = np.ascontiguousarray(queries, dtype=np.float32)
+    dim = vectors.shape[1]
+    k = min(k, len(vectors))
+
+    start = time.perf_counter()
+    flat = build_index(dim, "flat", vectors)
+    flat_build = time.perf_counter() - start
+    truth, flat_latency = _search_latency(flat, queries, k)
+
+    rows = [
+        {
+            "index_type": "flat",
+            "params": "",
+            "build_s": flat_build,
+            "latency_ms": flat_latency,
+            "recall": 1.0,
+        }
+    ]
+
+    for setting in settings or DEFAULT_SETTINGS:
+        setting = dict(setting)
+        index_type = setting.pop("index_type")
+        nprobe = setting.pop("nprobe", None)
+        ef_search = setting.pop("ef_search", None)
+
+        if index_type == "ivf_pq" and dim % setting.get("pq_m", 8) != 0:
+            continue
+        if index_type == "ivf_pq" and len(vectors) < 2 ** setting.get("pq_nbits", 8):
+            continue
+
+        start = time.perf_counter()
+        index = build_index(dim, index_type, vectors, **setting)
+        build = time.perf_counter() - start
+        set_search_params(index, nprobe=nprobe, ef_search=ef_search)
+
+        ids, latency = _search_latency(index, queries, k)
+        hits = sum(
+            len(set(found[found != -1]) & set(expected)) for found, expected in zip(ids, truth)
+        )
+
+        params = {**setting, "nprobe": nprobe, "ef_search": ef_search}
+        if index_type != "hnsw":
+            params.setdefault("nlist", setting.get("nlist") or default_nlist(len(vectors)))
+        rows.append(
+            {
+                "index_type": index_type,
+                "params": ", ".join(
+                    f"{key}={value}" for key, value in params.items() if value is not None
+                ),
+                "build_s": build,
+                "latency_ms": latency,
+                "recall": hits / (len(queries) * k),
+            }
+        )
+
+    return pd.DataFrame(rows)
+
+
+def benchmark_training_data(
+    path: str = "training_data",
+    embedding_model: str = "all-MiniLM-L6-v2",
+    k: int = 10,
+    settings: Union[List[dict], None] = None,
+) -> pd.DataFrame:
+    """
+    Embed the question/SQL pairs of the bundled training data the same way the FAISS store does, and
+    run `benchmark_index_types` with the questions as queries.
+    """
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        raise DependencyError(
+            "SentenceTransformer is not installed. "
+            "Please install it with 'pip install sentence-transformers'."
+        )
+
+    pairs = load_training_data_questions(path)
+    if not pairs:
+        raise ValueError(f"No questions.json files found under {path}")
+
+    model = SentenceTransformer(embedding_model)
+    vectors = model.encode([pair["question"] + " " + pair["sql"] for pair in pairs])
+    queries = model.encode([pair["question"] for pair in pairs])
+    return benchmark_index_types(vectors, queries, k=k, settings=settings)
+
+
+if __name__ == "__main__":
+    import sys
+
+    print(benchmark_training_data(*sys.argv[1:2]).to_string(index=False))
@@ -1,7 +1,10 @@
-import os 
+import os
 import json
+import math
+import mmap
+import threading
 import uuid
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple, Union
 
 import faiss
 import numpy as np
@@ -10,13 +13,162 @@ import pandas as pd
 from ..base import VannaBase
 from ..exceptions import DependencyError
 
+INDEX_TYPES = ("flat", "hnsw", "ivf_flat", "ivf_pq")
+
+
+def index_type_of(index) -> str:
+    """
+    Return which of `INDEX_TYPES` an index (optionally wrapped in an `IndexIDMap2`) is.
+    """
+    if isinstance(index, faiss.IndexIDMap):
+        index = faiss.downcast_index(index.index)
+
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(index, faiss.IndexIVFPQ):
+        return "ivf_pq"
+    if isinstance(index, faiss.IndexIVF):
+        return "ivf_flat"
+    return "flat"
+
+
+def default_nlist(n_vectors: int) -> int:
+    """
+    Number of IVF lists for a corpus of `n_vectors`: about 4 * sqrt(n), capped so that every list
+    gets at least 39 training points, which is the minimum FAISS asks for.
+    """
+    return max(1, min(int(4 * math.sqrt(n_vectors)), n_vectors // 39))
+
+
+def build_index(
+    dim: int,
+    index_type: str = "flat",
+    vectors: Union[np.ndarray, None] = None,
+    ids: Union[np.ndarray, None] = None,
+    nlist: Union[int, None] = None,
+    hnsw_m: int = 32,
+    ef_construction: int = 40,
+    pq_m: int = 8,
+    pq_nbits: int = 8,
+):
+    """
+    Create an `IndexIDMap2` over an index of the given type, train it on `vectors` if the type needs
+    training, and add `vectors` with `ids`.
+
+    Args:
+        dim (int): Dimension of the vectors.
+        index_type (str): One of "flat" (exact search), "hnsw", "ivf_flat" or "ivf_pq".
+        vectors (np.ndarray): float32 matrix of shape (n, dim). Required for the IVF types, which
+            are trained on it.
+        ids (np.ndarray): int64 ids of the vectors. Defaults to their positions.
+        nlist (int): Number of IVF lists. Defaults to `default_nlist(n)`.
+        hnsw_m (int): Number of neighbours per HNSW node.
+        ef_construction (int): HNSW build-time search depth.
+        pq_m (int): Number of sub-quantizers for IVF-PQ. Must divide `dim`.
+        pq_nbits (int): Bits per sub-quantizer code for IVF-PQ.
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(
+            f"Unsupported FAISS index type {index_type!r}, expected one of {INDEX_TYPES}"
+        )
+
+    if vectors is None:
+        vectors = np.zeros((0, dim), dtype=np.float32)
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    if ids is None:
+        ids = np.arange(len(vectors), dtype=np.int64)
+
+    if index_type == "flat":
+        index = faiss.IndexFlatL2(dim)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, hnsw_m)
+        index.hnsw.efConstruction = ef_construction
+    else:
+        if len(vectors) == 0:
+            raise ValueError(f"A {index_type} index has to be trained on some vectors")
+
+        nlist = min(nlist or default_nlist(len(vectors)), len(vectors))
+        quantizer = faiss.IndexFlatL2(dim)
+        if index_type == "ivf_flat":
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist)
+        else:
+            if dim % pq_m != 0:
+                raise ValueError(f"pq_m ({pq_m}) must divide the embedding dimension ({dim})")
+            index = faiss.IndexIVFPQ(quantizer, dim, nlist, pq_m, pq_nbits)
+        index.train(vectors)
+
+    index = faiss.IndexIDMap2(index)
+    if len(vectors):
+        index.add_with_ids(vectors, np.asarray(ids, dtype=np.int64))
+    return index
+
+
+def set_search_params(
+    index, nprobe: Union[int, None] = None, ef_search: Union[int, None] = None
+) -> None:
+    """
+    Set the query-time knobs of an index: `nprobe` (IVF lists visited per query) and `ef_search`
+    (HNSW search depth). Parameters that don't apply to the index type are ignored.
+    """
+    index_type = index_type_of(index)
+    if nprobe is not None and index_type in ("ivf_flat", "ivf_pq"):
+        faiss.extract_index_ivf(index).nprobe = nprobe
+    if ef_search is not None and index_type == "hnsw":
+        faiss.ParameterSpace().set_index_parameter(index, "efSearch", ef_search)
+
+
 class FAISS(VannaBase):
+    """
+    Vector store backed by FAISS.
+
+    Every collection (sql, ddl, documentation) is an `IndexIDMap2`, so each entry keeps a stable
+    int64 id (stored as `faiss_id` in its metadata) and deletes are a `remove_ids` instead of a
+    rebuild. The raw float32 vectors are kept next to the index, so the index can be rebuilt without
+    calling the embedding model again.
+
+    Collections use an exact flat index by default. With `index_type` set to "hnsw", "ivf_flat" or
+    "ivf_pq", a collection switches to that approximate index once it holds `ann_min_vectors`
+    vectors: the index is rebuilt (and trained, for IVF) from the stored vectors. IVF indexes are
+    retrained when the collection has grown enough for twice as many lists. Use
+    [`benchmark_index_types`][vanna.faiss.benchmark.benchmark_index_types] to pick the type and the
+    `nprobe` / `ef_search` values for a corpus.
+
+    With the persistent client, adds and removes are appended to a per-collection write-ahead log
+    (`<collection>_wal.jsonl` for the records, `<collection>_wal.f32` for the raw float32 vectors)
+    instead of rewriting the index and metadata files. Every `wal_compact_every` operations, and on
+    `compact()`, the collection is written out as a snapshot (index, JSONL metadata and vectors,
+    each to a temporary file renamed into place) and the log is removed. On startup the snapshot is
+    loaded and the log is replayed on top of it.
+
+    Config:
+        client: "persistent" (the default), "in-memory", or a list of three prebuilt indexes (sql,
+            ddl, documentation). Prebuilt indexes read their metadata from `path` and must have one
+            entry per vector.
+        index_type (str): "flat", "hnsw", "ivf_flat" or "ivf_pq". Defaults to "flat".
+        ann_min_vectors (int): Size from which the approximate index is used. Defaults to 10000.
+        nlist (int): Number of IVF lists. Defaults to about 4 * sqrt(n).
+        nprobe (int): IVF lists visited per query. Defaults to 16.
+        hnsw_m (int): HNSW neighbours per node. Defaults to 32.
+        ef_construction (int): HNSW build-time search depth. Defaults to 40.
+        ef_search (int): HNSW query-time search depth. Defaults to 64.
+        pq_m (int): IVF-PQ sub-quantizers. Defaults to 8.
+        pq_nbits (int): IVF-PQ bits per code. Defaults to 8.
+        wal_compact_every (int): Number of logged operations after which a collection is compacted.
+            Defaults to 1000.
+    """
+
+    COLLECTIONS = {
+        "sql": ("sql_index", "sql_metadata"),
+        "ddl": ("ddl_index", "ddl_metadata"),
+        "documentation": ("doc_index", "doc_metadata"),
+    }
+
     def __init__(self, config=None):
         if config is None:
             config = {}
-        
+
         VannaBase.__init__(self, config=config)
-        
+
         try:
             import faiss
         except ImportError:
@@ -30,7 +182,7 @@ class FAISS(VannaBase):
             raise DependencyError(
                 "SentenceTransformer is not installed. Please install it with 'pip install sentence-transformers'."
             )
-        
+
         self.path = config.get("path", ".")
         self.embedding_dim = config.get('embedding_dim', 384)
         self.n_results_sql = config.get('n_results_sql', config.get("n_results", 10))
@@ -38,51 +190,403 @@ class FAISS(VannaBase):
         self.n_results_documentation = config.get('n_results_documentation', config.get("n_results", 10))
         self.curr_client = config.get("client", "persistent")
 
+        self.index_type = config.get("index_type", "flat")
+        if self.index_type not in INDEX_TYPES:
+            raise ValueError(
+                f"Unsupported FAISS index type {self.index_type!r}, expected one of {INDEX_TYPES}"
+            )
+        self.ann_min_vectors = config.get("ann_min_vectors", 10000)
+        self.nlist = config.get("nlist")
+        self.nprobe = config.get("nprobe", 16)
+        self.hnsw_m = config.get("hnsw_m", 32)
+        self.ef_construction = config.get("ef_construction", 40)
+        self.ef_search = config.get("ef_search", 64)
+        self.pq_m = config.get("pq_m", 8)
+        self.pq_nbits = config.get("pq_nbits", 8)
+        self.wal_compact_every = config.get("wal_compact_every", 1000)
+
+        self._write_lock = threading.RLock()
+        # Operations logged since the last snapshot, per collection
+        self._wal_ops = {collection: 0 for collection in self.COLLECTIONS}
+        self._next_ids: Dict[str, int] = {}
+        # Metadata entries by faiss_id, per collection, so a search doesn't scan the metadata lists
+        self._by_faiss_id: Dict[str, Dict[int, Dict[str, Any]]] = {}
+
+        self.sql_metadata: List[Dict[str, Any]] = self._load_or_create_metadata('sql_metadata')
+        self.ddl_metadata: List[Dict[str, str]] = self._load_or_create_metadata('ddl_metadata')
+        self.doc_metadata: List[Dict[str, str]] = self._load_or_create_metadata('doc_metadata')
+
         if self.curr_client == 'persistent':
-            self.sql_index = self._load_or_create_index('sql_index.faiss')
-            self.ddl_index = self._load_or_create_index('ddl_index.faiss')
-            self.doc_index = self._load_or_create_index('doc_index.faiss')
+            sql_index = self._load_or_create_index('sql_index.faiss')
+            ddl_index = self._load_or_create_index('ddl_index.faiss')
+            doc_index = self._load_or_create_index('doc_index.faiss')
         elif self.curr_client == 'in-memory':
-            self.sql_index = faiss.IndexFlatL2(self.embedding_dim)
-            self.ddl_index = faiss.IndexFlatL2(self.embedding_dim)
-            self.doc_index = faiss.IndexFlatL2(self.embedding_dim)
+            sql_index = self._create_index()
+            ddl_index = self._create_index()
+            doc_index = self._create_index()
         elif isinstance(self.curr_client, list) and len(self.curr_client) == 3 and all(isinstance(idx, faiss.Index) for idx in self.curr_client):
-            self.sql_index = self.curr_client[0]
-            self.ddl_index = self.curr_client[1]
-            self.doc_index = self.curr_client[2]
+            sql_index, ddl_index, doc_index = self.curr_client
         else:
             raise ValueError(f"Unsupported storage type was set in config: {self.curr_client}")
 
-        self.sql_metadata: List[Dict[str, Any]] = self._load_or_create_metadata('sql_metadata.json')
-        self.ddl_metadata: List[Dict[str, str]] = self._load_or_create_metadata('ddl_metadata.json')
-        self.doc_metadata: List[Dict[str, str]] = self._load_or_create_metadata('doc_metadata.json')
+        # Raw vectors by faiss_id, per collection
+        self.vectors: Dict[str, Dict[int, np.ndarray]] = {}
+        for collection, index in [
+            ("sql", sql_index),
+            ("ddl", ddl_index),
+            ("documentation", doc_index),
+        ]:
+            self._load_collection(collection, index)
 
         model_name = config.get('embedding_model', 'all-MiniLM-L6-v2')
         self.embedding_model = SentenceTransformer(model_name)
 
+    def _create_index(self, vectors: Union[Dict[int, np.ndarray], None] = None):
+        """
+        Build the index for a collection holding `vectors` (faiss_id -> vector), using the
+        configured approximate index type once the collection is large enough.
+        """
+        vectors = vectors or {}
+        ids = np.array(list(vectors.keys()), dtype=np.int64)
+        matrix = np.array(list(vectors.values()), dtype=np.float32).reshape(
+            len(ids), self.embedding_dim
+        )
+
+        index = build_index(
+            self.embedding_dim,
+            self._wanted_index_type(len(ids)),
+            vectors=matrix,
+            ids=ids,
+            nlist=self.nlist,
+            hnsw_m=self.hnsw_m,
+            ef_construction=self.ef_construction,
+            pq_m=self.pq_m,
+            pq_nbits=self.pq_nbits,
+        )
+        set_search_params(index, nprobe=self.nprobe, ef_search=self.ef_search)
+        return index
+
+    def _wanted_index_type(self, n_vectors: int) -> str:
+        min_vectors = self.ann_min_vectors
+        if self.index_type == "ivf_pq":
+            # PQ needs at least one training point per centroid
+            min_vectors = max(min_vectors, 2 ** self.pq_nbits)
+        if self.index_type in ("ivf_flat", "ivf_pq"):
+            min_vectors = max(min_vectors, 1)
+
+        return self.index_type if n_vectors >= min_vectors else "flat"
+
+    def _needs_rebuild(self, collection) -> bool:
+        index_attr, _ = self.COLLECTIONS[collection]
+        index = getattr(self, index_attr)
+        n_vectors = len(self.vectors[collection])
+
+        current = index_type_of(index)
+        if current != self._wanted_index_type(n_vectors):
+            return True
+
+        if current in ("ivf_flat", "ivf_pq") and self.nlist is None:
+            # Retrain once the corpus has grown enough to warrant twice as many lists
+            return default_nlist(n_vectors) >= 2 * faiss.extract_index_ivf(index).nlist
+
+        return False
+
     def _load_or_create_index(self, filename):
         filepath = os.path.join(self.path, filename)
         if os.path.exists(filepath):
             return faiss.read_index(filepath)
-        return faiss.IndexFlatL2(self.embedding_dim)
+        return self._create_index()
 
-    def _load_or_create_metadata(self, filename):
-        filepath = os.path.join(self.path, filename)
+    @staticmethod
+    def _read_jsonl(filepath) -> List[dict]:
+        """
+        Read a JSON Lines file through mmap. Reading stops at a truncated last line, e.g. after a
+        crash mid-append.
+        """
+        records = []
+        with open(filepath, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return records
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for line in iter(mm.readline, b""):
+                    if not line.strip():
+                        continue
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        break
+        return records
+
+    def _load_or_create_metadata(self, name):
+        # Prebuilt indexes passed as the client read their metadata from `path`, as the persistent
+        # client does
+        if self.curr_client == 'in-memory':
+            return []
+
+        filepath = os.path.join(self.path, f"{name}.jsonl")
         if os.path.exists(filepath):
-            with open(filepath, 'r') as f:
+            return self._read_jsonl(filepath)
+
+        # Stores written before the JSONL snapshots keep their metadata in one JSON document
+        legacy_filepath = os.path.join(self.path, f"{name}.json")
+        if os.path.exists(legacy_filepath):
+            with open(legacy_filepath, 'r') as f:
                 return json.load(f)
         return []
 
+    def _load_vectors(self, collection) -> Dict[int, np.ndarray]:
+        filepath = os.path.join(self.path, f"{collection}_vectors.npz")
+        if self.curr_client == 'in-memory' or not os.path.exists(filepath):
+            return {}
+
+        data = np.load(filepath)
+        return {int(faiss_id): vector for faiss_id, vector in zip(data["ids"], data["vectors"])}
+
+    def _load_collection(self, collection, index):
+        """
+        Make sure a loaded index is an IndexIDMap2 whose ids match the `faiss_id` of the metadata,
+        and that the raw vectors are available. Indexes written before ids were introduced map
+        positions to metadata entries; their vectors are reconstructed from the index, so the
+        migration never calls the embedding model.
+        """
+        index_attr, metadata_attr = self.COLLECTIONS[collection]
+        metadata_list = getattr(self, metadata_attr)
+        vectors = self._load_vectors(collection)
+        migrated = False
+
+        # Without stored vectors the index itself is the only source of them, so it has to match the
+        # metadata
+        if index.ntotal != len(metadata_list) and (
+            not vectors or not isinstance(index, faiss.IndexIDMap2)
+        ):
+            raise ValueError(
+                f"The {collection} index has {index.ntotal} vectors but there are "
+                f"{len(metadata_list)} metadata entries. Indexes are loaded with their metadata "
+                f"({metadata_attr}.jsonl or {metadata_attr}.json) from path {self.path!r}"
+            )
+
+        if not isinstance(index, faiss.IndexIDMap2):
+            migrated = True
+            stored = (
+                index.reconstruct_n(0, index.ntotal)
+                if index.ntotal > 0
+                else np.zeros((0, self.embedding_dim), dtype=np.float32)
+            )
+            index = self._create_index()
+            for position, metadata in enumerate(metadata_list):
+                metadata["faiss_id"] = position
+                vectors[position] = stored[position]
+            if metadata_list:
+                index.add_with_ids(stored, np.arange(len(metadata_list), dtype=np.int64))
+        elif not vectors and index.ntotal > 0:
+            for metadata in metadata_list:
+                vectors[metadata["faiss_id"]] = index.reconstruct(metadata["faiss_id"])
+
+        self.vectors[collection] = vectors
+        setattr(self, index_attr, index)
+        self._replay_wal(collection)
+        self._by_faiss_id[collection] = {
+            metadata["faiss_id"]: metadata for metadata in metadata_list
+        }
+        set_search_params(getattr(self, index_attr), nprobe=self.nprobe, ef_search=self.ef_search)
+        self._next_ids[collection] = max(self.vectors[collection].keys(), default=-1) + 1
+
+        if self._needs_rebuild(collection):
+            self.rebuild_index(collection)
+        elif migrated or self._wal_ops[collection] >= self.wal_compact_every:
+            self._save_collection(collection)
+
+    def _wal_paths(self, collection):
+        return (
+            os.path.join(self.path, f"{collection}_wal.jsonl"),
+            os.path.join(self.path, f"{collection}_wal.f32"),
+        )
+
+    def _replay_wal(self, collection):
+        """
+        Apply the operations logged since the last snapshot. A crash while a snapshot was being
+        written can leave files from before and after it, so records that are already applied are
+        skipped, and the index is rebuilt from the vectors if it still disagrees with the metadata.
+        """
+        log_path, vectors_path = self._wal_paths(collection)
+        if self.curr_client != 'persistent' or not os.path.exists(log_path):
+            return
+
+        index_attr, metadata_attr = self.COLLECTIONS[collection]
+        index = getattr(self, index_attr)
+        metadata_list = getattr(self, metadata_attr)
+        vectors = self.vectors[collection]
+        known = {metadata["faiss_id"] for metadata in metadata_list}
+
+        self._truncate_partial_record(log_path)
+        stored = np.zeros((0, self.embedding_dim), dtype=np.float32)
+        if self._truncate_partial_vector(vectors_path) > 0:
+            stored = np.memmap(vectors_path, dtype=np.float32, mode='r').reshape(
+                -1, self.embedding_dim
+            )
+
+        records = self._read_jsonl(log_path)
+        rebuild = False
+        removed = set()
+        for record in records:
+            if record["op"] == "add":
+                entry = record["entry"]
+                faiss_id = entry["faiss_id"]
+                if faiss_id in known or record["offset"] >= len(stored):
+                    continue
+
+                vector = np.array(stored[record["offset"]])
+                vectors[faiss_id] = vector
+                metadata_list.append(entry)
+                known.add(faiss_id)
+                index.add_with_ids(vector.reshape(1, -1), np.array([faiss_id], dtype=np.int64))
+            elif record["op"] == "remove":
+                faiss_id = record["faiss_id"]
+                if faiss_id not in known:
+                    continue
+
+                removed.add(faiss_id)
+                known.discard(faiss_id)
+                vectors.pop(faiss_id, None)
+                try:
+                    index.remove_ids(np.array([faiss_id], dtype=np.int64))
+                except RuntimeError:
+                    # HNSW graphs don't support removal
+                    rebuild = True
+
+        if removed:
+            metadata_list[:] = [
+                metadata for metadata in metadata_list if metadata["faiss_id"] not in removed
+            ]
+        if rebuild or index.ntotal != len(metadata_list) or not known <= vectors.keys():
+            for faiss_id in set(vectors) - known:
+                del vectors[faiss_id]
+            setattr(self, index_attr, self._create_index(vectors))
+
+        del stored
+        self._wal_ops[collection] = len(records)
+
+    def _truncate_partial_vector(self, vectors_path) -> int:
+        """
+        Cut a vector whose write was interrupted off the end of the log's vector file, so the next
+        vector is written at a whole-vector offset again. Returns the number of whole vectors in the
+        file.
+        """
+        if not os.path.exists(vectors_path):
+            return 0
+
+        vector_bytes = 4 * self.embedding_dim
+        size = os.path.getsize(vectors_path)
+        if size % vector_bytes:
+            os.truncate(vectors_path, size - size % vector_bytes)
+        return size // vector_bytes
+
+    @staticmethod
+    def _truncate_partial_record(log_path) -> None:
+        """
+        Cut a record whose write was interrupted off the end of the log, so the next record starts
+        on its own line.
+        """
+        if not os.path.exists(log_path):
+            return
+
+        with open(log_path, 'rb+') as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+
+            f.seek(0)
+            f.truncate(f.read().rfind(b"\n") + 1)
+
+    def _append_wal(self, collection, records, vectors=None):
+        """
+        Log operations. The vectors are appended before the records that point at them, so a record
+        is never replayed without its vector. What an interrupted earlier write left behind is cut
+        off first, so records always point at whole vectors.
+        """
+        if self.curr_client != 'persistent':
+            return
+
+        log_path, vectors_path = self._wal_paths(collection)
+        self._truncate_partial_record(log_path)
+        if vectors is not None:
+            offset = self._truncate_partial_vector(vectors_path)
+            with open(vectors_path, 'ab') as f:
+                records = [{**record, "offset": offset + i} for i, record in enumerate(records)]
+                f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+
+        with open(log_path, 'a') as f:
+            f.write("".join(json.dumps(record) + "\n" for record in records))
+
+        self._wal_ops[collection] += len(records)
+        if self._wal_ops[collection] >= self.wal_compact_every:
+            self._save_collection(collection)
+
+    def _atomic_write(self, filename, write):
+        filepath = os.path.join(self.path, filename)
+        tmp_filepath = filepath + ".tmp"
+        write(tmp_filepath)
+        os.replace(tmp_filepath, filepath)
+
     def _save_index(self, index, filename):
-        if self.curr_client == 'persistent':
-            filepath = os.path.join(self.path, filename)
-            faiss.write_index(index, filepath)
+        self._atomic_write(filename, lambda filepath: faiss.write_index(index, filepath))
 
-    def _save_metadata(self, metadata, filename):
-        if self.curr_client == 'persistent':
-            filepath = os.path.join(self.path, filename)
+    def _save_metadata(self, metadata, name):
+        def write(filepath):
             with open(filepath, 'w') as f:
-                json.dump(metadata, f)
+                for item in metadata:
+                    f.write(json.dumps(item) + "\n")
+
+        self._atomic_write(f"{name}.jsonl", write)
+
+        legacy_filepath = os.path.join(self.path, f"{name}.json")
+        if os.path.exists(legacy_filepath):
+            os.remove(legacy_filepath)
+
+    def _save_vectors(self, collection):
+        vectors = self.vectors[collection]
+        ids = np.array(list(vectors.keys()), dtype=np.int64)
+        stacked = np.array(list(vectors.values()), dtype=np.float32).reshape(
+            len(ids), self.embedding_dim
+        )
+
+        def write(filepath):
+            with open(filepath, 'wb') as f:
+                np.savez(f, ids=ids, vectors=stacked)
+
+        self._atomic_write(f"{collection}_vectors.npz", write)
+
+    def _save_collection(self, collection):
+        """
+        Write a snapshot of the collection and drop its write-ahead log.
+        """
+        if self.curr_client != 'persistent':
+            return
+
+        index_attr, metadata_attr = self.COLLECTIONS[collection]
+        with self._write_lock:
+            # The index goes last: on load, an index that disagrees with the metadata is rebuilt
+            # from the vectors
+            self._save_vectors(collection)
+            self._save_metadata(getattr(self, metadata_attr), metadata_attr)
+            self._save_index(getattr(self, index_attr), f"{index_attr}.faiss")
+
+            for filepath in self._wal_paths(collection):
+                if os.path.exists(filepath):
+                    os.remove(filepath)
+            self._wal_ops[collection] = 0
+
+    def compact(self) -> None:
+        """
+        Write a snapshot of every collection that has operations in its write-ahead log.
+        """
+        for collection in self.COLLECTIONS:
+            if self._wal_ops[collection]:
+                self._save_collection(collection)
 
     def generate_embedding(self, data: str, **kwargs) -> List[float]:
         embedding = self.embedding_model.encode(data)
@@ -90,44 +594,104 @@ class FAISS(VannaBase):
             f"Embedding dimension mismatch: expected {self.embedding_dim}, got {embedding.shape[0]}"
         return embedding.tolist()
 
-    def _add_to_index(self, index, metadata_list, text, extra_metadata=None) -> str:
-        embedding = self.generate_embedding(text)
-        index.add(np.array([embedding], dtype=np.float32))
-        entry_id = str(uuid.uuid4())
-        metadata_list.append({"id": entry_id, **(extra_metadata or {})})
-        return entry_id
-    
+    def generate_embeddings(self, data: List[str], **kwargs) -> List[List[float]]:
+        embeddings = self.embedding_model.encode(list(data))
+        return [embedding.tolist() for embedding in embeddings]
+
+    def _next_faiss_id(self, collection) -> int:
+        faiss_id = self._next_ids[collection]
+        self._next_ids[collection] += 1
+        return faiss_id
+
+    def _add_to_index(self, collection, text, extra_metadata=None) -> str:
+        vectors = np.array([self.generate_embedding(text)], dtype=np.float32)
+        return self._add_vectors(collection, vectors, [extra_metadata or {}])[0]
+
+    def _add_many_to_index(self, collection, texts, extra_metadata) -> List[str]:
+        if not texts:
+            return []
+
+        vectors = np.array(self.generate_embeddings(texts), dtype=np.float32).reshape(
+            len(texts), self.embedding_dim
+        )
+        return self._add_vectors(collection, vectors, extra_metadata)
+
+    def _add_vectors(self, collection, vectors, extra_metadata) -> List[str]:
+        index_attr, metadata_attr = self.COLLECTIONS[collection]
+
+        with self._write_lock:
+            faiss_ids = [self._next_faiss_id(collection) for _ in range(len(vectors))]
+            getattr(self, index_attr).add_with_ids(vectors, np.array(faiss_ids, dtype=np.int64))
+            self.vectors[collection].update(zip(faiss_ids, vectors))
+
+            entries = [
+                {"id": str(uuid.uuid4()), "faiss_id": faiss_id, **metadata}
+                for faiss_id, metadata in zip(faiss_ids, extra_metadata)
+            ]
+            getattr(self, metadata_attr).extend(entries)
+            self._by_faiss_id[collection].update((entry["faiss_id"], entry) for entry in entries)
+            if self._needs_rebuild(collection):
+                self.rebuild_index(collection)
+            else:
+                self._append_wal(
+                    collection, [{"op": "add", "entry": entry} for entry in entries], vectors
+                )
+        return [entry["id"] for entry in entries]
+
     def add_question_sql(self, question: str, sql: str, **kwargs) -> str:
-        entry_id = self._add_to_index(self.sql_index, self.sql_metadata, question + " " + sql, {"question": question, "sql": sql})
-        self._save_index(self.sql_index, 'sql_index.faiss')
-        self._save_metadata(self.sql_metadata, 'sql_metadata.json')
-        return entry_id
+        return self._add_to_index("sql", question + " " + sql, {"question": question, "sql": sql})
 
     def add_ddl(self, ddl: str, **kwargs) -> str:
-        entry_id = self._add_to_index(self.ddl_index, self.ddl_metadata, ddl, {"ddl": ddl})
-        self._save_index(self.ddl_index, 'ddl_index.faiss')
-        self._save_metadata(self.ddl_metadata, 'ddl_metadata.json')
-        return entry_id
+        return self._add_to_index("ddl", ddl, {"ddl": ddl})
 
     def add_documentation(self, documentation: str, **kwargs) -> str:
-        entry_id = self._add_to_index(self.doc_index, self.doc_metadata, documentation, {"documentation": documentation})
-        self._save_index(self.doc_index, 'doc_index.faiss')
-        self._save_metadata(self.doc_metadata, 'doc_metadata.json')
-        return entry_id
+        return self._add_to_index("documentation", documentation, {"documentation": documentation})
+
+    def add_question_sql_batch(self, question_sql: List[Tuple[str, str]], **kwargs) -> List[str]:
+        return self._add_many_to_index(
+            "sql",
+            [question + " " + sql for question, sql in question_sql],
+            [{"question": question, "sql": sql} for question, sql in question_sql],
+        )
+
+    def add_ddl_batch(self, ddls: List[str], **kwargs) -> List[str]:
+        return self._add_many_to_index("ddl", ddls, [{"ddl": ddl} for ddl in ddls])
+
+    def add_documentation_batch(self, documentation: List[str], **kwargs) -> List[str]:
+        return self._add_many_to_index(
+            "documentation", documentation, [{"documentation": doc} for doc in documentation]
+        )
 
-    def _get_similar(self, index, metadata_list, text, n_results) -> list:
+    def _get_similar(self, collection, text, n_results) -> list:
+        index_attr, _ = self.COLLECTIONS[collection]
+        index = getattr(self, index_attr)
+        if index.ntotal == 0:
+            return []
+
+        by_faiss_id = self._by_faiss_id[collection]
         embedding = self.generate_embedding(text)
         D, I = index.search(np.array([embedding], dtype=np.float32), k=n_results)
-        return [] if len(I[0]) == 0 or I[0][0] == -1 else [metadata_list[i] for i in I[0]]
+        return [
+            {key: value for key, value in by_faiss_id[i].items() if key != "faiss_id"}
+            for i in I[0]
+            if i != -1 and i in by_faiss_id
+        ]
 
     def get_similar_question_sql(self, question: str, **kwargs) -> list:
-        return self._get_similar(self.sql_index, self.sql_metadata, question, self.n_results_sql)
-    
+        return self._get_similar("sql", question, self.n_results_sql)
+
     def get_related_ddl(self, question: str, **kwargs) -> list:
-        return [metadata["ddl"] for metadata in self._get_similar(self.ddl_index, self.ddl_metadata, question, self.n_results_ddl)]
+        return [
+            metadata["ddl"] for metadata in self._get_similar("ddl", question, self.n_results_ddl)
+        ]
 
     def get_related_documentation(self, question: str, **kwargs) -> list:
-        return [metadata["documentation"] for metadata in self._get_similar(self.doc_index, self.doc_metadata, question, self.n_results_documentation)]
+        return [
+            metadata["documentation"]
+            for metadata in self._get_similar(
+                "documentation", question, self.n_results_documentation
+            )
+        ]
 
     def get_training_data(self, **kwargs) -> pd.DataFrame:
         sql_data = pd.DataFrame(self.sql_metadata)
@@ -139,38 +703,48 @@ class FAISS(VannaBase):
         doc_data = pd.DataFrame(self.doc_metadata)
         doc_data['training_data_type'] = 'documentation'
 
-        return pd.concat([sql_data, ddl_data, doc_data], ignore_index=True)
+        df = pd.concat([sql_data, ddl_data, doc_data], ignore_index=True)
+        return df.drop(columns=["faiss_id"], errors="ignore")
 
     def remove_training_data(self, id: str, **kwargs) -> bool:
-        for metadata_list, index, index_name in [
-            (self.sql_metadata, self.sql_index, 'sql_index.faiss'),
-            (self.ddl_metadata, self.ddl_index, 'ddl_index.faiss'),
-            (self.doc_metadata, self.doc_index, 'doc_index.faiss')
-        ]:
-            for i, item in enumerate(metadata_list):
-                if item['id'] == id:
-                    del metadata_list[i]
-                    new_index = faiss.IndexFlatL2(self.embedding_dim)
-                    embeddings = [self.generate_embedding(json.dumps(m)) for m in metadata_list]
-                    if embeddings:
-                        new_index.add(np.array(embeddings, dtype=np.float32))
-                    setattr(self, index_name.split('.')[0], new_index)
-                    
-                    if self.curr_client == 'persistent':
-                        self._save_index(new_index, index_name)
-                        self._save_metadata(metadata_list, f"{index_name.split('.')[0]}_metadata.json")
-                    
-                    return True
+        with self._write_lock:
+            for collection, (index_attr, metadata_attr) in self.COLLECTIONS.items():
+                metadata_list = getattr(self, metadata_attr)
+                for i, item in enumerate(metadata_list):
+                    if item['id'] == id:
+                        faiss_id = item["faiss_id"]
+                        del metadata_list[i]
+                        self._by_faiss_id[collection].pop(faiss_id, None)
+                        self.vectors[collection].pop(faiss_id, None)
+                        index = getattr(self, index_attr)
+                        if index_type_of(index) == "hnsw" or self._needs_rebuild(collection):
+                            # HNSW graphs don't support removal
+                            self.rebuild_index(collection)
+                        else:
+                            index.remove_ids(np.array([faiss_id], dtype=np.int64))
+                            self._append_wal(collection, [{"op": "remove", "faiss_id": faiss_id}])
+                        return True
         return False
 
+    def rebuild_index(self, collection: str) -> None:
+        """
+        Rebuild the index of a collection from the stored raw vectors, without calling the embedding
+        model. This also switches the collection to the configured index type and retrains IVF
+        indexes.
+        """
+        index_attr, _ = self.COLLECTIONS[collection]
+        with self._write_lock:
+            setattr(self, index_attr, self._create_index(self.vectors[collection]))
+            self._save_collection(collection)
+
     def remove_collection(self, collection_name: str) -> bool:
-        if collection_name in ["sql", "ddl", "documentation"]:
-            setattr(self, f"{collection_name}_index", faiss.IndexFlatL2(self.embedding_dim))
-            setattr(self, f"{collection_name}_metadata", [])
-            
-            if self.curr_client == 'persistent':
-                self._save_index(getattr(self, f"{collection_name}_index"), f"{collection_name}_index.faiss")
-                self._save_metadata([], f"{collection_name}_metadata.json")
-            
+        if collection_name in self.COLLECTIONS:
+            index_attr, metadata_attr = self.COLLECTIONS[collection_name]
+            with self._write_lock:
+                setattr(self, index_attr, self._create_index())
+                setattr(self, metadata_attr, [])
+                self._by_faiss_id[collection_name] = {}
+                self.vectors[collection_name] = {}
+                self._save_collection(collection_name)
             return True
-        return False
\ No newline at end of file
+        return False
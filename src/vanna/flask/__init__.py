@@ -2,94 +2,27 @@ import json
 import logging
 import os
 import sys
-import uuid
-from abc import ABC, abstractmethod
 from functools import wraps
 import importlib.metadata
 
 import flask
 import requests
 from flasgger import Swagger
-from flask import Flask, Response, jsonify, request, send_from_directory
+from flask import Flask, Response, jsonify, request, send_from_directory, stream_with_context
 from flask_sock import Sock
 
 from ..base import VannaBase
+from ..base.fetch import concat_chunks
 from .assets import css_content, html_content, js_content
 from .auth import AuthInterface, NoAuth
+from .cache import BoundedMemoryCache, Cache, MemoryCache, RedisCache, SQLiteCache
 
 
-class Cache(ABC):
+def sse_event(data: dict) -> str:
     """
-    Define the interface for a cache that can be used to store data in a Flask app.
+    Format a dict as a server-sent event.
     """
-
-    @abstractmethod
-    def generate_id(self, *args, **kwargs):
-        """
-        Generate a unique ID for the cache.
-        """
-        pass
-
-    @abstractmethod
-    def get(self, id, field):
-        """
-        Get a value from the cache.
-        """
-        pass
-
-    @abstractmethod
-    def get_all(self, field_list) -> list:
-        """
-        Get all values from the cache.
-        """
-        pass
-
-    @abstractmethod
-    def set(self, id, field, value):
-        """
-        Set a value in the cache.
-        """
-        pass
-
-    @abstractmethod
-    def delete(self, id):
-        """
-        Delete a value from the cache.
-        """
-        pass
-
-
-class MemoryCache(Cache):
-    def __init__(self):
-        self.cache = {}
-
-    def generate_id(self, *args, **kwargs):
-        return str(uuid.uuid4())
-
-    def set(self, id, field, value):
-        if id not in self.cache:
-            self.cache[id] = {}
-
-        self.cache[id][field] = value
-
-    def get(self, id, field):
-        if id not in self.cache:
-            return None
-
-        if field not in self.cache[id]:
-            return None
-
-        return self.cache[id][field]
-
-    def get_all(self, field_list) -> list:
-        return [
-            {"id": id, **{field: self.get(id=id, field=field) for field in field_list}}
-            for id in self.cache
-        ]
-
-    def delete(self, id):
-        if id in self.cache:
-            del self.cache[id]
+    return f"data: {json.dumps(data)}\n\n"
 
 
 class VannaFlaskAPI:
@@ -147,6 +80,7 @@ class VannaFlaskAPI:
         debug=True,
         allow_llm_to_see_data=False,
         chart=True,
+        max_rows=None,
     ):
         """
         Expose a Flask API that can be used to interact with a Vanna instance.
@@ -158,6 +92,8 @@ class VannaFlaskAPI:
             debug: Show the debug console. Defaults to True.
             allow_llm_to_see_data: Whether to allow the LLM to see data. Defaults to False.
             chart: Whether to show the chart output in the UI. Defaults to True.
+            max_rows: Maximum number of rows read and cached when running SQL. The CSV download
+                re-runs the query to get every row. Defaults to None, which reads every row.
 
         Returns:
             None
@@ -176,6 +112,7 @@ class VannaFlaskAPI:
         self.debug = debug
         self.allow_llm_to_see_data = allow_llm_to_see_data
         self.chart = chart
+        self.max_rows = max_rows
         self.config = {
           "debug": debug,
           "allow_llm_to_see_data": allow_llm_to_see_data,
@@ -354,6 +291,58 @@ class VannaFlaskAPI:
                     }
                 )
 
+        @self.flask_app.route("/api/v0/generate_sql_stream", methods=["GET"])
+        @self.requires_auth
+        def generate_sql_stream(user: any):
+            """
+            Generate SQL from a question, streaming the LLM output as server-sent events
+            ---
+            parameters:
+              - name: user
+                in: query
+              - name: question
+                in: query
+                type: string
+                required: true
+            responses:
+              200:
+                description: A stream of `chunk` events followed by a final `sql` or `text` event
+                    with the id
+            """
+            question = flask.request.args.get("question")
+
+            if question is None:
+                return jsonify({"type": "error", "error": "No question provided"})
+
+            id = self.cache.generate_id(question=question)
+
+            def generate():
+                chunks = []
+                try:
+                    for chunk in vn.generate_sql_stream(
+                        question=question, allow_llm_to_see_data=self.allow_llm_to_see_data
+                    ):
+                        chunks.append(chunk)
+                        yield sse_event({"type": "chunk", "id": id, "text": chunk})
+                except Exception as e:
+                    yield sse_event({"type": "error", "error": str(e)})
+                    return
+
+                sql = vn.extract_sql("".join(chunks))
+
+                self.cache.set(id=id, field="question", value=question)
+                self.cache.set(id=id, field="sql", value=sql)
+
+                yield sse_event(
+                    {
+                        "type": "sql" if vn.is_sql_valid(sql=sql) else "text",
+                        "id": id,
+                        "text": sql,
+                    }
+                )
+
+            return Response(stream_with_context(generate()), mimetype="text/event-stream")
+
         @self.flask_app.route("/api/v0/generate_rewritten_question", methods=["GET"])
         @self.requires_auth
         def generate_rewritten_question(user: any):
@@ -506,15 +495,24 @@ class VannaFlaskAPI:
                         }
                     )
 
-                df = vn.run_sql(sql=sql)
+                if self.max_rows is None:
+                    df = vn.run_sql(sql=sql)
+                    truncated = False
+                else:
+                    # Read one extra row to find out whether the result was cut off
+                    df = concat_chunks(vn.run_sql_stream(sql=sql, max_rows=self.max_rows + 1))
+                    truncated = len(df) > self.max_rows
+                    df = df.head(self.max_rows)
 
                 self.cache.set(id=id, field="df", value=df)
+                self.cache.set(id=id, field="df_truncated", value=truncated)
 
                 return jsonify(
                     {
                         "type": "df",
                         "id": id,
                         "df": df.head(10).to_json(orient='records', date_format='iso'),
+                        "truncated": truncated,
                         "should_generate_chart": self.chart and vn.should_generate_chart(df),
                     }
                 )
@@ -620,8 +618,8 @@ class VannaFlaskAPI:
 
         @self.flask_app.route("/api/v0/download_csv", methods=["GET"])
         @self.requires_auth
-        @self.requires_cache(["df"])
-        def download_csv(user: any, id: str, df):
+        @self.requires_cache(["df"], ["sql", "df_truncated"])
+        def download_csv(user: any, id: str, df, sql, df_truncated):
             """
             Download CSV
             ---
@@ -636,6 +634,22 @@ class VannaFlaskAPI:
               200:
                 description: download CSV
             """
+            if df_truncated and sql is not None:
+                # Only the first max_rows rows are cached: stream the full result straight into the
+                # response
+                def generate():
+                    offset = 0
+                    for chunk in vn.run_sql_stream(sql=sql):
+                        chunk.index = range(offset, offset + len(chunk))
+                        yield chunk.to_csv(header=offset == 0)
+                        offset += len(chunk)
+
+                return Response(
+                    stream_with_context(generate()),
+                    mimetype="text/csv",
+                    headers={"Content-disposition": f"attachment; filename={id}.csv"},
+                )
+
             csv = df.to_csv()
 
             return Response(
@@ -1035,6 +1049,51 @@ class VannaFlaskAPI:
                     }
                 )
 
+        @self.flask_app.route("/api/v0/generate_summary_stream", methods=["GET"])
+        @self.requires_auth
+        @self.requires_cache(["df", "question"])
+        def generate_summary_stream(user: any, id: str, df, question):
+            """
+            Generate summary, streaming the LLM output as server-sent events
+            ---
+            parameters:
+              - name: user
+                in: query
+              - name: id
+                in: query|body
+                type: string
+                required: true
+            responses:
+              200:
+                description: A stream of `chunk` events followed by a final `text` event with the
+                    full summary
+            """
+            if not self.allow_llm_to_see_data:
+                return jsonify(
+                    {
+                        "type": "text",
+                        "id": id,
+                        "text": "Summarization can be enabled if you set allow_llm_to_see_data=True",
+                    }
+                )
+
+            def generate():
+                chunks = []
+                try:
+                    for chunk in vn.generate_summary_stream(question=question, df=df):
+                        chunks.append(chunk)
+                        yield sse_event({"type": "chunk", "id": id, "text": chunk})
+                except Exception as e:
+                    yield sse_event({"type": "error", "error": str(e)})
+                    return
+
+                summary = "".join(chunks)
+                self.cache.set(id=id, field="summary", value=summary)
+
+                yield sse_event({"type": "text", "id": id, "text": summary})
+
+            return Response(stream_with_context(generate()), mimetype="text/event-stream")
+
         @self.flask_app.route("/api/v0/load_question", methods=["GET"])
         @self.requires_auth
         @self.requires_cache(
@@ -1190,6 +1249,7 @@ class VannaFlaskApp(VannaFlaskAPI):
         function_generation=True,
         index_html_path=None,
         assets_folder=None,
+        max_rows=None,
     ):
         """
         Expose a Flask app that can be used to interact with a Vanna instance.
@@ -1216,11 +1276,13 @@ class VannaFlaskApp(VannaFlaskAPI):
             summarization: Whether to show summarization. Defaults to True.
             index_html_path: Path to the index.html. Defaults to None, which will use the default index.html
             assets_folder: The location where you'd like to serve the static assets from. Defaults to None, which will use hardcoded Python variables.
+            max_rows: Maximum number of rows read and cached when running SQL. The CSV download
+                re-runs the query to get every row. Defaults to None, which reads every row.
 
         Returns:
             None
         """
-        super().__init__(vn, cache, auth, debug, allow_llm_to_see_data, chart)
+        super().__init__(vn, cache, auth, debug, allow_llm_to_see_data, chart, max_rows)
 
         self.config["logo"] = logo
         self.config["title"] = title
@@ -0,0 +1,644 @@
+import io
+import json
+import os
+import pickle
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Union
+
+import pandas as pd
+
+from ..exceptions import DependencyError
+
+
+class Cache(ABC):
+    """
+    Define the interface for a cache that can be used to store data in a Flask app.
+    """
+
+    @abstractmethod
+    def generate_id(self, *args, **kwargs):
+        """
+        Generate a unique ID for the cache.
+        """
+        pass
+
+    @abstractmethod
+    def get(self, id, field):
+        """
+        Get a value from the cache.
+        """
+        pass
+
+    @abstractmethod
+    def get_all(self, field_list) -> list:
+        """
+        Get all values from the cache.
+        """
+        pass
+
+    @abstractmethod
+    def set(self, id, field, value):
+        """
+        Set a value in the cache.
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, id):
+        """
+        Delete a value from the cache.
+        """
+        pass
+
+
+class MemoryCache(Cache):
+    def __init__(self):
+        self.cache = {}
+
+    def generate_id(self, *args, **kwargs):
+        return str(uuid.uuid4())
+
+    def set(self, id, field, value):
+        if id not in self.cache:
+            self.cache[id] = {}
+
+        self.cache[id][field] = value
+
+    def get(self, id, field):
+        if id not in self.cache:
+            return None
+
+        if field not in self.cache[id]:
+            return None
+
+        return self.cache[id][field]
+
+    def get_all(self, field_list) -> list:
+        return [
+            {"id": id, **{field: self.get(id=id, field=field) for field in field_list}}
+            for id in self.cache
+        ]
+
+    def delete(self, id):
+        if id in self.cache:
+            del self.cache[id]
+
+
+def value_size(value) -> int:
+    """
+    Approximate number of bytes a cached value keeps resident.
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(value_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(value_size(item) for item in value.values())
+    return sys.getsizeof(value)
+
+
+def _to_arrow(df: pd.DataFrame):
+    """
+    `df` as an Arrow table, or None when Arrow can't represent it, e.g. duplicate column names
+    (`SELECT a.id, b.id`) or object columns that mix types. Needs `pyarrow`.
+    """
+    import pyarrow
+
+    try:
+        return pyarrow.Table.from_pandas(df, preserve_index=True)
+    except (ValueError, TypeError, pyarrow.ArrowException):
+        return None
+
+
+class _Spilled:
+    """
+    Placeholder for a DataFrame that was written to an Arrow IPC file: `size` is the DataFrame's
+    size in memory, `file_size` the size of the file.
+    """
+
+    def __init__(self, path: str, size: int, file_size: int):
+        self.path = path
+        self.size = size
+        self.file_size = file_size
+
+
+class _Entry:
+    def __init__(self):
+        self.fields = {}
+        self.sizes = {}
+        self.updated_at = time.monotonic()
+
+    @property
+    def size(self) -> int:
+        return sum(self.sizes.values())
+
+    @property
+    def spilled_bytes(self) -> int:
+        return sum(value.file_size for value in self.fields.values() if isinstance(value, _Spilled))
+
+
+class BoundedMemoryCache(Cache):
+    """
+    In-memory cache with LRU and TTL eviction and a byte budget.
+
+    The size of an entry is the sum of its fields: `df.memory_usage(deep=True)` for DataFrames, the
+    encoded length for strings such as `fig_json`, and `sys.getsizeof` for anything else. When the
+    budget is exceeded the least recently used entries are evicted. DataFrames of at least
+    `spill_threshold` bytes are written to Arrow IPC files in `spill_dir` instead, so they don't
+    count against the budget; reading one converts the file back into a new DataFrame, which costs a
+    copy of the data. The spill files have a budget of their own, `max_spill_bytes`, enforced the
+    same way.
+
+    **Example:**
+    ```python
+    from vanna.flask import BoundedMemoryCache, VannaFlaskApp
+
+    cache = BoundedMemoryCache(max_entries=500, max_bytes=256 * 1024 * 1024, ttl=3600)
+    VannaFlaskApp(vn, cache=cache).run()
+    print(cache.stats())
+    ```
+
+    Args:
+        max_entries (int): Maximum number of ids to keep. Defaults to 1000.
+        max_bytes (int): Memory budget in bytes. Defaults to 512 MiB.
+        ttl (float): Number of seconds an id stays valid after it was last written. Defaults to
+            3600. None disables expiry.
+        spill_threshold (int): DataFrames of at least this many bytes are spilled to disk. Defaults
+            to 16 MiB. None disables spilling. Spilling needs `pyarrow`; without it DataFrames stay
+            in memory, as do frames Arrow can't represent, e.g. with duplicate column names.
+        spill_dir (str): Directory for the spill files. Defaults to None, which creates a temporary
+            directory on the first spill.
+        max_spill_bytes (int): Disk budget of the spill files in bytes. Defaults to 4 GiB. None
+            disables the limit. A DataFrame whose file alone is larger stays in memory.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        max_bytes: int = 512 * 1024 * 1024,
+        ttl: Union[float, None] = 3600,
+        spill_threshold: Union[int, None] = 16 * 1024 * 1024,
+        spill_dir: Union[str, None] = None,
+        max_spill_bytes: Union[int, None] = 4 * 1024 * 1024 * 1024,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.spill_threshold = spill_threshold
+        self.spill_dir = spill_dir
+        self.max_spill_bytes = max_spill_bytes
+        self._owns_spill_dir = False
+
+        self.cache = OrderedDict()
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.spills = 0
+        self.spill_loads = 0
+
+    def generate_id(self, *args, **kwargs):
+        return str(uuid.uuid4())
+
+    def _expired(self, entry: _Entry) -> bool:
+        return self.ttl is not None and time.monotonic() - entry.updated_at > self.ttl
+
+    def _remove(self, id):
+        entry = self.cache.pop(id)
+        for value in entry.fields.values():
+            if isinstance(value, _Spilled):
+                try:
+                    os.remove(value.path)
+                except OSError:
+                    pass
+
+    def _get_spill_dir(self) -> str:
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix="vanna-cache-")
+            self._owns_spill_dir = True
+        else:
+            os.makedirs(self.spill_dir, exist_ok=True)
+        return self.spill_dir
+
+    def _spill(self, df: pd.DataFrame, size: int) -> Union[_Spilled, None]:
+        try:
+            import pyarrow
+        except ImportError:
+            return None
+
+        table = _to_arrow(df)
+        if table is None:
+            # The frame stays in memory and counts against the budget like any other value
+            return None
+
+        path = os.path.join(self._get_spill_dir(), f"{uuid.uuid4().hex}.arrow")
+        with pyarrow.OSFile(path, "wb") as sink:
+            with pyarrow.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+        file_size = os.path.getsize(path)
+        if self.max_spill_bytes is not None and file_size > self.max_spill_bytes:
+            os.remove(path)
+            return None
+
+        self.spills += 1
+        return _Spilled(path, size, file_size)
+
+    def _load(self, spilled: _Spilled) -> pd.DataFrame:
+        import pyarrow
+
+        # Memory-mapping spares Arrow a read buffer, but to_pandas still copies the data into the
+        # DataFrame
+        with pyarrow.memory_map(spilled.path, "r") as source:
+            table = pyarrow.ipc.open_file(source).read_all()
+
+        self.spill_loads += 1
+        return table.to_pandas()
+
+    def _enforce_limits(self, keep=None):
+        for id in [id for id, entry in self.cache.items() if self._expired(entry)]:
+            self._remove(id)
+            self.expirations += 1
+
+        total = sum(entry.size for entry in self.cache.values())
+        spilled = sum(entry.spilled_bytes for entry in self.cache.values())
+        for id in list(self.cache.keys()):
+            if (
+                len(self.cache) <= self.max_entries
+                and total <= self.max_bytes
+                and (self.max_spill_bytes is None or spilled <= self.max_spill_bytes)
+            ):
+                break
+            if id == keep:
+                continue
+
+            total -= self.cache[id].size
+            spilled -= self.cache[id].spilled_bytes
+            self._remove(id)
+            self.evictions += 1
+
+    def set(self, id, field, value):
+        size = value_size(value)
+
+        if (
+            isinstance(value, pd.DataFrame)
+            and self.spill_threshold is not None
+            and size >= self.spill_threshold
+        ):
+            spilled = self._spill(value, size)
+            if spilled is not None:
+                value, size = spilled, 0
+
+        with self._lock:
+            entry = self.cache.get(id)
+            if entry is None:
+                entry = self.cache[id] = _Entry()
+
+            previous = entry.fields.get(field)
+            if isinstance(previous, _Spilled):
+                try:
+                    os.remove(previous.path)
+                except OSError:
+                    pass
+
+            entry.fields[field] = value
+            entry.sizes[field] = size
+            entry.updated_at = time.monotonic()
+            self.cache.move_to_end(id)
+
+            self._enforce_limits(keep=id)
+
+    def get(self, id, field):
+        with self._lock:
+            entry = self.cache.get(id)
+            if entry is not None and self._expired(entry):
+                self._remove(id)
+                self.expirations += 1
+                entry = None
+
+            if entry is None or field not in entry.fields:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.cache.move_to_end(id)
+            value = entry.fields[field]
+
+        if isinstance(value, _Spilled):
+            try:
+                return self._load(value)
+            except OSError:
+                return None
+
+        return value
+
+    def get_all(self, field_list) -> list:
+        with self._lock:
+            ids = [id for id, entry in self.cache.items() if not self._expired(entry)]
+
+        return [
+            {"id": id, **{field: self.get(id=id, field=field) for field in field_list}}
+            for id in ids
+        ]
+
+    def delete(self, id):
+        with self._lock:
+            if id in self.cache:
+                self._remove(id)
+
+    def clear(self):
+        with self._lock:
+            for id in list(self.cache.keys()):
+                self._remove(id)
+
+            if self._owns_spill_dir and self.spill_dir is not None:
+                shutil.rmtree(self.spill_dir, ignore_errors=True)
+                self.spill_dir = None
+                self._owns_spill_dir = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            spilled = [
+                value
+                for entry in self.cache.values()
+                for value in entry.fields.values()
+                if isinstance(value, _Spilled)
+            ]
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.cache),
+                "max_entries": self.max_entries,
+                "bytes": sum(entry.size for entry in self.cache.values()),
+                "max_bytes": self.max_bytes,
+                "spilled_entries": len(spilled),
+                "spilled_bytes": sum(value.size for value in spilled),
+                "spill_file_bytes": sum(value.file_size for value in spilled),
+                "max_spill_bytes": self.max_spill_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "spills": self.spills,
+                "spill_loads": self.spill_loads,
+            }
+
+
+def encode_value(value) -> bytes:
+    """
+    Serialize a cached value for a cache shared between processes.
+
+    DataFrames are written as an Arrow IPC stream (or JSON when `pyarrow` isn't installed, or a
+    pickle when Arrow can't represent the frame); everything else as JSON. The first byte records
+    the format.
+    """
+    if isinstance(value, pd.DataFrame):
+        try:
+            import pyarrow
+        except ImportError:
+            return b"s" + value.to_json(orient="split", date_format="iso").encode("utf-8")
+
+        table = _to_arrow(value)
+        if table is None:
+            return b"p" + pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+        sink = pyarrow.BufferOutputStream()
+        with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return b"a" + sink.getvalue().to_pybytes()
+
+    return b"j" + json.dumps(value, default=str).encode("utf-8")
+
+
+def decode_value(data: bytes):
+    """
+    Inverse of `encode_value`.
+    """
+    kind, payload = data[:1], data[1:]
+
+    if kind == b"a":
+        import pyarrow
+
+        return pyarrow.ipc.open_stream(pyarrow.py_buffer(payload)).read_all().to_pandas()
+    if kind == b"s":
+        return pd.read_json(io.StringIO(payload.decode("utf-8")), orient="split")
+    if kind == b"p":
+        return pickle.loads(payload)
+
+    return json.loads(payload.decode("utf-8"))
+
+
+class SQLiteCache(Cache):
+    """
+    Cache stored in a SQLite database in WAL mode, so every worker process on a host (e.g. gunicorn
+    workers) sees the same ids. DataFrames are stored as Arrow IPC.
+
+    **Example:**
+    ```python
+    from vanna.flask import SQLiteCache, VannaFlaskApp
+
+    app = VannaFlaskApp(vn, cache=SQLiteCache("/var/tmp/vanna-cache.sqlite")).flask_app
+    ```
+
+    Args:
+        path (str): Path of the SQLite database file.
+        ttl (float): Number of seconds an id stays valid after it was last written. Defaults to
+            3600. None disables expiry.
+        timeout (float): Number of seconds to wait for a lock held by another process. Defaults to
+            30.
+    """
+
+    def __init__(self, path: str, ttl: Union[float, None] = 3600, timeout: float = 30):
+        self.path = path
+        self.ttl = ttl
+        self.timeout = timeout
+        self._local = threading.local()
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "id TEXT NOT NULL, field TEXT NOT NULL, value BLOB NOT NULL, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL, PRIMARY KEY (id, field))"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS cache_updated_at ON cache (updated_at)")
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections can't be shared between threads or inherited across a fork
+        conn, pid = getattr(self._local, "conn", (None, None))
+        if conn is None or pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = (conn, os.getpid())
+        return conn
+
+    def _cutoff(self) -> float:
+        return time.time() - self.ttl if self.ttl is not None else float("-inf")
+
+    def generate_id(self, *args, **kwargs):
+        return str(uuid.uuid4())
+
+    def set(self, id, field, value):
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT INTO cache (id, field, value, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (id, field) DO UPDATE "
+                "SET value = excluded.value, updated_at = excluded.updated_at",
+                (id, field, encode_value(value), now, now),
+            )
+            # Expiry is measured per id, from its most recent write
+            conn.execute("UPDATE cache SET updated_at = ? WHERE id = ?", (now, id))
+            if self.ttl is not None:
+                conn.execute("DELETE FROM cache WHERE updated_at < ?", (self._cutoff(),))
+
+    def get(self, id, field):
+        row = self._connection().execute(
+            "SELECT value FROM cache WHERE id = ? AND field = ? AND updated_at >= ?",
+            (id, field, self._cutoff()),
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        return decode_value(row[0])
+
+    def get_all(self, field_list) -> list:
+        rows = self._connection().execute(
+            "SELECT id FROM cache WHERE updated_at >= ? GROUP BY id ORDER BY MIN(created_at)",
+            (self._cutoff(),),
+        ).fetchall()
+
+        return [
+            {"id": id, **{field: self.get(id=id, field=field) for field in field_list}}
+            for (id,) in rows
+        ]
+
+    def delete(self, id):
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM cache WHERE id = ?", (id,))
+
+    def clear(self):
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM cache")
+
+
+class RedisCache(Cache):
+    """
+    Cache stored in Redis, or any server that speaks the Redis protocol, so it can be shared by
+    every worker process and by several hosts. Each id is a hash with one field per cached value and
+    expires `ttl` seconds after it was last written. DataFrames are stored as Arrow IPC.
+
+    **Example:**
+    ```python
+    from vanna.flask import RedisCache, VannaFlaskApp
+
+    app = VannaFlaskApp(vn, cache=RedisCache(url="redis://localhost:6379/0")).flask_app
+    ```
+
+    Args:
+        url (str): Redis URL. Ignored when `client` is given. Defaults to redis://localhost:6379/0.
+        client (redis.Redis): An existing client, e.g. one with a connection pool shared with the
+            rest of the app.
+        prefix (str): Prefix for the keys. Defaults to "vanna:".
+        ttl (int): Number of seconds an id stays valid after it was last written. Defaults to 3600.
+            None disables expiry.
+    """
+
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        client=None,
+        prefix: str = "vanna:",
+        ttl: Union[int, None] = 3600,
+    ):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise DependencyError(
+                    "You need to install required dependencies to execute this method,"
+                    " run command: \npip install redis"
+                )
+
+            client = redis.Redis.from_url(url)
+
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def _key(self, id) -> str:
+        return f"{self.prefix}{id}"
+
+    @property
+    def _ids_key(self) -> str:
+        return f"{self.prefix}ids"
+
+    def generate_id(self, *args, **kwargs):
+        return str(uuid.uuid4())
+
+    def set(self, id, field, value):
+        key = self._key(id)
+        pipeline = self.client.pipeline()
+        pipeline.hset(key, field, encode_value(value))
+        if self.ttl is not None:
+            pipeline.expire(key, int(self.ttl))
+        # Remember the order in which ids were created for get_all
+        pipeline.zadd(self._ids_key, {id: time.time()}, nx=True)
+        pipeline.execute()
+
+    def get(self, id, field):
+        data = self.client.hget(self._key(id), field)
+        if data is None:
+            return None
+
+        return decode_value(data)
+
+    def get_all(self, field_list) -> list:
+        ids = [
+            id.decode("utf-8") if isinstance(id, bytes) else id
+            for id in self.client.zrange(self._ids_key, 0, -1)
+        ]
+
+        pipeline = self.client.pipeline()
+        for id in ids:
+            pipeline.exists(self._key(id))
+        alive = pipeline.execute()
+
+        expired = [id for id, exists in zip(ids, alive) if not exists]
+        if expired:
+            self.client.zrem(self._ids_key, *expired)
+
+        return [
+            {"id": id, **{field: self.get(id=id, field=field) for field in field_list}}
+            for id, exists in zip(ids, alive)
+            if exists
+        ]
+
+    def delete(self, id):
+        pipeline = self.client.pipeline()
+        pipeline.delete(self._key(id))
+        pipeline.zrem(self._ids_key, id)
+        pipeline.execute()
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=f"{self.prefix}*"))
+        if keys:
+            self.client.delete(*keys)
@@ -0,0 +1,190 @@
+import collections
+import threading
+import time
+from typing import List
+
+from ..transport import LatencyHistogram
+from ..utils import LRUCache
+from .prefix_cache import split_chat
+
+
+def encode_chat(
+    tokenizer, prompt: list, prefix_cache: LRUCache = None, **template_kwargs
+) -> List[int]:
+    """
+    Token ids of a chat prompt with the generation prompt appended, as `apply_chat_template` would
+    return them.
+
+    With a `prefix_cache`, the tokens of the system message are cached and reused, see
+    [`split_chat`][vanna.hf.prefix_cache.split_chat].
+    """
+    prefix_ids, suffix_ids = split_chat(tokenizer, prompt, prefix_cache, **template_kwargs)
+    return prefix_ids + suffix_ids
+
+
+class _Request:
+    def __init__(self, input_ids: List[int], generate_kwargs: dict):
+        self.input_ids = input_ids
+        self.generate_kwargs = generate_kwargs
+        # Only requests with the same generation settings can share a generate call
+        self.key = tuple(sorted((name, repr(value)) for name, value in generate_kwargs.items()))
+        self.enqueued = time.monotonic()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class GenerationBatcher:
+    """
+    In-process dynamic batching in front of a local transformers model.
+
+    Callers block in `generate` while a scheduler thread collects requests for up to `max_wait_ms`
+    after the first one arrives, or until `max_batch_size` are waiting, left-pads them to the same
+    length, runs a single `model.generate` on the batch and hands each caller its own completion.
+
+    Args:
+        model (PreTrainedModel): The causal language model.
+        tokenizer (PreTrainedTokenizer): Its tokenizer. The pad token falls back to the EOS token.
+        max_batch_size (int): Most requests per generate call. Defaults to 8.
+        max_wait_ms (float): How long the first request of a batch waits for others. Defaults to 10.
+    """
+
+    def __init__(self, model, tokenizer, max_batch_size: int = 8, max_wait_ms: float = 10.0):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+
+        self._queue = collections.deque()
+        self._condition = threading.Condition()
+        self._thread = None
+
+        self.requests = 0
+        self.batches = 0
+        self.generated_tokens = 0
+        self.generate_seconds = 0.0
+        self.queue_latency = LatencyHistogram()
+        self.latency = LatencyHistogram()
+
+    @property
+    def pad_token_id(self) -> int:
+        pad_token_id = self.tokenizer.pad_token_id
+        return pad_token_id if pad_token_id is not None else self.tokenizer.eos_token_id
+
+    def generate(self, input_ids: List[int], **generate_kwargs) -> List[int]:
+        """
+        Queue one tokenized prompt and wait for its completion.
+
+        Returns:
+            List[int]: The generated token ids, without the prompt and the trailing padding.
+        """
+        request = _Request(list(input_ids), generate_kwargs)
+        with self._condition:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="vanna-generation-batcher", daemon=True
+                )
+                self._thread.start()
+            self._queue.append(request)
+            self._condition.notify()
+
+        request.done.wait()
+        self.latency.observe(
+            (time.monotonic() - request.enqueued) * 1000, error=request.error is not None
+        )
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _next_batch(self) -> List[_Request]:
+        with self._condition:
+            while not self._queue:
+                self._condition.wait()
+
+            first = self._queue[0]
+            deadline = first.enqueued + self.max_wait
+            while (
+                sum(1 for request in self._queue if request.key == first.key) < self.max_batch_size
+            ):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            batch = [request for request in self._queue if request.key == first.key]
+            batch = batch[:self.max_batch_size]
+            for request in batch:
+                self._queue.remove(request)
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            started = time.monotonic()
+            for request in batch:
+                self.queue_latency.observe((started - request.enqueued) * 1000)
+
+            try:
+                results = self._generate_batch(batch)
+            except Exception as e:
+                for request in batch:
+                    request.error = e
+                    request.done.set()
+                continue
+
+            self.requests += len(batch)
+            self.batches += 1
+            self.generate_seconds += time.monotonic() - started
+            for request, result in zip(batch, results):
+                self.generated_tokens += len(result)
+                request.result = result
+                request.done.set()
+
+    def _generate_batch(self, batch: List[_Request]) -> List[List[int]]:
+        import torch
+
+        pad_token_id = self.pad_token_id
+        length = max(len(request.input_ids) for request in batch)
+
+        # Decoder-only models continue from the last position, so the padding goes on the left
+        input_ids = [
+            [pad_token_id] * (length - len(request.input_ids)) + request.input_ids
+            for request in batch
+        ]
+        attention_mask = [
+            [0] * (length - len(request.input_ids)) + [1] * len(request.input_ids)
+            for request in batch
+        ]
+
+        with torch.no_grad():
+            outputs = self.model.generate(
+                input_ids=torch.tensor(input_ids, device=self.model.device),
+                attention_mask=torch.tensor(attention_mask, device=self.model.device),
+                pad_token_id=pad_token_id,
+                **batch[0].generate_kwargs,
+            )
+
+        results = []
+        for output in outputs[:, length:].tolist():
+            while output and output[-1] == pad_token_id:
+                output.pop()
+            results.append(output)
+        return results
+
+    def stats(self) -> dict:
+        """
+        Throughput and latency counters: requests and batches served, mean batch size, generated
+        tokens per second of generate time, and the queue wait and end-to-end latency histograms.
+        """
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "queued": len(self._queue),
+            "generated_tokens": self.generated_tokens,
+            "tokens_per_second": (
+                self.generated_tokens / self.generate_seconds if self.generate_seconds else 0.0
+            ),
+            "queue_latency": self.queue_latency.stats(),
+            "latency": self.latency.stats(),
+        }
@@ -1,7 +1,11 @@
 import re
-from transformers import AutoTokenizer, AutoModelForCausalLM
 
 from ..base import VannaBase
+from ..utils import LRUCache
+from .batching import encode_chat
+from .prefix_cache import PrefixKVCache, split_chat
+from .registry import model_registry
+from .streaming import stream_chat
 
 
 class Hf(VannaBase):
@@ -11,13 +15,51 @@ class Hf(VannaBase):
       )  # e.g. meta-llama/Meta-Llama-3-8B-Instruct or local path to the model checkpoint files
         # list of quantization methods supported by transformers package: https://huggingface.co/docs/transformers/main/en/quantization/overview
       quantization_config = self.config.get("quantization_config", None)
-      self.tokenizer = AutoTokenizer.from_pretrained(model_name_or_path)
-      self.model = AutoModelForCausalLM.from_pretrained(
-          model_name_or_path,
-          quantization_config=quantization_config,
-          device_map="auto",
+      model_kwargs = {"quantization_config": quantization_config}
+      if self.config.get("use_safetensors") is not None:
+          model_kwargs["use_safetensors"] = self.config["use_safetensors"]
+
+      # Nothing is loaded until the first prompt or warmup(), and instances using the same model
+      # share its weights
+      self.local_model = model_registry.get(model_name_or_path, **model_kwargs)
+
+      self._prompt_prefix_cache = LRUCache(max_size=self.config.get("prompt_prefix_cache_size", 64))
+
+      # With prefix_kv_cache, the attention states of the system prompt are reused across questions
+      self.prefix_kv_cache = None
+      if self.config.get("prefix_kv_cache", False):
+          self.prefix_kv_cache = PrefixKVCache(
+              max_bytes=int(self.config.get("prefix_kv_cache_max_mb", 512) * 1024 * 1024),
+              min_prefix_tokens=self.config.get("prefix_kv_cache_min_tokens", 64),
+          )
+
+    @property
+    def tokenizer(self):
+        return self.local_model.tokenizer
+
+    @property
+    def model(self):
+        return self.local_model.model
+
+    @property
+    def generation_batcher(self):
+        """
+        With generation_batching, concurrent requests, from every instance using the same model,
+        share one generate call.
+        """
+        if not self.config.get("generation_batching", False):
+            return None
+        return self.local_model.batcher(
+            max_batch_size=self.config.get("generation_max_batch_size", 8),
+            max_wait_ms=self.config.get("generation_max_wait_ms", 10),
         )
 
+    def warmup(self) -> None:
+        """
+        Load the tokenizer and the model now instead of on the first prompt.
+        """
+        self.local_model.warmup()
+
     def system_message(self, message: str) -> any:
       return {"role": "system", "content": message}
 
@@ -61,21 +103,45 @@ class Hf(VannaBase):
         return self.extract_sql_query(sql)
 
     def submit_prompt(self, prompt, **kwargs) -> str:
-
-        input_ids = self.tokenizer.apply_chat_template(
-            prompt, add_generation_prompt=True, return_tensors="pt"
-        ).to(self.model.device)
-
-        outputs = self.model.generate(
-            input_ids,
+        generate_kwargs = dict(
             max_new_tokens=512,
             eos_token_id=self.tokenizer.eos_token_id,
             do_sample=True,
             temperature=1,
             top_p=0.9,
         )
-        response = outputs[0][input_ids.shape[-1] :]
+
+        generation_batcher = self.generation_batcher
+        if generation_batcher is not None:
+            input_ids = encode_chat(self.tokenizer, prompt, self._prompt_prefix_cache)
+            response = generation_batcher.generate(input_ids, **generate_kwargs)
+        elif self.prefix_kv_cache is not None:
+            prefix_ids, suffix_ids = split_chat(self.tokenizer, prompt, self._prompt_prefix_cache)
+            response = self.prefix_kv_cache.generate(
+                self.model, prefix_ids, suffix_ids, **generate_kwargs
+            )
+        else:
+            input_ids = self.tokenizer.apply_chat_template(
+                prompt, add_generation_prompt=True, return_tensors="pt"
+            ).to(self.model.device)
+
+            outputs = self.model.generate(input_ids, **generate_kwargs)
+            response = outputs[0][input_ids.shape[-1] :]
+
         response = self.tokenizer.decode(response, skip_special_tokens=True)
         self.log(response)
 
         return response
+
+    def submit_prompt_stream(self, prompt, **kwargs):
+        yield from stream_chat(
+            self.model,
+            self.tokenizer,
+            prompt,
+            timeout=self.config.get("generation_stream_timeout", 300),
+            max_new_tokens=512,
+            eos_token_id=self.tokenizer.eos_token_id,
+            do_sample=True,
+            temperature=1,
+            top_p=0.9,
+        )
@@ -0,0 +1,189 @@
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Tuple
+
+from ..utils import LRUCache
+
+
+def split_chat(
+    tokenizer, prompt: list, token_cache: LRUCache = None, **template_kwargs
+) -> Tuple[List[int], List[int]]:
+    """
+    Token ids of a chat prompt with the generation prompt appended, split into the prefix (the
+    system message, with the DDL, documentation and guidelines that repeat across questions) and the
+    suffix (the example question/SQL pairs, which change with every question, and the question being
+    asked).
+
+    With a `token_cache`, the tokens of the prefix are cached and reused. Prompts that don't start
+    with a system message, and templates that don't render it as a prefix of the conversation, give
+    an empty prefix.
+    """
+    text = tokenizer.apply_chat_template(
+        prompt, tokenize=False, add_generation_prompt=True, **template_kwargs
+    )
+
+    prefix = ""
+    if len(prompt) > 1 and prompt[0].get("role") == "system":
+        prefix = tokenizer.apply_chat_template(
+            prompt[:1], tokenize=False, add_generation_prompt=False, **template_kwargs
+        )
+        if not text.startswith(prefix):
+            prefix = ""
+
+    suffix_ids = tokenizer.encode(text[len(prefix):], add_special_tokens=False)
+    return encode_prefix(tokenizer, prefix, token_cache), suffix_ids
+
+
+def encode_prefix(
+    tokenizer, prefix: str, token_cache: LRUCache = None, add_special_tokens: bool = False
+) -> List[int]:
+    if not prefix:
+        return []
+
+    prefix_ids = token_cache.get(prefix) if token_cache is not None else None
+    if prefix_ids is None:
+        prefix_ids = tokenizer.encode(prefix, add_special_tokens=add_special_tokens)
+        if token_cache is not None:
+            token_cache.set(prefix, prefix_ids)
+    return prefix_ids
+
+
+def _nbytes(value, depth: int = 0) -> int:
+    # Works for legacy tuple caches as well as the Cache classes, whose tensors sit in (nested)
+    # attributes
+    if depth > 6 or value is None:
+        return 0
+    if hasattr(value, "element_size") and hasattr(value, "numel"):
+        return value.element_size() * value.numel()
+    if isinstance(value, (list, tuple)):
+        return sum(_nbytes(item, depth + 1) for item in value)
+    if isinstance(value, dict):
+        return sum(_nbytes(item, depth + 1) for item in value.values())
+    if hasattr(value, "__dict__"):
+        return sum(_nbytes(item, depth + 1) for item in vars(value).values())
+    return 0
+
+
+class PrefixKVCache:
+    """
+    Cache of the attention key/value states (`past_key_values`) of prompt prefixes, so a prompt that
+    starts with a prefix seen before only prefills its new suffix.
+
+    Entries are keyed by a hash of the prefix token ids and evicted least recently used first once
+    their tensors take more than `max_bytes`.
+
+    Args:
+        max_bytes (int): Memory budget of the cached states. Defaults to 512 MiB.
+        min_prefix_tokens (int): Shorter prefixes are cheap to prefill and aren't cached. Defaults
+            to 64.
+    """
+
+    def __init__(self, max_bytes: int = 512 * 1024 * 1024, min_prefix_tokens: int = 64):
+        self.max_bytes = max_bytes
+        self.min_prefix_tokens = min_prefix_tokens
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.reused_tokens = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(prefix_ids: List[int]) -> str:
+        return hashlib.sha256(
+            b"".join(token.to_bytes(4, "little") for token in prefix_ids)
+        ).hexdigest()
+
+    def get(self, prefix_ids: List[int]):
+        key = self.key(prefix_ids)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.reused_tokens += len(prefix_ids)
+            return entry[0]
+
+    def set(self, prefix_ids: List[int], past_key_values) -> None:
+        size = _nbytes(past_key_values)
+        if size > self.max_bytes:
+            return
+
+        key = self.key(prefix_ids)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self._entries[key] = (past_key_values, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def _prefill(self, model, prefix_ids: List[int]):
+        import torch
+
+        with torch.no_grad():
+            output = model(
+                input_ids=torch.tensor([prefix_ids], device=model.device), use_cache=True
+            )
+        return output.past_key_values
+
+    def generate(
+        self, model, prefix_ids: List[int], suffix_ids: List[int], **generate_kwargs
+    ) -> List[int]:
+        """
+        Generate a completion of `prefix_ids + suffix_ids`, starting from the cached states of
+        `prefix_ids` when there are some, and caching them otherwise.
+
+        Returns:
+            List[int]: The generated token ids, without the prompt.
+        """
+        import torch
+
+        input_ids = list(prefix_ids) + list(suffix_ids)
+        past_key_values = None
+
+        # generate needs at least one uncached token to start from
+        if len(prefix_ids) >= self.min_prefix_tokens and suffix_ids:
+            past_key_values = self.get(prefix_ids)
+            if past_key_values is None:
+                past_key_values = self._prefill(model, prefix_ids)
+                self.set(prefix_ids, past_key_values)
+            # generate extends the cache in place, so each call works on its own copy of the prefix
+            # states
+            past_key_values = copy.deepcopy(past_key_values)
+
+        inputs = torch.tensor([input_ids], device=model.device)
+        with torch.no_grad():
+            outputs = model.generate(
+                input_ids=inputs,
+                attention_mask=torch.ones_like(inputs),
+                past_key_values=past_key_values,
+                **generate_kwargs,
+            )
+        return outputs[0, len(input_ids):].tolist()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "reused_tokens": self.reused_tokens,
+        }
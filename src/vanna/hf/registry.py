@@ -0,0 +1,154 @@
+import threading
+from typing import Dict, List, Union
+
+from ..exceptions import DependencyError
+
+
+def _transformers():
+    try:
+        import transformers
+    except ImportError:
+        raise DependencyError(
+            "You need to install required dependencies to execute this method, run command:"
+            " \npip install transformers"
+        )
+    return transformers
+
+
+class LocalModel:
+    """
+    A local transformers model and its tokenizer, loaded on first use and shared by every Vanna
+    instance that asks the [`ModelRegistry`][vanna.hf.registry.ModelRegistry] for the same model and
+    loading options.
+
+    Args:
+        model_name_or_path (str): Hugging Face model id or local checkpoint directory.
+        token (str): Hugging Face access token for gated models.
+        model_kwargs (dict): Extra `AutoModelForCausalLM.from_pretrained` arguments, e.g.
+            `quantization_config`.
+    """
+
+    def __init__(
+        self, model_name_or_path: str, token: Union[str, None] = None, model_kwargs: dict = None
+    ):
+        self.model_name_or_path = model_name_or_path
+        self.token = token
+        self.model_kwargs = model_kwargs or {}
+
+        self._tokenizer = None
+        self._model = None
+        self._batcher = None
+        self._lock = threading.RLock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    @property
+    def tokenizer(self):
+        if self._tokenizer is None:
+            with self._lock:
+                if self._tokenizer is None:
+                    transformers = _transformers()
+                    self._tokenizer = transformers.AutoTokenizer.from_pretrained(
+                        self.model_name_or_path, token=self.token
+                    )
+        return self._tokenizer
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    transformers = _transformers()
+                    # Safetensors checkpoints are memory-mapped, and low_cpu_mem_usage loads the
+                    # weights straight into the model instead of materializing a randomly
+                    # initialized copy first
+                    kwargs = {"device_map": "auto", "low_cpu_mem_usage": True, **self.model_kwargs}
+                    self._model = transformers.AutoModelForCausalLM.from_pretrained(
+                        self.model_name_or_path, token=self.token, **kwargs
+                    )
+        return self._model
+
+    def batcher(self, max_batch_size: int = 8, max_wait_ms: float = 10.0):
+        """
+        The [`GenerationBatcher`][vanna.hf.batching.GenerationBatcher] of this model, shared by
+        every instance using it so their concurrent requests batch together. The first caller's
+        settings apply.
+        """
+        if self._batcher is None:
+            with self._lock:
+                if self._batcher is None:
+                    from .batching import GenerationBatcher
+
+                    self._batcher = GenerationBatcher(
+                        self.model,
+                        self.tokenizer,
+                        max_batch_size=max_batch_size,
+                        max_wait_ms=max_wait_ms,
+                    )
+        return self._batcher
+
+    def warmup(self) -> "LocalModel":
+        """
+        Load the tokenizer and the weights now instead of on the first prompt.
+        """
+        self.tokenizer
+        self.model
+        return self
+
+
+class ModelRegistry:
+    """
+    Process-wide registry of local models. Looking a model up is cheap: nothing is loaded until its
+    tokenizer or weights are first used, and instances that use the same `model_name_or_path` with
+    the same options share one copy of the weights.
+    """
+
+    def __init__(self):
+        self._models: Dict[tuple, LocalModel] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model_name_or_path: str, token: Union[str, None] = None, **model_kwargs) -> tuple:
+        return (
+            model_name_or_path,
+            token,
+            repr(sorted(model_kwargs.items(), key=lambda item: item[0])),
+        )
+
+    def get(
+        self, model_name_or_path: str, token: Union[str, None] = None, **model_kwargs
+    ) -> LocalModel:
+        key = self.key(model_name_or_path, token, **model_kwargs)
+        with self._lock:
+            local_model = self._models.get(key)
+            if local_model is None:
+                local_model = self._models[key] = LocalModel(
+                    model_name_or_path, token, model_kwargs
+                )
+            return local_model
+
+    def loaded(self) -> List[str]:
+        """
+        `model_name_or_path` of every model whose weights are in memory.
+        """
+        with self._lock:
+            return [
+                local_model.model_name_or_path
+                for local_model in self._models.values()
+                if local_model.loaded
+            ]
+
+    def unload(self, model_name_or_path: Union[str, None] = None) -> None:
+        """
+        Forget the models loaded from `model_name_or_path`, or every model. Their memory is freed
+        once no instance refers to them any more.
+        """
+        with self._lock:
+            for key in list(self._models):
+                if model_name_or_path is None or key[0] == model_name_or_path:
+                    del self._models[key]
+
+
+model_registry = ModelRegistry()
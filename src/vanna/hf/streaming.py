@@ -0,0 +1,48 @@
+import queue
+import threading
+from typing import Iterator
+
+
+def stream_chat(
+    model, tokenizer, prompt: list, timeout: float = 300, **generate_kwargs
+) -> Iterator[str]:
+    """
+    Generate a completion of a chat prompt on a background thread and yield the decoded text as it
+    is produced, without the prompt and special tokens.
+
+    An exception raised by `generate` is re-raised here once the text produced before it has been
+    yielded. If no text arrives for `timeout` seconds, a TimeoutError is raised instead of waiting
+    forever.
+    """
+    from transformers import TextIteratorStreamer
+
+    input_ids = tokenizer.apply_chat_template(
+        prompt, add_generation_prompt=True, return_tensors="pt"
+    ).to(model.device)
+
+    streamer = TextIteratorStreamer(
+        tokenizer, skip_prompt=True, skip_special_tokens=True, timeout=timeout
+    )
+    errors = []
+
+    def generate():
+        try:
+            model.generate(input_ids=input_ids, streamer=streamer, **generate_kwargs)
+        except BaseException as e:
+            # Without the end signal the consumer would wait on the streamer forever
+            errors.append(e)
+            streamer.end()
+
+    thread = threading.Thread(target=generate, daemon=True)
+    thread.start()
+
+    try:
+        for text in streamer:
+            if text:
+                yield text
+    except queue.Empty:
+        raise TimeoutError(f"The model produced no text for {timeout} seconds")
+
+    thread.join()
+    if errors:
+        raise errors[0]
@@ -1,5 +1,5 @@
 import uuid
-from typing import List
+from typing import List, Tuple
 
 import pandas as pd
 from pymilvus import DataType, MilvusClient, model
@@ -56,7 +56,7 @@ class Milvus_VectorStore(VannaBase):
 
 
     def generate_embedding(self, data: str, **kwargs) -> List[float]:
-        return self.embedding_function.encode_documents(data).tolist()
+        return self.embedding_function.encode_documents([data])[0].tolist()
 
 
     def _create_sql_collection(self, name: str):
@@ -136,7 +136,7 @@ class Milvus_VectorStore(VannaBase):
         if len(question) == 0 or len(sql) == 0:
             raise Exception("pair of question and sql can not be null")
         _id = str(uuid.uuid4()) + "-sql"
-        embedding = self.embedding_function.encode_documents([question])[0]
+        embedding = self.generate_embedding(question)
         self.milvus_client.insert(
             collection_name="vannasql",
             data={
@@ -152,7 +152,7 @@ class Milvus_VectorStore(VannaBase):
         if len(ddl) == 0:
             raise Exception("ddl can not be null")
         _id = str(uuid.uuid4()) + "-ddl"
-        embedding = self.embedding_function.encode_documents([ddl])[0]
+        embedding = self.generate_embedding(ddl)
         self.milvus_client.insert(
             collection_name="vannaddl",
             data={
@@ -167,7 +167,7 @@ class Milvus_VectorStore(VannaBase):
         if len(documentation) == 0:
             raise Exception("documentation can not be null")
         _id = str(uuid.uuid4()) + "-doc"
-        embedding = self.embedding_function.encode_documents([documentation])[0]
+        embedding = self.generate_embedding(documentation)
         self.milvus_client.insert(
             collection_name="vannadoc",
             data={
@@ -178,6 +178,48 @@ class Milvus_VectorStore(VannaBase):
         )
         return _id
 
+    def generate_embeddings(self, data: List[str], **kwargs) -> List[List[float]]:
+        return [
+            embedding.tolist() for embedding in self.embedding_function.encode_documents(list(data))
+        ]
+
+    def add_question_sql_batch(self, question_sql: List[Tuple[str, str]], **kwargs) -> List[str]:
+        if any(len(question) == 0 or len(sql) == 0 for question, sql in question_sql):
+            raise Exception("pair of question and sql can not be null")
+        return self._insert_batch(
+            "vannasql",
+            [question for question, _ in question_sql],
+            [{"text": question, "sql": sql} for question, sql in question_sql],
+            "-sql",
+        )
+
+    def add_ddl_batch(self, ddls: List[str], **kwargs) -> List[str]:
+        if any(len(ddl) == 0 for ddl in ddls):
+            raise Exception("ddl can not be null")
+        return self._insert_batch("vannaddl", ddls, [{"ddl": ddl} for ddl in ddls], "-ddl")
+
+    def add_documentation_batch(self, documentation: List[str], **kwargs) -> List[str]:
+        if any(len(doc) == 0 for doc in documentation):
+            raise Exception("documentation can not be null")
+        return self._insert_batch(
+            "vannadoc", documentation, [{"doc": doc} for doc in documentation], "-doc"
+        )
+
+    def _insert_batch(
+        self, collection_name: str, texts: List[str], rows: List[dict], suffix: str
+    ) -> List[str]:
+        ids = [str(uuid.uuid4()) + suffix for _ in texts]
+        if ids:
+            embeddings = self.generate_embeddings(texts)
+            self.milvus_client.insert(
+                collection_name=collection_name,
+                data=[
+                    {"id": _id, **row, "vector": embedding}
+                    for _id, row, embedding in zip(ids, rows, embeddings)
+                ],
+            )
+        return ids
+
     def get_training_data(self, **kwargs) -> pd.DataFrame:
         sql_data = self.milvus_client.query(
             collection_name="vannasql",
@@ -49,3 +49,11 @@ class Mistral(VannaBase):
         )
 
         return chat_response.choices[0].message.content
+
+    async def asubmit_prompt(self, prompt, **kwargs) -> str:
+        chat_response = await self.client.chat.complete_async(
+            model=self.model,
+            messages=prompt,
+        )
+
+        return chat_response.choices[0].message.content
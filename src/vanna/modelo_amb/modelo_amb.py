@@ -1,8 +1,11 @@
 import sentencepiece
-import re 
-from transformers import AutoTokenizer, AutoModelForCausalLM
+import re
 from ..base import VannaBase
-from .vector_store import vector_store
+from ..hf.batching import encode_chat
+from ..hf.prefix_cache import PrefixKVCache, split_chat
+from ..hf.registry import model_registry
+from ..hf.streaming import stream_chat
+from ..utils import LRUCache
 
 
 class ModeloAMB(VannaBase):
@@ -16,26 +19,54 @@ class ModeloAMB(VannaBase):
         token = config.get("token")
         quantization_config = config.get("quantization_config", {})
 
-        # Carga del tokenizer con o sin token
-        if token:
-            self.tokenizer = AutoTokenizer.from_pretrained(model_name_or_path, use_auth_token=token)
-        else:
-            self.tokenizer = AutoTokenizer.from_pretrained(model_name_or_path)
+        # Agregar configuraciones de cuantización solo si están definidas
+        model_params = dict(quantization_config) if quantization_config else {}
+        if config.get("use_safetensors") is not None:
+            model_params["use_safetensors"] = config["use_safetensors"]
+
+        # El tokenizer y el modelo se cargan en el primer uso (o con warmup()), y las instancias que
+        # usan el mismo modelo comparten los pesos a través del registro del proceso
+        self.local_model = model_registry.get(
+            model_name_or_path, token=token or None, **model_params
+        )
 
-        # Carga del modelo con manejo de cuantización si es necesario
-        model_params = {
-            "device_map": "auto",
-            "use_auth_token": token if token else None
-        }
+        self._prompt_prefix_cache = LRUCache(max_size=config.get("prompt_prefix_cache_size", 64))
 
-        # Agregar configuraciones de cuantización solo si están definidas
-        model_params.update(quantization_config) if quantization_config else None
+        # Con prefix_kv_cache, los estados de atención del prompt de sistema se reutilizan entre
+        # preguntas
+        self.prefix_kv_cache = None
+        if config.get("prefix_kv_cache", False):
+            self.prefix_kv_cache = PrefixKVCache(
+                max_bytes=int(config.get("prefix_kv_cache_max_mb", 512) * 1024 * 1024),
+                min_prefix_tokens=config.get("prefix_kv_cache_min_tokens", 64),
+            )
 
-        self.model = AutoModelForCausalLM.from_pretrained(model_name_or_path, **model_params)
-    
+    @property
+    def tokenizer(self):
+        return self.local_model.tokenizer
 
+    @property
+    def model(self):
+        return self.local_model.model
 
+    @property
+    def generation_batcher(self):
+        """
+        Con generation_batching, las peticiones concurrentes (de todas las instancias con el mismo
+        modelo) comparten una llamada a generate.
+        """
+        if not self.config.get("generation_batching", False):
+            return None
+        return self.local_model.batcher(
+            max_batch_size=self.config.get("generation_max_batch_size", 8),
+            max_wait_ms=self.config.get("generation_max_wait_ms", 10),
+        )
 
+    def warmup(self) -> None:
+        """
+        Carga el tokenizer y el modelo ahora en lugar de en la primera pregunta.
+        """
+        self.local_model.warmup()
 
     def system_message(self, message: str) -> dict:
         return {"role": "system", "content": message}
@@ -69,19 +100,31 @@ class ModeloAMB(VannaBase):
         """
         Envía un prompt al modelo de lenguaje y devuelve la respuesta generada.
         """
-        input_ids = self.tokenizer.apply_chat_template(
-            prompt, add_generation_prompt=True, return_tensors="pt"
-        ).to(self.model.device)
-
-        outputs = self.model.generate(
-            input_ids,
+        generate_kwargs = dict(
             max_new_tokens=512,
             eos_token_id=self.tokenizer.eos_token_id,
             do_sample=True,
             temperature=1,
             top_p=0.9,
         )
-        response = outputs[0][input_ids.shape[-1]:]
+
+        generation_batcher = self.generation_batcher
+        if generation_batcher is not None:
+            input_ids = encode_chat(self.tokenizer, prompt, self._prompt_prefix_cache)
+            response = generation_batcher.generate(input_ids, **generate_kwargs)
+        elif self.prefix_kv_cache is not None:
+            prefix_ids, suffix_ids = split_chat(self.tokenizer, prompt, self._prompt_prefix_cache)
+            response = self.prefix_kv_cache.generate(
+                self.model, prefix_ids, suffix_ids, **generate_kwargs
+            )
+        else:
+            input_ids = self.tokenizer.apply_chat_template(
+                prompt, add_generation_prompt=True, return_tensors="pt"
+            ).to(self.model.device)
+
+            outputs = self.model.generate(input_ids, **generate_kwargs)
+            response = outputs[0][input_ids.shape[-1]:]
+
         response = self.tokenizer.decode(response, skip_special_tokens=True)
         self.log(response)
 
@@ -89,3 +132,20 @@ class ModeloAMB(VannaBase):
 
   
 
+
+    def submit_prompt_stream(self, prompt, **kwargs):
+        """
+        Igual que submit_prompt, pero devuelve los fragmentos de texto a medida que el modelo los
+        genera.
+        """
+        yield from stream_chat(
+            self.model,
+            self.tokenizer,
+            prompt,
+            timeout=self.config.get("generation_stream_timeout", 300),
+            max_new_tokens=512,
+            eos_token_id=self.tokenizer.eos_token_id,
+            do_sample=True,
+            temperature=1,
+            top_p=0.9,
+        )
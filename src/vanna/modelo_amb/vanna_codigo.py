@@ -2,22 +2,24 @@
 
 from vanna.modelo_amb.modelo_amb import ModeloAMB
 from .vector_store import AMB_VectorStore
-import torch
+from ..hf.prefix_cache import encode_prefix
 from datetime import datetime
 
 class AmbVannaCodigo(ModeloAMB, AMB_VectorStore):
 
-  """
+    """
     Clase específica para la generación de código Python de mapa y grafico a partir de prompts en lenguaje natural.
 
     Hereda la configuración general del modelo LLM desde ModeloAMB y las funcionalidades de recuperación semántica desde AMB_VectorStore.
     Esta implementación está diseñada para recibir instrucciones sobre visualización de datos, generar el código necesario
     """
-  
+
     def __init__(self, config=None):
+        # ModeloAMB.__init__ ya inicializa AMB_VectorStore a través de super(), y el modelo se
+        # obtiene del registro compartido, así que no se carga una segunda copia de los pesos
         super().__init__(config=config)
-        AMB_VectorStore.__init__(self, config=config)
         print("Modelo general usa el modelo base tal cual.")
+
     def submit_prompt(self, prompt, **kwargs) -> str:
         """
      
@@ -25,6 +27,7 @@ class AmbVannaCodigo(ModeloAMB, AMB_VectorStore):
         
         """
       
+        system_msg = None
         if prompt[0]["role"] == "system":
             system_msg = prompt[0]["content"]
             # Pegamos esta instrucción al principio de la primera 'user'
@@ -48,6 +51,40 @@ class AmbVannaCodigo(ModeloAMB, AMB_VectorStore):
         )
 
 
+        generate_kwargs = dict(
+            max_new_tokens=3000,
+            eos_token_id=self.tokenizer.eos_token_id,
+            do_sample=False,
+            temperature=0.2,
+            top_p=1.0,
+        )
+
+        system_end = full_prompt.find(system_msg) if system_msg else -1
+        if self.prefix_kv_cache is not None and system_end >= 0:
+            # El contexto de sistema (DDL, documentación, pautas) se repite entre preguntas: se
+            # codifica una vez y sus estados de atención se reutilizan, solo se procesa el resto del
+            # prompt
+            system_end += len(system_msg)
+            prefix_ids = encode_prefix(
+                self.tokenizer,
+                full_prompt[:system_end],
+                self._prompt_prefix_cache,
+                add_special_tokens=True,
+            )
+            suffix_ids = self.tokenizer.encode(full_prompt[system_end:], add_special_tokens=False)
+
+            self.log(full_prompt, title="Prompt real al modelo código")
+            self.log(len(prefix_ids) + len(suffix_ids), title="Longitud (tokens)")
+
+            response = self.prefix_kv_cache.generate(
+                self.model, prefix_ids, suffix_ids, **generate_kwargs
+            )
+            response = self.tokenizer.decode(response, skip_special_tokens=True)
+
+            self.log(response)
+
+            return response
+
         # Codifiquem el prompt
         input_ids = self.tokenizer.encode(full_prompt, return_tensors="pt").to(self.model.device)
 
@@ -55,14 +92,7 @@ class AmbVannaCodigo(ModeloAMB, AMB_VectorStore):
         print("\n==== LONGITUD (tokens) ====\n", len(input_ids[0]))
 
         # Generem la resposta
-        outputs = self.model.generate(
-            input_ids,
-            max_new_tokens=3000,
-            eos_token_id=self.tokenizer.eos_token_id,
-            do_sample=False,
-            temperature=0.2,
-            top_p=1.0,
-        )
+        outputs = self.model.generate(input_ids, **generate_kwargs)
 
         # Extraiem només la part generada
         response = outputs[0][input_ids.shape[-1]:]
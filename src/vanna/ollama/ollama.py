@@ -30,6 +30,7 @@ class Ollama(VannaBase):
     self.ollama_timeout = config.get("ollama_timeout", 240.0)
 
     self.ollama_client = ollama.Client(self.host, timeout=Timeout(self.ollama_timeout))
+    self.ollama_async_client = ollama.AsyncClient(self.host, timeout=Timeout(self.ollama_timeout))
     self.keep_alive = config.get('keep_alive', None)
     self.ollama_options = config.get('options', {})
     self.num_ctx = self.ollama_options.get('num_ctx', 2048)
@@ -85,13 +86,16 @@ class Ollama(VannaBase):
     else:
       return llm_response
 
-  def submit_prompt(self, prompt, **kwargs) -> str:
+  def _log_request(self, prompt):
     self.log(
       f"Ollama parameters:\n"
       f"model={self.model},\n"
       f"options={self.ollama_options},\n"
       f"keep_alive={self.keep_alive}")
     self.log(f"Prompt Content:\n{json.dumps(prompt, ensure_ascii=False)}")
+
+  def submit_prompt(self, prompt, **kwargs) -> str:
+    self._log_request(prompt)
     response_dict = self.ollama_client.chat(model=self.model,
                                             messages=prompt,
                                             stream=False,
@@ -101,3 +105,28 @@ class Ollama(VannaBase):
     self.log(f"Ollama Response:\n{str(response_dict)}")
 
     return response_dict['message']['content']
+
+  def submit_prompt_stream(self, prompt, **kwargs):
+    self._log_request(prompt)
+    response = self.ollama_client.chat(model=self.model,
+                                       messages=prompt,
+                                       stream=True,
+                                       options=self.ollama_options,
+                                       keep_alive=self.keep_alive)
+
+    for chunk in response:
+      content = chunk['message']['content']
+      if content:
+        yield content
+
+  async def asubmit_prompt(self, prompt, **kwargs) -> str:
+    self._log_request(prompt)
+    response_dict = await self.ollama_async_client.chat(model=self.model,
+                                                        messages=prompt,
+                                                        stream=False,
+                                                        options=self.ollama_options,
+                                                        keep_alive=self.keep_alive)
+
+    self.log(f"Ollama Response:\n{str(response_dict)}")
+
+    return response_dict['message']['content']
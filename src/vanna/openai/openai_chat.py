@@ -1,16 +1,17 @@
 import os
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
 from ..base import VannaBase
 
 
 class OpenAI_Chat(VannaBase):
-    def __init__(self, client=None, config=None):
+    def __init__(self, client=None, config=None, async_client=None):
         VannaBase.__init__(self, config=config)
 
         # default parameters - can be overrided using config
         self.temperature = 0.7
+        self.async_client = async_client
 
         if "temperature" in config:
             self.temperature = config["temperature"]
@@ -50,7 +51,7 @@ class OpenAI_Chat(VannaBase):
     def assistant_message(self, message: str) -> any:
         return {"role": "assistant", "content": message}
 
-    def submit_prompt(self, prompt, **kwargs) -> str:
+    def _get_model_kwargs(self, prompt, **kwargs) -> dict:
         if prompt is None:
             raise Exception("Prompt is None")
 
@@ -68,43 +69,23 @@ class OpenAI_Chat(VannaBase):
             print(
                 f"Using model {model} for {num_tokens} tokens (approx)"
             )
-            response = self.client.chat.completions.create(
-                model=model,
-                messages=prompt,
-                stop=None,
-                temperature=self.temperature,
-            )
+            return {"model": model}
         elif kwargs.get("engine", None) is not None:
             engine = kwargs.get("engine", None)
             print(
                 f"Using model {engine} for {num_tokens} tokens (approx)"
             )
-            response = self.client.chat.completions.create(
-                engine=engine,
-                messages=prompt,
-                stop=None,
-                temperature=self.temperature,
-            )
+            return {"engine": engine}
         elif self.config is not None and "engine" in self.config:
             print(
                 f"Using engine {self.config['engine']} for {num_tokens} tokens (approx)"
             )
-            response = self.client.chat.completions.create(
-                engine=self.config["engine"],
-                messages=prompt,
-                stop=None,
-                temperature=self.temperature,
-            )
+            return {"engine": self.config["engine"]}
         elif self.config is not None and "model" in self.config:
             print(
                 f"Using model {self.config['model']} for {num_tokens} tokens (approx)"
             )
-            response = self.client.chat.completions.create(
-                model=self.config["model"],
-                messages=prompt,
-                stop=None,
-                temperature=self.temperature,
-            )
+            return {"model": self.config["model"]}
         else:
             if num_tokens > 3500:
                 model = "gpt-3.5-turbo-16k"
@@ -112,13 +93,19 @@ class OpenAI_Chat(VannaBase):
                 model = "gpt-3.5-turbo"
 
             print(f"Using model {model} for {num_tokens} tokens (approx)")
-            response = self.client.chat.completions.create(
-                model=model,
-                messages=prompt,
-                stop=None,
-                temperature=self.temperature,
-            )
+            return {"model": model}
 
+    def submit_prompt(self, prompt, **kwargs) -> str:
+        response = self.client.chat.completions.create(
+            **self._get_model_kwargs(prompt, **kwargs),
+            messages=prompt,
+            stop=None,
+            temperature=self.temperature,
+        )
+
+        return self._get_response_text(response)
+
+    def _get_response_text(self, response) -> str:
         # Find the first response from the chatbot that has text in it (some responses may not have text)
         for choice in response.choices:
             if "text" in choice:
@@ -126,3 +113,41 @@ class OpenAI_Chat(VannaBase):
 
         # If no response with text is found, return the first response's content (which may be empty)
         return response.choices[0].message.content
+
+    def _get_async_client(self):
+        if getattr(self, "async_client", None) is None and type(self.client) is OpenAI:
+            # Azure and other custom clients can't be cloned, pass async_client for those
+            self.async_client = AsyncOpenAI(
+                api_key=self.client.api_key,
+                organization=self.client.organization,
+                base_url=self.client.base_url,
+            )
+
+        return getattr(self, "async_client", None)
+
+    async def asubmit_prompt(self, prompt, **kwargs) -> str:
+        async_client = self._get_async_client()
+        if async_client is None:
+            return await super().asubmit_prompt(prompt, **kwargs)
+
+        response = await async_client.chat.completions.create(
+            **self._get_model_kwargs(prompt, **kwargs),
+            messages=prompt,
+            stop=None,
+            temperature=self.temperature,
+        )
+
+        return self._get_response_text(response)
+
+    def submit_prompt_stream(self, prompt, **kwargs):
+        response = self.client.chat.completions.create(
+            **self._get_model_kwargs(prompt, **kwargs),
+            messages=prompt,
+            stop=None,
+            temperature=self.temperature,
+            stream=True,
+        )
+
+        for chunk in response:
+            if len(chunk.choices) > 0 and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
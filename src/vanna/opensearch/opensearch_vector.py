@@ -1,6 +1,6 @@
 import base64
 import uuid
-from typing import List
+from typing import List, Tuple
 
 import pandas as pd
 from opensearchpy import OpenSearch
@@ -263,6 +263,40 @@ class OpenSearch_VectorStore(VannaBase):
                                  **kwargs)
     return response['_id']
 
+  def _bulk_index(self, index: str, docs: List[dict], suffix: str,
+                  **kwargs) -> List[str]:
+    ids = [str(uuid.uuid4()) + suffix for _ in docs]
+    if not ids:
+      return ids
+
+    body = []
+    for id, doc in zip(ids, docs):
+      body.append({"index": {"_index": index, "_id": id}})
+      body.append(doc)
+    response = self.client.bulk(body=body, **kwargs)
+    if response.get("errors"):
+      failed = [item["index"] for item in response["items"]
+                if "error" in item["index"]]
+      raise Exception(f"Bulk indexing into {index} failed: {failed[:3]}")
+    return ids
+
+  def add_ddl_batch(self, ddls: List[str], **kwargs) -> List[str]:
+    return self._bulk_index(self.ddl_index, [{"ddl": ddl} for ddl in ddls],
+                            "-ddl", **kwargs)
+
+  def add_documentation_batch(self, documentation: List[str],
+                              **kwargs) -> List[str]:
+    return self._bulk_index(self.document_index,
+                            [{"doc": doc} for doc in documentation], "-doc",
+                            **kwargs)
+
+  def add_question_sql_batch(self, question_sql: List[Tuple[str, str]],
+                             **kwargs) -> List[str]:
+    return self._bulk_index(self.question_sql_index,
+                            [{"question": question, "sql": sql}
+                             for question, sql in question_sql], "-sql",
+                            **kwargs)
+
   def get_related_ddl(self, question: str, **kwargs) -> List[str]:
     # Assume you have some vector search mechanism associated with your data
     query = {
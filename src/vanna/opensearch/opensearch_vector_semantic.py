@@ -82,6 +82,28 @@ class OpenSearch_Semantic_VectorStore(VannaBase):
     self.sql_store.add_texts(texts=[question_sql_json], ids=[_id], **kwargs)
     return _id
 
+  def add_ddl_batch(self, ddls: list, **kwargs) -> list:
+    ids = [deterministic_uuid(ddl) + "-ddl" for ddl in ddls]
+    if ids:
+      self.ddl_store.add_texts(texts=ddls, ids=ids, **kwargs)
+    return ids
+
+  def add_documentation_batch(self, documentation: list, **kwargs) -> list:
+    ids = [deterministic_uuid(doc) + "-doc" for doc in documentation]
+    if ids:
+      self.documentation_store.add_texts(texts=documentation, ids=ids, **kwargs)
+    return ids
+
+  def add_question_sql_batch(self, question_sql: list, **kwargs) -> list:
+    texts = [
+      json.dumps({"question": question, "sql": sql}, ensure_ascii=False)
+      for question, sql in question_sql
+    ]
+    ids = [deterministic_uuid(text) + "-sql" for text in texts]
+    if ids:
+      self.sql_store.add_texts(texts=texts, ids=ids, **kwargs)
+    return ids
+
   def get_related_ddl(self, question: str, **kwargs) -> list:
     documents = self.ddl_store.similarity_search(query=question, k=self.n_results_ddl)
     return [document.page_content for document in documents]
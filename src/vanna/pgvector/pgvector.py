@@ -1,19 +1,94 @@
-import ast
 import json
 import logging
+import threading
 import uuid
+from contextlib import contextmanager
 
 import pandas as pd
 from langchain_core.documents import Document
 from langchain_postgres.vectorstores import PGVector
-from sqlalchemy import create_engine, text
+from sqlalchemy import bindparam, create_engine, event, text
+from sqlalchemy.exc import SQLAlchemyError
 
 from .. import ValidationError
 from ..base import VannaBase
 from ..types import TrainingPlan, TrainingPlanItem
 
+# The search settings of the store whose search_params block this thread is in, as (store, settings)
+_search_settings = threading.local()
+_listen_lock = threading.Lock()
+_SEARCH_SETTINGS = {"ef_search": "hnsw.ef_search", "probes": "ivfflat.probes"}
+
+
+def _apply_search_params(dbapi_connection, connection_record, connection_proxy):
+    # Registered once per engine, so stores sharing an engine don't each add a listener (which would
+    # keep them all alive, and let the last one's settings win). Runs on every checkout: the
+    # connection gets the settings of the search running on this thread, and settings left over from
+    # an earlier checkout are reset.
+    active = getattr(_search_settings, "params", None)
+    settings = active[1] if active is not None else {}
+    previously_set = connection_record.info.get("vanna_search_settings", set())
+
+    statements = []
+    for key, name in _SEARCH_SETTINGS.items():
+        if settings.get(key) is not None:
+            statements.append(f"SET {name} = {int(settings[key])}")
+        elif name in previously_set:
+            statements.append(f"RESET {name}")
+    connection_record.info["vanna_search_settings"] = {
+        name for key, name in _SEARCH_SETTINGS.items() if settings.get(key) is not None
+    }
+    if not statements:
+        return
+
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("; ".join(statements))
+    finally:
+        cursor.close()
+
+
+def _vector_literal(embedding) -> str:
+    # str() of a list of numpy floats is "[np.float64(...), ...]" on numpy 2, which pgvector can't
+    # parse
+    return "[" + ",".join(str(float(value)) for value in embedding) + "]"
+
+
+def _listen_for_search_params(engine) -> None:
+    with _listen_lock:
+        if not event.contains(engine, "checkout", _apply_search_params):
+            event.listen(engine, "checkout", _apply_search_params)
+
 
 class PG_VectorStore(VannaBase):
+    """
+    Vector store backed by Postgres with the pgvector extension, through langchain_postgres.
+
+    By default the embeddings are searched with a sequential scan. Set `index_type` to "hnsw" or
+    "ivfflat" to give every collection its own partial ANN index on
+    `langchain_pg_embedding.embedding`, created on startup. An IVFFlat index without a fixed
+    `index_lists` is rebuilt by `maintain_indexes()` once the collection has grown enough for twice
+    as many lists.
+
+    Config:
+        index_type (str): None, "hnsw" or "ivfflat". Defaults to None.
+        index_m (int): HNSW neighbours per node. Defaults to 16.
+        index_ef_construction (int): HNSW build-time search depth. Defaults to 64.
+        index_lists (int): IVFFlat lists. Defaults to rows / 1000 (at least 1).
+        ef_search (int): `hnsw.ef_search` for the searches of this store. Defaults to the server
+            setting.
+        probes (int): `ivfflat.probes` for the searches of this store. Defaults to the server
+            setting.
+        embedding_dimensions (int): Dimension of the embeddings, needed to index the column.
+            Defaults to the dimension of the stored vectors, or of a probe embedding if the table is
+            empty.
+        alter_embedding_column (bool): Let `create_indexes` alter the `embedding` column to
+            `vector(<embedding_dimensions>)` when it has no dimension. Defaults to False.
+    """
+
+    COLLECTIONS = ("sql", "ddl", "documentation")
+    INDEX_TYPES = ("hnsw", "ivfflat")
+
     def __init__(self, config=None):
         if not config or "connection_string" not in config:
             raise ValueError(
@@ -25,6 +100,13 @@ class PG_VectorStore(VannaBase):
             self.connection_string = config.get("connection_string")
             self.n_results = config.get("n_results", 10)
 
+        # One engine, and so one connection pool, shared by the collections and the training-data
+        # queries
+        self.engine = config.get("engine") or create_engine(
+            self.connection_string, pool_pre_ping=True
+        )
+        self.training_data_page_size = config.get("training_data_page_size", 1000)
+
         if config and "embedding_function" in config:
             self.embedding_function = config.get("embedding_function")
         else:
@@ -34,19 +116,41 @@ class PG_VectorStore(VannaBase):
         self.sql_collection = PGVector(
             embeddings=self.embedding_function,
             collection_name="sql",
-            connection=self.connection_string,
+            connection=self.engine,
         )
         self.ddl_collection = PGVector(
             embeddings=self.embedding_function,
             collection_name="ddl",
-            connection=self.connection_string,
+            connection=self.engine,
         )
         self.documentation_collection = PGVector(
             embeddings=self.embedding_function,
             collection_name="documentation",
-            connection=self.connection_string,
+            connection=self.engine,
         )
 
+        self.index_type = config.get("index_type")
+        if self.index_type is not None and self.index_type not in self.INDEX_TYPES:
+            raise ValueError(
+                f"Unsupported index_type {self.index_type!r}, expected one of {self.INDEX_TYPES}"
+            )
+        self.index_m = config.get("index_m", 16)
+        self.index_ef_construction = config.get("index_ef_construction", 64)
+        self.index_lists = config.get("index_lists")
+        self.embedding_dimensions = config.get("embedding_dimensions")
+        self.ef_search = config.get("ef_search")
+        self.probes = config.get("probes")
+
+        self.alter_embedding_column = config.get("alter_embedding_column", False)
+
+        _listen_for_search_params(self.engine)
+
+        if self.index_type is not None:
+            try:
+                self.create_indexes()
+            except ValidationError as e:
+                self.log(title="pgvector index", message=f"Indexes were not created: {e}")
+
     def add_question_sql(self, question: str, sql: str, **kwargs) -> str:
         question_sql_json = json.dumps(
             {
@@ -83,6 +187,38 @@ class PG_VectorStore(VannaBase):
         self.documentation_collection.add_documents([doc], ids=[doc.metadata["id"]])
         return _id
 
+    def add_question_sql_batch(self, question_sql, **kwargs) -> list:
+        createdat = kwargs.get("createdat")
+        docs = [
+            Document(
+                page_content=json.dumps({"question": question, "sql": sql}, ensure_ascii=False),
+                metadata={"id": str(uuid.uuid4()) + "-sql", "createdat": createdat},
+            )
+            for question, sql in question_sql
+        ]
+        return self._add_documents_batch(self.sql_collection, docs)
+
+    def add_ddl_batch(self, ddls, **kwargs) -> list:
+        docs = [
+            Document(page_content=ddl, metadata={"id": str(uuid.uuid4()) + "-ddl"}) for ddl in ddls
+        ]
+        return self._add_documents_batch(self.ddl_collection, docs)
+
+    def add_documentation_batch(self, documentation, **kwargs) -> list:
+        docs = [
+            Document(page_content=doc, metadata={"id": str(uuid.uuid4()) + "-doc"})
+            for doc in documentation
+        ]
+        return self._add_documents_batch(self.documentation_collection, docs)
+
+    def _add_documents_batch(self, collection, docs) -> list:
+        # PGVector embeds the whole list with one embed_documents call and inserts it in one
+        # transaction
+        ids = [doc.metadata["id"] for doc in docs]
+        if docs:
+            collection.add_documents(docs, ids=ids)
+        return ids
+
     def get_collection(self, collection_name):
         match collection_name:
             case "sql":
@@ -94,18 +230,300 @@ class PG_VectorStore(VannaBase):
             case _:
                 raise ValueError("Specified collection does not exist.")
 
-    def get_similar_question_sql(self, question: str) -> list:
-        documents = self.sql_collection.similarity_search(query=question, k=self.n_results)
-        return [ast.literal_eval(document.page_content) for document in documents]
+    def get_similar_question_sql(self, question: str, **kwargs) -> list:
+        with self.search_params(ef_search=kwargs.get("ef_search"), probes=kwargs.get("probes")):
+            documents = self.sql_collection.similarity_search(query=question, k=self.n_results)
+        return [json.loads(document.page_content) for document in documents]
 
     def get_related_ddl(self, question: str, **kwargs) -> list:
-        documents = self.ddl_collection.similarity_search(query=question, k=self.n_results)
+        with self.search_params(ef_search=kwargs.get("ef_search"), probes=kwargs.get("probes")):
+            documents = self.ddl_collection.similarity_search(query=question, k=self.n_results)
         return [document.page_content for document in documents]
 
     def get_related_documentation(self, question: str, **kwargs) -> list:
-        documents = self.documentation_collection.similarity_search(query=question, k=self.n_results)
+        with self.search_params(ef_search=kwargs.get("ef_search"), probes=kwargs.get("probes")):
+            documents = self.documentation_collection.similarity_search(query=question, k=self.n_results)
         return [document.page_content for document in documents]
 
+    def get_related_context(self, question: str, **kwargs) -> tuple:
+        """
+        Retrieve the similar question/SQL pairs, the related DDL and the related documentation in
+        one round trip: the question is embedded once and the three top-k searches run as one `UNION
+        ALL` statement. Falls back to the three separate searches if the database rejects the
+        combined query.
+        """
+        embedding = self.generate_embedding(question)
+        try:
+            collection_uuids = self._get_collection_uuids()
+
+            subqueries = [
+                f"(SELECT '{collection}' AS collection, document FROM langchain_pg_embedding "
+                f"WHERE collection_id = '{collection_uuids[collection]}' "
+                f"ORDER BY embedding <=> CAST(:embedding AS vector) LIMIT :k)"
+                for collection in self.COLLECTIONS
+                if collection in collection_uuids
+            ]
+            if not subqueries:
+                return [], [], []
+
+            with self.search_params(ef_search=kwargs.get("ef_search"), probes=kwargs.get("probes")):
+                with self.engine.connect() as connection:
+                    rows = connection.execute(
+                        text(" UNION ALL ".join(subqueries)),
+                        {"embedding": _vector_literal(embedding), "k": self.n_results},
+                    ).all()
+        except SQLAlchemyError as e:
+            self.log(
+                title="Retrieval Error",
+                message=f"Combined pgvector lookup failed, using separate lookups: {e}",
+            )
+            return super().get_related_context(question, **kwargs)
+
+        results = {collection: [] for collection in self.COLLECTIONS}
+        for collection, document in rows:
+            results[collection].append(json.loads(document) if collection == "sql" else document)
+        return results["sql"], results["ddl"], results["documentation"]
+
+    def _get_collection_uuids(self) -> dict:
+        # The collections are created once by PGVector and never change uuid
+        if not getattr(self, "_collection_uuid_cache", None):
+            with self.engine.connect() as connection:
+                self._collection_uuid_cache = self._collection_uuids(connection)
+        return self._collection_uuid_cache
+
+    @contextmanager
+    def search_params(self, ef_search: int | None = None, probes: int | None = None):
+        """
+        Override `hnsw.ef_search` / `ivfflat.probes` for the queries this thread runs inside the
+        block.
+
+        **Example:**
+        ```python
+        with vn.search_params(ef_search=200):
+            vn.get_related_ddl("What are the top customers?")
+        ```
+        """
+        previous = getattr(_search_settings, "params", None)
+        if previous is not None and previous[0] is self:
+            settings = previous[1]
+        else:
+            # Entering this store's block starts from its configured settings, not from another
+            # store's
+            settings = {"ef_search": self.ef_search, "probes": self.probes}
+
+        _search_settings.params = (
+            self,
+            {
+                **settings,
+                **{
+                    key: value
+                    for key, value in (("ef_search", ef_search), ("probes", probes))
+                    if value is not None
+                },
+            },
+        )
+        try:
+            yield
+        finally:
+            _search_settings.params = previous
+
+    def _collection_uuids(self, connection) -> dict:
+        rows = connection.execute(
+            text("SELECT name, uuid FROM langchain_pg_collection WHERE name IN :names").bindparams(
+                bindparam("names", expanding=True)
+            ),
+            {"names": list(self.COLLECTIONS)},
+        )
+        return {name: str(collection_uuid) for name, collection_uuid in rows}
+
+    def _embedding_dimensions(self, connection) -> int:
+        if self.embedding_dimensions:
+            return self.embedding_dimensions
+
+        dimensions = connection.execute(
+            text("SELECT vector_dims(embedding) FROM langchain_pg_embedding LIMIT 1")
+        ).scalar()
+        if dimensions is None:
+            dimensions = len(self.embedding_function.embed_query("dimensions"))
+        self.embedding_dimensions = dimensions
+        return dimensions
+
+    @staticmethod
+    def _index_name(collection: str) -> str:
+        return f"vanna_{collection}_embedding_idx"
+
+    def _wanted_lists(self, rows: int) -> int:
+        return self.index_lists or max(1, rows // 1000)
+
+    def create_indexes(self, rebuild: bool = False, alter_column: bool | None = None) -> None:
+        """
+        Create the ANN index of every collection if it doesn't exist yet. Each index is a partial
+        index on the rows of one collection, using cosine distance like the langchain_postgres
+        queries.
+
+        The `embedding` column is created without a dimension by langchain_postgres, and pgvector
+        can only index a column with one. Altering the column to `vector(<embedding_dimensions>)`
+        rewrites the table, so it is only done when asked for; otherwise a column without a
+        dimension raises a ValidationError.
+
+        Args:
+            rebuild (bool): Drop and recreate the indexes, e.g. after changing the index parameters.
+            alter_column (bool): Give the `embedding` column its dimension if it has none. Defaults
+                to the `alter_embedding_column` config.
+        """
+        if alter_column is None:
+            alter_column = self.alter_embedding_column
+        if self.index_type is None:
+            raise ValidationError(
+                "Set index_type to 'hnsw' or 'ivfflat' in the config to create indexes."
+            )
+
+        with self.engine.connect() as connection:
+            with connection.begin():
+                typmod = connection.execute(
+                    text(
+                        "SELECT atttypmod FROM pg_attribute "
+                        "WHERE attrelid = 'langchain_pg_embedding'::regclass "
+                        "AND attname = 'embedding'"
+                    )
+                ).scalar()
+                if typmod is None or typmod < 0:
+                    if not alter_column:
+                        raise ValidationError(
+                            "langchain_pg_embedding.embedding has no dimension, which pgvector "
+                            "needs to index it. Pass alter_column=True (or set "
+                            "alter_embedding_column in the config) to run "
+                            "ALTER TABLE langchain_pg_embedding "
+                            "ALTER COLUMN embedding TYPE vector(<dimensions>)."
+                        )
+                    dimensions = self._embedding_dimensions(connection)
+                    connection.execute(
+                        text(
+                            f"ALTER TABLE langchain_pg_embedding "
+                            f"ALTER COLUMN embedding TYPE vector({int(dimensions)})"
+                        )
+                    )
+
+                for collection, collection_uuid in self._collection_uuids(connection).items():
+                    name = self._index_name(collection)
+                    if rebuild:
+                        connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+                    if self.index_type == "hnsw":
+                        ef_construction = int(self.index_ef_construction)
+                        options = f"m = {int(self.index_m)}, ef_construction = {ef_construction}"
+                    else:
+                        rows = connection.execute(
+                            text(
+                                "SELECT count(*) FROM langchain_pg_embedding "
+                                "WHERE collection_id = :uuid"
+                            ),
+                            {"uuid": collection_uuid},
+                        ).scalar()
+                        options = f"lists = {int(self._wanted_lists(rows))}"
+
+                    # The uuid comes from langchain_pg_collection and is inlined so the index is
+                    # partial on it
+                    connection.execute(
+                        text(
+                            f"CREATE INDEX IF NOT EXISTS {name} ON langchain_pg_embedding "
+                            f"USING {self.index_type} (embedding vector_cosine_ops) "
+                            f"WITH ({options}) WHERE collection_id = '{collection_uuid}'"
+                        )
+                    )
+
+    def maintain_indexes(self) -> list:
+        """
+        Rebuild the IVFFlat indexes whose list count is too small for the current collection size
+        (the lists are computed when the index is built, so they go stale as rows are added), then
+        `ANALYZE` the table.
+
+        Returns:
+            list: The collections whose index was rebuilt.
+        """
+        rebuilt = []
+        stats = self.index_stats()
+        for row in stats.itertuples():
+            if row.index_type != "ivfflat" or self.index_lists is not None or row.lists is None:
+                continue
+            if self._wanted_lists(row.rows) >= 2 * row.lists:
+                with self.engine.connect() as connection:
+                    with connection.begin():
+                        connection.execute(
+                            text(f"DROP INDEX IF EXISTS {self._index_name(row.collection)}")
+                        )
+                rebuilt.append(row.collection)
+
+        if rebuilt:
+            self.create_indexes()
+
+        with self.engine.connect() as connection:
+            with connection.begin():
+                connection.execute(text("ANALYZE langchain_pg_embedding"))
+        return rebuilt
+
+    def index_stats(self) -> pd.DataFrame:
+        """
+        Report the ANN index of every collection: its type, size on disk, the number of rows it
+        covers and its build parameters.
+        """
+        query = text(
+            """
+            SELECT c.name AS collection,
+                   i.indexname AS index_name,
+                   am.amname AS index_type,
+                   pg_relation_size(quote_ident(i.indexname)::regclass) AS size_bytes,
+                   pg_size_pretty(pg_relation_size(quote_ident(i.indexname)::regclass)) AS size,
+                   (SELECT count(*) FROM langchain_pg_embedding e
+                    WHERE e.collection_id = c.uuid) AS rows,
+                   cl.reloptions AS options
+            FROM langchain_pg_collection c
+            JOIN pg_indexes i ON i.indexname = 'vanna_' || c.name || '_embedding_idx'
+            JOIN pg_class cl ON cl.relname = i.indexname
+            JOIN pg_am am ON am.oid = cl.relam
+            WHERE c.name IN :names
+            """
+        ).bindparams(bindparam("names", expanding=True))
+
+        with self.engine.connect() as connection:
+            df = pd.read_sql(query, connection, params={"names": list(self.COLLECTIONS)})
+
+        def lists(options):
+            for option in options or []:
+                key, _, value = option.partition("=")
+                if key == "lists":
+                    return int(value)
+            return None
+
+        df["lists"] = df["options"].map(lists)
+        return df
+
+    def explain(self, question: str, collection: str = "ddl", analyze: bool = False) -> str:
+        """
+        Return the query plan of a similarity search, to check whether it uses the ANN index.
+
+        Args:
+            question (str): The question to embed and search for.
+            collection (str): "sql", "ddl" or "documentation".
+            analyze (bool): Run the query and include actual timings (`EXPLAIN ANALYZE`).
+        """
+        if collection not in self.COLLECTIONS:
+            raise ValueError("Specified collection does not exist.")
+
+        embedding = self.embedding_function.embed_query(question)
+        with self.engine.connect() as connection:
+            collection_uuid = self._collection_uuids(connection)[collection]
+            rows = connection.execute(
+                text(
+                    f"EXPLAIN {'(ANALYZE, BUFFERS) ' if analyze else ''}"
+                    f"SELECT id FROM langchain_pg_embedding "
+                    f"WHERE collection_id = '{collection_uuid}' "
+                    f"ORDER BY embedding <=> CAST(:embedding AS vector) LIMIT :k"
+                ),
+                {"embedding": _vector_literal(embedding), "k": self.n_results},
+            )
+            return "\n".join(row[0] for row in rows)
+
     def train(
         self,
         question: str | None = None,
@@ -130,62 +548,114 @@ class PG_VectorStore(VannaBase):
             return self.add_ddl(ddl)
 
         if plan:
-            for item in plan._plan:
-                if item.item_type == TrainingPlanItem.ITEM_TYPE_DDL:
-                    self.add_ddl(item.item_value)
-                elif item.item_type == TrainingPlanItem.ITEM_TYPE_IS:
-                    self.add_documentation(item.item_value)
-                elif item.item_type == TrainingPlanItem.ITEM_TYPE_SQL and item.item_name:
-                    self.add_question_sql(question=item.item_name, sql=item.item_value)
-
-    def get_training_data(self, **kwargs) -> pd.DataFrame:
-        # Establishing the connection
-        engine = create_engine(self.connection_string)
-
-        # Querying the 'langchain_pg_embedding' table
-        query_embedding = "SELECT cmetadata, document FROM langchain_pg_embedding"
-        df_embedding = pd.read_sql(query_embedding, engine)
-
-        # List to accumulate the processed rows
-        processed_rows = []
-
-        # Process each row in the DataFrame
-        for _, row in df_embedding.iterrows():
-            custom_id = row["cmetadata"]["id"]
-            document = row["document"]
-            training_data_type = "documentation" if custom_id[-3:] == "doc" else custom_id[-3:]
-
-            if training_data_type == "sql":
-                # Convert the document string to a dictionary
-                try:
-                    doc_dict = ast.literal_eval(document)
-                    question = doc_dict.get("question")
-                    content = doc_dict.get("sql")
-                except (ValueError, SyntaxError):
-                    logging.info(f"Skipping row with custom_id {custom_id} due to parsing error.")
-                    continue
-            elif training_data_type in ["documentation", "ddl"]:
-                question = None  # Default value for question
-                content = document
-            else:
-                # If the suffix is not recognized, skip this row
-                logging.info(f"Skipping row with custom_id {custom_id} due to unrecognized training data type.")
-                continue
-
-            # Append the processed data to the list
-            processed_rows.append(
-                {"id": custom_id, "question": question, "content": content, "training_data_type": training_data_type}
+            # Question/SQL items without a question are skipped
+            self._train_plan(TrainingPlan([
+                item for item in plan._plan
+                if item.item_type != TrainingPlanItem.ITEM_TYPE_SQL or item.item_name
+            ]))
+
+    def _training_data_query(self, collections, after=None, limit=None, offset=None):
+        # The id comes out of the jsonb metadata in SQL, and only the requested collections are read
+        query = """
+            SELECT e.id AS row_id, e.cmetadata ->> 'id' AS id, e.document, c.name AS collection
+            FROM langchain_pg_embedding e
+            JOIN langchain_pg_collection c ON e.collection_id = c.uuid
+            WHERE c.name IN :collections
+        """
+        params = {"collections": tuple(collections)}
+        if after is not None:
+            query += " AND e.id > :after"
+            params["after"] = after
+        query += " ORDER BY e.id"
+        if limit is not None:
+            query += " LIMIT :limit"
+            params["limit"] = limit
+        if offset:
+            query += " OFFSET :offset"
+            params["offset"] = offset
+
+        statement = text(query).bindparams(bindparam("collections", expanding=True))
+        with self.engine.connect() as connection:
+            return pd.read_sql(statement, connection, params=params)
+
+    @staticmethod
+    def _parse_training_data(df: pd.DataFrame) -> pd.DataFrame:
+        def loads(document):
+            try:
+                return json.loads(document)
+            except (TypeError, ValueError):
+                return None
+
+        is_sql = df["collection"] == "sql"
+        parsed = df.loc[is_sql, "document"].map(loads)
+        invalid = parsed.isna()
+        if invalid.any():
+            logging.info(
+                f"Skipping {int(invalid.sum())} question/SQL rows that are not valid JSON."
             )
 
-        # Create a DataFrame from the list of processed rows
-        df_processed = pd.DataFrame(processed_rows)
+        sql = parsed[~invalid]
+        df_out = pd.DataFrame(
+            {
+                "id": df["id"],
+                "question": None,
+                "content": df["document"],
+                "training_data_type": df["collection"],
+            }
+        ).drop(index=parsed.index[invalid])
+        df_out.loc[sql.index, "question"] = sql.map(lambda doc: doc.get("question"))
+        df_out.loc[sql.index, "content"] = sql.map(lambda doc: doc.get("sql"))
+        return df_out.reset_index(drop=True)
+
+    def iter_training_data(self, collection: str | None = None, page_size: int | None = None):
+        """
+        Yield the training data as DataFrames of at most `page_size` rows, ordered by id. Pages are
+        read with keyset pagination, so the whole table is never loaded at once.
 
-        return df_processed
+        Args:
+            collection (str): "sql", "ddl" or "documentation". Defaults to all three.
+            page_size (int): Rows per page. Defaults to the `training_data_page_size` config (1000).
+        """
+        collections = [collection] if collection else self.COLLECTIONS
+        page_size = page_size or self.training_data_page_size
+
+        after = None
+        while True:
+            page = self._training_data_query(collections, after=after, limit=page_size)
+            if page.empty:
+                return
+
+            yield self._parse_training_data(page)
+            if len(page) < page_size:
+                return
+            after = page["row_id"].iloc[-1]
+
+    def get_training_data(
+        self, collection: str | None = None, limit: int | None = None, offset: int = 0, **kwargs
+    ) -> pd.DataFrame:
+        """
+        Get the training data, optionally for one collection and one page.
 
-    def remove_training_data(self, id: str, **kwargs) -> bool:
-        # Create the database engine
-        engine = create_engine(self.connection_string)
+        Args:
+            collection (str): "sql", "ddl" or "documentation". Defaults to all three.
+            limit (int): Maximum number of rows. Defaults to all rows.
+            offset (int): Number of rows to skip, ordered by id.
+        """
+        if collection is not None and collection not in self.COLLECTIONS:
+            raise ValueError("Specified collection does not exist.")
 
+        if limit is not None:
+            collections = [collection] if collection else self.COLLECTIONS
+            return self._parse_training_data(
+                self._training_data_query(collections, limit=limit, offset=offset)
+            )
+
+        pages = list(self.iter_training_data(collection=collection))
+        if not pages:
+            return pd.DataFrame(columns=["id", "question", "content", "training_data_type"])
+        return pd.concat(pages, ignore_index=True)
+
+    def remove_training_data(self, id: str, **kwargs) -> bool:
         # SQL DELETE statement
         delete_statement = text(
             """
@@ -195,7 +665,7 @@ class PG_VectorStore(VannaBase):
         )
 
         # Connect to the database and execute the delete statement
-        with engine.connect() as connection:
+        with self.engine.connect() as connection:
             # Start a transaction
             with connection.begin() as transaction:
                 try:
@@ -211,8 +681,6 @@ class PG_VectorStore(VannaBase):
                     return False
 
     def remove_collection(self, collection_name: str) -> bool:
-        engine = create_engine(self.connection_string)
-
         # Determine the suffix to look for based on the collection name
         suffix_map = {"ddl": "ddl", "sql": "sql", "documentation": "doc"}
         suffix = suffix_map.get(collection_name)
@@ -230,7 +698,7 @@ class PG_VectorStore(VannaBase):
         )
 
         # Execute the deletion within a transaction block
-        with engine.connect() as connection:
+        with self.engine.connect() as connection:
             with connection.begin() as transaction:
                 try:
                     result = connection.execute(query)
@@ -249,5 +717,5 @@ class PG_VectorStore(VannaBase):
                     transaction.rollback()  # Rollback in case of error
                     return False
 
-    def generate_embedding(self, *args, **kwargs):
-        pass
+    def generate_embedding(self, data: str, **kwargs) -> list:
+        return self.embedding_function.embed_query(data)
@@ -1,5 +1,5 @@
 import json
-from typing import List
+from typing import List, Tuple
 
 from pinecone import Pinecone, PodSpec, ServerlessSpec
 import pandas as pd
@@ -168,6 +168,57 @@ class PineconeDB_VectorStore(VannaBase):
         )
         return id
 
+    def _upsert_batch(
+        self, namespace: str, ids: List[str], texts: List[str], metadatas: List[dict]
+    ) -> List[str]:
+        if not ids:
+            return ids
+
+        # One fetch for the whole batch instead of one per item
+        existing = set(self.Index.fetch(ids=list(set(ids)), namespace=namespace)["vectors"].keys())
+        new = {
+            id: (text, metadata)
+            for id, text, metadata in zip(ids, texts, metadatas)
+            if id not in existing
+        }
+        if existing:
+            print(
+                f"{len(set(ids) & existing)} items already exist in the {namespace} namespace. "
+                "Skipping..."
+            )
+
+        if new:
+            embeddings = self.generate_embeddings([text for text, _ in new.values()])
+            self.Index.upsert(
+                vectors=[
+                    (id, embedding, metadata)
+                    for (id, (_, metadata)), embedding in zip(new.items(), embeddings)
+                ],
+                namespace=namespace,
+            )
+        return ids
+
+    def add_ddl_batch(self, ddls: List[str], **kwargs) -> List[str]:
+        ids = [deterministic_uuid(ddl) + "-ddl" for ddl in ddls]
+        return self._upsert_batch(self.ddl_namespace, ids, ddls, [{"ddl": ddl} for ddl in ddls])
+
+    def add_documentation_batch(self, documentation: List[str], **kwargs) -> List[str]:
+        ids = [deterministic_uuid(doc) + "-doc" for doc in documentation]
+        return self._upsert_batch(
+            self.documentation_namespace,
+            ids,
+            documentation,
+            [{"documentation": doc} for doc in documentation],
+        )
+
+    def add_question_sql_batch(self, question_sql: List[Tuple[str, str]], **kwargs) -> List[str]:
+        texts = [
+            json.dumps({"question": question, "sql": sql}, ensure_ascii=False)
+            for question, sql in question_sql
+        ]
+        ids = [deterministic_uuid(text) + "-sql" for text in texts]
+        return self._upsert_batch(self.sql_namespace, ids, texts, [{"sql": text} for text in texts])
+
     def get_related_ddl(self, question: str, **kwargs) -> list:
         res = self.Index.query(
             namespace=self.ddl_namespace,
@@ -273,3 +324,7 @@ class PineconeDB_VectorStore(VannaBase):
         embedding_model = TextEmbedding(model_name=self.fastembed_model)
         embedding = next(embedding_model.embed(data))
         return embedding.tolist()
+
+    def generate_embeddings(self, data: List[str], **kwargs) -> List[List[float]]:
+        embedding_model = TextEmbedding(model_name=self.fastembed_model)
+        return [embedding.tolist() for embedding in embedding_model.embed(data)]
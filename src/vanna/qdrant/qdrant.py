@@ -140,6 +140,37 @@ class Qdrant_VectorStore(VannaBase):
 
         return self._format_point_id(id, self.documentation_collection_name)
 
+    def _upsert_batch(
+        self, collection_name: str, texts: List[str], payloads: List[dict]
+    ) -> List[str]:
+        ids = [deterministic_uuid(text) for text in texts]
+        if ids:
+            self._client.upsert(
+                collection_name,
+                points=[
+                    models.PointStruct(id=id, vector=vector, payload=payload)
+                    for id, vector, payload in zip(ids, self.generate_embeddings(texts), payloads)
+                ],
+            )
+        return [self._format_point_id(id, collection_name) for id in ids]
+
+    def add_question_sql_batch(self, question_sql: List[Tuple[str, str]], **kwargs) -> List[str]:
+        return self._upsert_batch(
+            self.sql_collection_name,
+            ["Question: {0}\n\nSQL: {1}".format(question, sql) for question, sql in question_sql],
+            [{"question": question, "sql": sql} for question, sql in question_sql],
+        )
+
+    def add_ddl_batch(self, ddls: List[str], **kwargs) -> List[str]:
+        return self._upsert_batch(self.ddl_collection_name, ddls, [{"ddl": ddl} for ddl in ddls])
+
+    def add_documentation_batch(self, documentation: List[str], **kwargs) -> List[str]:
+        return self._upsert_batch(
+            self.documentation_collection_name,
+            documentation,
+            [{"documentation": doc} for doc in documentation],
+        )
+
     def get_training_data(self, **kwargs) -> pd.DataFrame:
         df = pd.DataFrame()
 
@@ -270,6 +301,12 @@ class Qdrant_VectorStore(VannaBase):
 
         return embedding.tolist()
 
+    def generate_embeddings(self, data: List[str], **kwargs) -> List[List[float]]:
+        embedding_model = self._client._get_or_init_model(
+            model_name=self.fastembed_model
+        )
+        return [embedding.tolist() for embedding in embedding_model.embed(data)]
+
     def _get_all_points(self, collection_name: str):
         results: List[models.Record] = []
         next_offset = None
@@ -189,3 +189,15 @@ class VannaDefault(VannaDB_VectorStore):
       return results.data
     
    
+
+    async def asubmit_prompt(self, prompt, **kwargs) -> str:
+      json_prompt = json.dumps(prompt, ensure_ascii=False)
+
+      d = await self._arpc_call(method="submit_prompt", params=[StringData(data=json_prompt)])
+
+      if "result" not in d:
+          return None
+
+      results = StringData(**d["result"])
+
+      return results.data
@@ -0,0 +1,436 @@
+"""
+Shared HTTP transport for the backends that talk to an HTTP API directly (VannaDB JSON-RPC, vLLM).
+
+Every call goes through one pooled keep-alive session per distinct set of settings, with
+connect/read timeouts, jittered exponential backoff, optional gzip request bodies, HTTP/2 when httpx
+and h2 are installed, and per-endpoint latency histograms.
+
+Connection failures and 429 responses are always retried, since the server never processed the
+request. Read timeouts, dropped connections and 5xx responses are only retried for calls marked
+idempotent: the server may already have acted on the request, and sending a write again could apply
+it twice.
+"""
+import asyncio
+import bisect
+import gzip
+import json
+import random
+import threading
+import time
+import weakref
+from typing import Dict, Iterator, Tuple, Union
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+# Retried for every call
+RETRY_STATUSES = (429,)
+
+# Retried only for idempotent calls
+IDEMPOTENT_RETRY_STATUSES = (500, 502, 503, 504)
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (
+    5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, float("inf")
+)
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram. Quantiles are estimated by interpolating inside the bucket they
+    fall in.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def observe(self, latency_ms: float, error: bool = False) -> None:
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, latency_ms)] += 1
+            self.count += 1
+            self.total_ms += latency_ms
+            self.max_ms = max(self.max_ms, latency_ms)
+            if error:
+                self.errors += 1
+
+    def quantile(self, q: float) -> float:
+        with self._lock:
+            if self.count == 0:
+                return 0.0
+
+            rank, seen = q * self.count, 0
+            for i, count in enumerate(self.counts):
+                if count and seen + count >= rank:
+                    lower = self.buckets[i - 1] if i > 0 else 0.0
+                    upper = min(self.buckets[i], self.max_ms)
+                    return lower + (upper - lower) * (rank - seen) / count
+                seen += count
+            return self.max_ms
+
+    def stats(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "max_ms": self.max_ms,
+            "buckets": {str(bound): count for bound, count in zip(self.buckets, self.counts)},
+        }
+
+
+class HttpTransport:
+    """
+    Pooled keep-alive HTTP client with timeouts, retries and latency histograms.
+
+    Args:
+        connect_timeout (float): Seconds to wait for a connection. Defaults to 10.
+        read_timeout (float): Seconds to wait for the response. Defaults to 300, LLM calls can be
+            slow.
+        retries (int): Retries after a connection error or a 429 response, and for idempotent calls
+            also after a read timeout, a dropped connection or a 5xx response. Defaults to 3.
+        backoff (float): Base of the exponential backoff in seconds; the wait before retry n is
+            drawn uniformly from [0, min(backoff_max, backoff * 2**n)]. A Retry-After header takes
+            precedence. Defaults to 0.5.
+        backoff_max (float): Upper bound of a single wait. Defaults to 30.
+        pool_size (int): Keep-alive connections per host. Defaults to 10.
+        http2 (bool): Use HTTP/2 when httpx and h2 are installed. Defaults to False.
+        gzip_min_bytes (int): Gzip request bodies of at least this many bytes. Defaults to None,
+            which sends bodies uncompressed; only turn it on for servers that accept
+            `Content-Encoding: gzip`.
+    """
+
+    def __init__(
+        self,
+        connect_timeout: float = 10,
+        read_timeout: float = 300,
+        retries: int = 3,
+        backoff: float = 0.5,
+        backoff_max: float = 30,
+        pool_size: int = 10,
+        http2: bool = False,
+        gzip_min_bytes: Union[int, None] = None,
+    ):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.pool_size = pool_size
+        self.gzip_min_bytes = gzip_min_bytes
+
+        self.http2 = http2 and self._http2_available()
+        self._client = None
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _http2_available() -> bool:
+        try:
+            import h2  # noqa: F401
+            import httpx  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    @property
+    def client(self):
+        """
+        The keep-alive client: an httpx.Client when HTTP/2 is on, otherwise a requests.Session.
+        """
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    if self.http2:
+                        import httpx
+
+                        self._client = httpx.Client(
+                            http2=True,
+                            timeout=self._httpx_timeout(),
+                            limits=httpx.Limits(max_keepalive_connections=self.pool_size),
+                        )
+                    else:
+                        session = requests.Session()
+                        adapter = HTTPAdapter(
+                            pool_connections=self.pool_size, pool_maxsize=self.pool_size
+                        )
+                        session.mount("http://", adapter)
+                        session.mount("https://", adapter)
+                        self._client = session
+        return self._client
+
+    def _httpx_timeout(self):
+        import httpx
+
+        return httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
+
+    def _async_client(self):
+        import httpx
+
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            # httpx async clients are bound to the event loop they were first used in
+            client = httpx.AsyncClient(
+                http2=self.http2,
+                timeout=self._httpx_timeout(),
+                limits=httpx.Limits(max_keepalive_connections=self.pool_size),
+            )
+            self._async_clients[loop] = client
+        return client
+
+    def _body(self, headers: dict, data=None, json_body=None) -> Tuple[dict, Union[bytes, None]]:
+        headers = dict(headers or {})
+        if json_body is not None:
+            data = json.dumps(json_body)
+            headers.setdefault("Content-Type", "application/json")
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        if (
+            data is not None
+            and self.gzip_min_bytes is not None
+            and len(data) >= self.gzip_min_bytes
+        ):
+            data = gzip.compress(data)
+            headers["Content-Encoding"] = "gzip"
+        return headers, data
+
+    def _wait(self, attempt: int, response=None) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after is not None:
+            try:
+                return min(self.backoff_max, float(retry_after))
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt))
+
+    def _observe(self, endpoint: str, started: float, error: bool = False) -> None:
+        histogram = self._histograms.get(endpoint)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(endpoint, LatencyHistogram())
+        histogram.observe((time.perf_counter() - started) * 1000, error=error)
+
+    @staticmethod
+    def _endpoint(url: str, endpoint: Union[str, None]) -> str:
+        if endpoint is not None:
+            return endpoint
+        parsed = urlparse(url)
+        return f"{parsed.netloc}{parsed.path}"
+
+    @staticmethod
+    def _connection_errors() -> tuple:
+        errors = (requests.ConnectionError, requests.Timeout)
+        try:
+            import httpx
+        except ImportError:
+            return errors
+        return errors + (httpx.ConnectError, httpx.TimeoutException, httpx.RemoteProtocolError)
+
+    @staticmethod
+    def _not_sent(error: Exception) -> bool:
+        """
+        Whether `error` happened while connecting, before any of the request reached the server.
+        """
+        if isinstance(error, requests.ConnectTimeout):
+            return True
+        if isinstance(error, requests.ConnectionError):
+            # requests wraps a failed connect in a MaxRetryError, and a connection dropped
+            # mid-request in a ProtocolError
+            reason = getattr(error.args[0], "reason", None) if error.args else None
+            return isinstance(reason, NewConnectionError)
+        try:
+            import httpx
+        except ImportError:
+            return False
+        return isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout))
+
+    @staticmethod
+    def _retry_status(status_code: int, idempotent: bool) -> bool:
+        return status_code in RETRY_STATUSES or (
+            idempotent and status_code in IDEMPOTENT_RETRY_STATUSES
+        )
+
+    def _send(self, url, headers, data, stream):
+        if self.http2:
+            request = self.client.build_request("POST", url, headers=headers, content=data)
+            return self.client.send(request, stream=stream)
+        return self.client.post(
+            url,
+            headers=headers,
+            data=data,
+            stream=stream,
+            timeout=(self.connect_timeout, self.read_timeout),
+        )
+
+    def post(
+        self,
+        url: str,
+        headers: dict = None,
+        data=None,
+        json=None,
+        endpoint: str = None,
+        stream: bool = False,
+        idempotent: bool = False,
+    ):
+        """
+        POST with retries. `endpoint` labels the latency histogram, e.g. the JSON-RPC method; it
+        defaults to the host and path of `url`. Pass `idempotent=True` for calls that are safe to
+        send twice, e.g. lookups, to also retry them after a read timeout, a dropped connection or a
+        5xx response.
+
+        Returns:
+            The last response (requests.Response, or httpx.Response with HTTP/2), whatever its
+            status.
+        """
+        endpoint = self._endpoint(url, endpoint)
+        headers, data = self._body(headers, data, json)
+
+        for attempt in range(self.retries + 1):
+            started = time.perf_counter()
+            try:
+                response = self._send(url, headers, data, stream)
+            except self._connection_errors() as error:
+                self._observe(endpoint, started, error=True)
+                if attempt == self.retries or not (idempotent or self._not_sent(error)):
+                    raise
+                time.sleep(self._wait(attempt))
+                continue
+
+            retry = self._retry_status(response.status_code, idempotent) and attempt < self.retries
+            self._observe(endpoint, started, error=response.status_code >= 400)
+            if not retry:
+                return response
+
+            response.close()
+            time.sleep(self._wait(attempt, response))
+
+    async def apost(
+        self,
+        url: str,
+        headers: dict = None,
+        data=None,
+        json=None,
+        endpoint: str = None,
+        idempotent: bool = False,
+    ):
+        """
+        Async variant of `post`, on an httpx.AsyncClient per event loop. Without httpx it runs
+        `post` in a thread.
+        """
+        try:
+            import httpx  # noqa: F401
+        except ImportError:
+            return await asyncio.to_thread(
+                self.post,
+                url,
+                headers=headers,
+                data=data,
+                json=json,
+                endpoint=endpoint,
+                idempotent=idempotent,
+            )
+
+        endpoint = self._endpoint(url, endpoint)
+        headers, data = self._body(headers, data, json)
+        client = self._async_client()
+
+        for attempt in range(self.retries + 1):
+            started = time.perf_counter()
+            try:
+                response = await client.post(url, headers=headers, content=data)
+            except self._connection_errors() as error:
+                self._observe(endpoint, started, error=True)
+                if attempt == self.retries or not (idempotent or self._not_sent(error)):
+                    raise
+                await asyncio.sleep(self._wait(attempt))
+                continue
+
+            retry = self._retry_status(response.status_code, idempotent) and attempt < self.retries
+            self._observe(endpoint, started, error=response.status_code >= 400)
+            if not retry:
+                return response
+
+            await asyncio.sleep(self._wait(attempt, response))
+
+    def stream_lines(
+        self,
+        url: str,
+        headers: dict = None,
+        data=None,
+        json=None,
+        endpoint: str = None,
+        idempotent: bool = False,
+    ) -> Iterator[str]:
+        """
+        POST and yield the decoded lines of the response body as they arrive, e.g. server-sent
+        events.
+        """
+        response = self.post(
+            url,
+            headers=headers,
+            data=data,
+            json=json,
+            endpoint=endpoint,
+            stream=True,
+            idempotent=idempotent,
+        )
+        try:
+            response.raise_for_status()
+            if self.http2:
+                yield from response.iter_lines()
+            else:
+                yield from response.iter_lines(decode_unicode=True)
+        finally:
+            response.close()
+
+    def latency_stats(self) -> Dict[str, dict]:
+        """
+        Latency histogram per endpoint: count, errors, mean, p50/p95/p99 and max in milliseconds,
+        and the bucket counts.
+        """
+        with self._lock:
+            histograms = dict(self._histograms)
+        return {endpoint: histogram.stats() for endpoint, histogram in histograms.items()}
+
+
+_transports: Dict[tuple, HttpTransport] = {}
+_transports_lock = threading.Lock()
+
+
+def transport_from_config(config: Union[dict, None] = None) -> HttpTransport:
+    """
+    The process-wide transport for the `http_*` settings in `config`. Instances with the same
+    settings share one transport, and with it their keep-alive connections and latency histograms.
+
+    Config keys: `http_connect_timeout`, `http_read_timeout`, `http_retries`, `http_backoff`,
+    `http_backoff_max`, `http_pool_size`, `http2`, `http_gzip_min_bytes`.
+    """
+    config = config or {}
+    settings = (
+        ("connect_timeout", config.get("http_connect_timeout", 10)),
+        ("read_timeout", config.get("http_read_timeout", 300)),
+        ("retries", config.get("http_retries", 3)),
+        ("backoff", config.get("http_backoff", 0.5)),
+        ("backoff_max", config.get("http_backoff_max", 30)),
+        ("pool_size", config.get("http_pool_size", 10)),
+        ("http2", config.get("http2", False)),
+        ("gzip_min_bytes", config.get("http_gzip_min_bytes", None)),
+    )
+
+    with _transports_lock:
+        transport = _transports.get(settings)
+        if transport is None:
+            transport = _transports[settings] = HttpTransport(**dict(settings))
+        return transport
@@ -1,8 +1,11 @@
 import hashlib
 import os
 import re
+import threading
+import time
 import uuid
-from typing import Union
+from collections import OrderedDict
+from typing import Any, Union
 
 from .exceptions import ImproperlyConfigured, ValidationError
 
@@ -75,3 +78,78 @@ def deterministic_uuid(content: Union[str, bytes]) -> str:
     content_uuid = str(uuid.uuid5(namespace, hash_hex))
 
     return content_uuid
+
+
+class LRUCache:
+    """Thread-safe in-memory cache with least-recently-used eviction and an optional time-to-live.
+
+    Args:
+        max_size: Maximum number of entries to keep. Defaults to 1024.
+        ttl: Number of seconds after which an entry expires. Defaults to None, which never expires
+            entries.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, max_size: int = 1024, ttl: Union[float, None] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, self._MISSING)
+            if entry is not self._MISSING:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+
+                del self._data[key]
+
+            self.misses += 1
+            return default
+
+    def set(self, key, value) -> None:
+        if self.max_size <= 0:
+            return
+
+        expires_at = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and (entry[1] is None or entry[1] > time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
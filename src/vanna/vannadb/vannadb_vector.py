@@ -1,9 +1,12 @@
+import asyncio
 import dataclasses
 import json
+import threading
+from concurrent.futures import Future
 from io import StringIO
+from typing import Tuple
 
 import pandas as pd
-import requests
 
 from ..advanced import VannaAdvanced
 from ..base import VannaBase
@@ -18,10 +21,17 @@ from ..types import (
   StringData,
   TrainingData,
 )
-from ..utils import sanitize_model_name
+from ..transport import transport_from_config
+from ..utils import LRUCache, sanitize_model_name
 
 
 class VannaDB_VectorStore(VannaBase, VannaAdvanced):
+    # RPC methods that only read, so the transport may send them again after a timeout or a 5xx
+    # response
+    IDEMPOTENT_RPC_METHODS = frozenset(
+        {"list_orgs", "list_my_models", "get_training_data", "get_related_training_data"}
+    )
+
     def __init__(self, vanna_model: str, vanna_api_key: str, config=None):
         VannaBase.__init__(self, config=config)
 
@@ -33,7 +43,18 @@ class VannaDB_VectorStore(VannaBase, VannaAdvanced):
             if config is None or "endpoint" not in config
             else config["endpoint"]
         )
-        self.related_training_data = {}
+        self.transport = transport_from_config(self.config)
+
+        # Related training data per question. Entries expire after related_training_data_cache_ttl
+        # seconds and are dropped whenever this instance adds or removes training data.
+        self.related_training_data = LRUCache(
+            max_size=self.config.get("related_training_data_cache_size", 256),
+            ttl=self.config.get("related_training_data_cache_ttl", 300),
+        )
+        self._related_training_data_lock = threading.Lock()
+        self._related_training_data_inflight = {}
+        self._related_training_data_generation = 0
+        self._related_training_data_coalesced = 0
         self._graphql_endpoint = "https://functionrag.com/query"
         self._graphql_headers = {
             "Content-Type": "application/json",
@@ -41,7 +62,7 @@ class VannaDB_VectorStore(VannaBase, VannaAdvanced):
             "NAMESPACE": self._model,
         }
 
-    def _rpc_call(self, method, params):
+    def _rpc_request(self, method, params):
         if method != "list_orgs":
             headers = {
                 "Content-Type": "application/json",
@@ -60,7 +81,28 @@ class VannaDB_VectorStore(VannaBase, VannaAdvanced):
             "params": [self._dataclass_to_dict(obj) for obj in params],
         }
 
-        response = requests.post(self._endpoint, headers=headers, data=json.dumps(data))
+        return headers, json.dumps(data)
+
+    def _rpc_call(self, method, params):
+        headers, data = self._rpc_request(method, params)
+        response = self.transport.post(
+            self._endpoint,
+            headers=headers,
+            data=data,
+            endpoint=f"rpc:{method}",
+            idempotent=method in self.IDEMPOTENT_RPC_METHODS,
+        )
+        return response.json()
+
+    async def _arpc_call(self, method, params):
+        headers, data = self._rpc_request(method, params)
+        response = await self.transport.apost(
+            self._endpoint,
+            headers=headers,
+            data=data,
+            endpoint=f"rpc:{method}",
+            idempotent=method in self.IDEMPOTENT_RPC_METHODS,
+        )
         return response.json()
 
     def _dataclass_to_dict(self, obj):
@@ -85,7 +127,13 @@ class VannaDB_VectorStore(VannaBase, VannaAdvanced):
             }
         """
 
-        response = requests.post(self._graphql_endpoint, headers=self._graphql_headers, json={'query': query})
+        response = self.transport.post(
+            self._graphql_endpoint,
+            headers=self._graphql_headers,
+            endpoint="graphql",
+            json={'query': query},
+            idempotent=True,
+        )
         response_json = response.json()
         if response.status_code == 200 and 'data' in response_json and 'get_all_sql_functions' in response_json['data']:
             self.log(response_json['data']['get_all_sql_functions'])
@@ -123,7 +171,13 @@ class VannaDB_VectorStore(VannaBase, VannaAdvanced):
         """
         static_function_arguments = [{"name": key, "value": str(value)} for key, value in additional_data.items()]
         variables = {"question": question, "staticFunctionArguments": static_function_arguments}
-        response = requests.post(self._graphql_endpoint, headers=self._graphql_headers, json={'query': query, 'variables': variables})
+        response = self.transport.post(
+            self._graphql_endpoint,
+            headers=self._graphql_headers,
+            endpoint="graphql",
+            json={'query': query, 'variables': variables},
+            idempotent=True,
+        )
         response_json = response.json()
         if response.status_code == 200 and 'data' in response_json and 'get_and_instantiate_function' in response_json['data']:
             self.log(response_json['data']['get_and_instantiate_function'])
@@ -153,7 +207,12 @@ class VannaDB_VectorStore(VannaBase, VannaAdvanced):
         }
         """
         variables = {"question": question, "sql": sql, "plotly_code": plotly_code}
-        response = requests.post(self._graphql_endpoint, headers=self._graphql_headers, json={'query': query, 'variables': variables})
+        response = self.transport.post(
+            self._graphql_endpoint,
+            headers=self._graphql_headers,
+            endpoint="graphql",
+            json={'query': query, 'variables': variables},
+        )
         response_json = response.json()
         if response.status_code == 200 and 'data' in response_json and response_json['data'] is not None and 'generate_and_create_sql_function' in response_json['data']:
             resp = response_json['data']['generate_and_create_sql_function']
@@ -216,7 +275,12 @@ class VannaDB_VectorStore(VannaBase, VannaAdvanced):
 
         print("variables", variables)
 
-        response = requests.post(self._graphql_endpoint, headers=self._graphql_headers, json={'query': mutation, 'variables': variables})
+        response = self.transport.post(
+            self._graphql_endpoint,
+            headers=self._graphql_headers,
+            endpoint="graphql",
+            json={'query': mutation, 'variables': variables},
+        )
         response_json = response.json()
         if response.status_code == 200 and 'data' in response_json and response_json['data'] is not None and 'update_sql_function' in response_json['data']:
             return response_json['data']['update_sql_function']
@@ -230,7 +294,12 @@ class VannaDB_VectorStore(VannaBase, VannaAdvanced):
         }
         """
         variables = {"function_name": function_name}
-        response = requests.post(self._graphql_endpoint, headers=self._graphql_headers, json={'query': mutation, 'variables': variables})
+        response = self.transport.post(
+            self._graphql_endpoint,
+            headers=self._graphql_headers,
+            endpoint="graphql",
+            json={'query': mutation, 'variables': variables},
+        )
         response_json = response.json()
         if response.status_code == 200 and 'data' in response_json and response_json['data'] is not None and 'delete_sql_function' in response_json['data']:
             return response_json['data']['delete_sql_function']
@@ -301,6 +370,9 @@ class VannaDB_VectorStore(VannaBase, VannaAdvanced):
         if "result" not in d:
             raise Exception("Error adding question and SQL pair", d)
 
+        # Question/SQL pairs are part of the related training data too
+        self.clear_related_training_data_cache()
+
         status = StatusWithId(**d["result"])
 
         return status.id
@@ -359,41 +431,117 @@ class VannaDB_VectorStore(VannaBase, VannaAdvanced):
 
         return status.success
 
-    def get_related_training_data_cached(self, question: str) -> TrainingData:
-        params = [Question(question=question)]
+    def _on_training_data_changed(self):
+        super()._on_training_data_changed()
+        self.clear_related_training_data_cache()
 
-        d = self._rpc_call(method="get_related_training_data", params=params)
+    def clear_related_training_data_cache(self) -> None:
+        """
+        Drop the cached related training data, e.g. after the training data was changed from another
+        process.
+        """
+        with self._related_training_data_lock:
+            # Lookups already in flight started before the change, so they must not repopulate the
+            # cache
+            self._related_training_data_generation += 1
+            self.related_training_data.clear()
 
-        if "result" not in d:
-            return None
+    def related_training_data_cache_stats(self) -> dict:
+        """
+        Size, hits, misses, evictions and hit rate of the related training data cache, plus the
+        number of lookups that waited for a concurrent lookup of the same question instead of making
+        their own RPC.
+        """
+        return {
+            **self.related_training_data.stats(),
+            "coalesced": self._related_training_data_coalesced,
+        }
 
-        # Load the result into a dataclass
-        training_data = TrainingData(**d["result"])
+    def _claim_related_training_data(self, question: str):
+        """
+        Single-flight: the first caller missing the cache for `question` becomes the leader and
+        makes the RPC, later callers get the leader's future.
+        """
+        with self._related_training_data_lock:
+            future = self._related_training_data_inflight.get(question)
+            if future is not None:
+                self._related_training_data_coalesced += 1
+                return future, False, None
+
+            future = Future()
+            self._related_training_data_inflight[question] = future
+            return future, True, self._related_training_data_generation
+
+    def _resolve_related_training_data(
+        self, question: str, future: Future, generation: int, d
+    ) -> TrainingData:
+        training_data = TrainingData(**d["result"]) if "result" in d else None
+
+        with self._related_training_data_lock:
+            if training_data is not None and generation == self._related_training_data_generation:
+                self.related_training_data.set(question, training_data)
+            self._related_training_data_inflight.pop(question, None)
+
+        future.set_result(training_data)
+        return training_data
 
-        self.related_training_data[question] = training_data
+    def _abandon_related_training_data(
+        self, question: str, future: Future, error: BaseException
+    ) -> None:
+        with self._related_training_data_lock:
+            self._related_training_data_inflight.pop(question, None)
+        future.set_exception(error)
 
-        return training_data
+    def get_related_training_data_cached(self, question: str) -> TrainingData:
+        training_data = self.related_training_data.get(question)
+        if training_data is not None:
+            return training_data
 
-    def get_similar_question_sql(self, question: str, **kwargs) -> list:
-        if question in self.related_training_data:
-            training_data = self.related_training_data[question]
-        else:
-            training_data = self.get_related_training_data_cached(question)
+        future, leader, generation = self._claim_related_training_data(question)
+        if not leader:
+            return future.result()
 
-        return training_data.questions
+        try:
+            d = self._rpc_call(
+                method="get_related_training_data", params=[Question(question=question)]
+            )
+        except BaseException as e:
+            self._abandon_related_training_data(question, future, e)
+            raise
 
-    def get_related_ddl(self, question: str, **kwargs) -> list:
-        if question in self.related_training_data:
-            training_data = self.related_training_data[question]
-        else:
-            training_data = self.get_related_training_data_cached(question)
+        return self._resolve_related_training_data(question, future, generation, d)
 
-        return training_data.ddl
+    def get_similar_question_sql(self, question: str, **kwargs) -> list:
+        training_data = self.get_related_training_data_cached(question)
+        return training_data.questions if training_data is not None else []
 
-    def get_related_documentation(self, question: str, **kwargs) -> list:
-        if question in self.related_training_data:
-            training_data = self.related_training_data[question]
-        else:
-            training_data = self.get_related_training_data_cached(question)
+    def get_related_ddl(self, question: str, **kwargs) -> list:
+        training_data = self.get_related_training_data_cached(question)
+        return training_data.ddl if training_data is not None else []
 
-        return training_data.documentation
+    def get_related_documentation(self, question: str, **kwargs) -> list:
+        training_data = self.get_related_training_data_cached(question)
+        return training_data.documentation if training_data is not None else []
+
+    async def aget_related_context(self, question: str, **kwargs) -> Tuple[list, list, list]:
+        # The three lookups share one RPC, so a single request covers the whole context
+        training_data = self.related_training_data.get(question)
+        if training_data is None:
+            future, leader, generation = self._claim_related_training_data(question)
+            if not leader:
+                training_data = await asyncio.wrap_future(future)
+            else:
+                try:
+                    d = await self._arpc_call(
+                        method="get_related_training_data", params=[Question(question=question)]
+                    )
+                except BaseException as e:
+                    self._abandon_related_training_data(question, future, e)
+                    raise
+
+                training_data = self._resolve_related_training_data(question, future, generation, d)
+
+        if training_data is None:
+            return [], [], []
+
+        return training_data.questions, training_data.ddl, training_data.documentation
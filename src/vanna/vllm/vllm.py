@@ -1,8 +1,8 @@
+import json
 import re
 
-import requests
-
 from ..base import VannaBase
+from ..transport import transport_from_config
 
 
 class Vllm(VannaBase):
@@ -28,6 +28,12 @@ class Vllm(VannaBase):
             # default temperature - can be overrided using config
             self.temperature = 0.7
 
+        self.transport = transport_from_config(config)
+
+        # A completion has no side effects, but sending it again after a read timeout or a 5xx
+        # response pays for the generation twice, so retrying those is opt-in
+        self.retry_completions = config.get("http_retry_completions", False)
+
     def system_message(self, message: str) -> any:
         return {"role": "system", "content": message}
 
@@ -70,29 +76,61 @@ class Vllm(VannaBase):
 
         return self.extract_sql_query(sql)
 
-    def submit_prompt(self, prompt, **kwargs) -> str:
+    def _get_request(self, prompt, stream: bool = False):
         url = f"{self.host}/v1/chat/completions"
         data = {
             "model": self.model,
             "temperature": self.temperature,
-            "stream": False,
+            "stream": stream,
             "messages": prompt,
         }
 
+        headers = {'Content-Type': 'application/json'}
         if self.auth_key is not None:
-            headers = { 
-            'Content-Type': 'application/json', 
-            'Authorization': f'Bearer {self.auth_key}' 
-            }
+            headers['Authorization'] = f'Bearer {self.auth_key}'
 
-            response = requests.post(url, headers=headers,json=data)
+        return url, headers, data
 
+    def submit_prompt(self, prompt, **kwargs) -> str:
+        url, headers, data = self._get_request(prompt)
+        response = self.transport.post(
+            url, headers=headers, json=data, idempotent=self.retry_completions
+        )
 
-        else:
-            response = requests.post(url, json=data)
+        response_dict = response.json()
+
+        self.log(response.text)
+
+        return response_dict['choices'][0]['message']['content']
+
+    async def asubmit_prompt(self, prompt, **kwargs) -> str:
+        url, headers, data = self._get_request(prompt)
+        response = await self.transport.apost(
+            url, headers=headers, json=data, idempotent=self.retry_completions
+        )
 
         response_dict = response.json()
 
         self.log(response.text)
 
         return response_dict['choices'][0]['message']['content']
+
+    def submit_prompt_stream(self, prompt, **kwargs):
+        url, headers, data = self._get_request(prompt, stream=True)
+
+        # The server sends OpenAI-style server-sent events: "data: {...}" lines ending with "data:
+        # [DONE]"
+        for line in self.transport.stream_lines(
+            url, headers=headers, json=data, idempotent=self.retry_completions
+        ):
+            if not line or not line.startswith("data: "):
+                continue
+
+            payload = line[len("data: "):]
+            if payload.strip() == "[DONE]":
+                break
+
+            choices = json.loads(payload).get("choices") or [{}]
+            content = choices[0].get("delta", {}).get("content")
+            if content:
+                yield content
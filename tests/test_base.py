@@ -0,0 +1,442 @@
+import asyncio
+import time
+
+import pytest
+
+from vanna.base import VannaBase
+
+
+class VannaTest(VannaBase):
+    def __init__(self, config=None):
+        VannaBase.__init__(self, config=config)
+        self.embedding_calls = 0
+        self.prompt_calls = 0
+
+    def generate_embedding(self, data: str, **kwargs) -> list:
+        self.embedding_calls += 1
+        return [float("customers" in data), float("many" in data), float("orders" in data)]
+
+    def get_similar_question_sql(self, question: str, **kwargs) -> list:
+        self.generate_embedding(question)
+        return [{"question": "How many customers?", "sql": "SELECT COUNT(*) FROM customers"}]
+
+    def get_related_ddl(self, question: str, **kwargs) -> list:
+        self.generate_embedding(question)
+        if self.config.get("slow_ddl"):
+            time.sleep(1)
+        return ["CREATE TABLE customers (id INT PRIMARY KEY, name TEXT)"]
+
+    def get_related_documentation(self, question: str, **kwargs) -> list:
+        self.generate_embedding(question)
+        return ["The customers table contains all customers."]
+
+    def add_question_sql(self, question: str, sql: str, **kwargs) -> str:
+        return "1-sql"
+
+    def add_ddl(self, ddl: str, **kwargs) -> str:
+        return "1-ddl"
+
+    def add_documentation(self, documentation: str, **kwargs) -> str:
+        return "1-doc"
+
+    def get_training_data(self, **kwargs):
+        return None
+
+    def remove_training_data(self, id: str, **kwargs) -> bool:
+        return True
+
+    def system_message(self, message: str) -> any:
+        return {"role": "system", "content": message}
+
+    def user_message(self, message: str) -> any:
+        return {"role": "user", "content": message}
+
+    def assistant_message(self, message: str) -> any:
+        return {"role": "assistant", "content": message}
+
+    def submit_prompt(self, prompt, **kwargs) -> str:
+        self.prompt_calls += 1
+        return "SELECT COUNT(*) FROM customers;"
+
+
+def test_sequential_retrieval():
+    vn = VannaTest(config={"embedding_cache": False})
+    question_sql_list, ddl_list, doc_list = vn.get_related_context("How many customers are there?")
+
+    assert len(question_sql_list) == 1
+    assert len(ddl_list) == 1
+    assert len(doc_list) == 1
+    assert vn.embedding_calls == 3
+
+
+def test_parallel_retrieval_embeds_once():
+    vn = VannaTest(config={"parallel_retrieval": True, "embedding_cache": False})
+    question_sql_list, ddl_list, doc_list = vn.get_related_context("How many customers are there?")
+
+    assert len(question_sql_list) == 1
+    assert len(ddl_list) == 1
+    assert len(doc_list) == 1
+    assert vn.embedding_calls == 1
+
+
+def test_parallel_retrieval_timeout_returns_partial_results():
+    vn = VannaTest(config={"parallel_retrieval": True, "slow_ddl": True, "retrieval_timeout_ddl": 0.1})
+    question_sql_list, ddl_list, doc_list = vn.get_related_context("How many customers are there?")
+
+    assert len(question_sql_list) == 1
+    assert ddl_list == []
+    assert len(doc_list) == 1
+    assert vn.generate_sql("How many customers are there?") == "SELECT COUNT(*) FROM customers;"
+
+
+def test_stalled_lookups_dont_hold_up_later_questions():
+    vn = VannaTest(config={"parallel_retrieval": True, "slow_ddl": True, "retrieval_timeout": 0.1})
+
+    start = time.monotonic()
+    for _ in range(8):
+        question_sql_list, ddl_list, doc_list = vn.get_related_context("How many customers are there?")
+        assert ddl_list == []
+        assert len(question_sql_list) == 1 and len(doc_list) == 1
+    assert time.monotonic() - start < 1
+
+
+def test_embedding_cache():
+    vn = VannaTest()
+    vn.get_related_context("How many customers are there?")
+    vn.get_related_context("How many customers are there?")
+
+    assert vn.embedding_calls == 1
+    assert vn.embedding_cache.hits == 5
+    assert vn.embedding_cache.misses == 1
+
+
+def test_embedding_cache_disk_tier(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite")
+    VannaTest(config={"embedding_cache_path": path, "embedding_model": "test-v1"}).generate_embedding("customers")
+
+    vn = VannaTest(config={"embedding_cache_path": path, "embedding_model": "test-v1"})
+    assert vn.generate_embedding("customers") == [1.0, 0.0, 0.0]
+    assert vn.embedding_calls == 0
+    assert vn.embedding_cache.stats()["disk_hits"] == 1
+
+    # Another model doesn't get the vectors of the first one
+    vn = VannaTest(config={"embedding_cache_path": path, "embedding_model": "test-v2"})
+    vn.generate_embedding("customers")
+    assert vn.embedding_calls == 1
+
+
+def test_embedding_cache_disk_tier_requires_model_name(tmp_path):
+    with pytest.raises(ValueError, match="embedding_model"):
+        VannaTest(config={"embedding_cache_path": str(tmp_path / "embeddings.sqlite")})
+
+
+class BatchVannaTest(VannaTest):
+    def __init__(self, config=None):
+        VannaTest.__init__(self, config=config)
+        self.batches = []
+
+    def generate_embeddings(self, data, **kwargs):
+        self.batches.append(list(data))
+        return [[float(len(text))] for text in data]
+
+    def add_ddl_batch(self, ddls, **kwargs):
+        self.generate_embeddings(ddls)
+        return [f"{i}-ddl" for i in range(len(ddls))]
+
+
+def test_train_plan_uses_batches():
+    from vanna.types import TrainingPlan, TrainingPlanItem
+
+    plan = TrainingPlan(
+        [TrainingPlanItem(TrainingPlanItem.ITEM_TYPE_DDL, "db", f"t{i}", f"CREATE TABLE t{i} (id INT)") for i in range(5)]
+        + [TrainingPlanItem(TrainingPlanItem.ITEM_TYPE_SQL, "db", "How many customers?", "SELECT COUNT(*) FROM customers")]
+    )
+    vn = BatchVannaTest(config={"train_batch_size": 2, "embedding_cache": False})
+    assert vn._train_plan(plan) == ["0-ddl", "1-ddl", "0-ddl", "1-ddl", "0-ddl", "1-sql"]
+    assert [len(batch) for batch in vn.batches] == [2, 2, 1]
+
+
+def test_generate_embeddings_only_embeds_cache_misses():
+    vn = BatchVannaTest()
+    vn.generate_embedding("customers")
+    assert vn.generate_embeddings(["customers", "orders"]) == [[1.0, 0.0, 0.0], [6.0]]
+    assert vn.batches == [["orders"]]
+
+    # The default implementation embeds each text through generate_embedding
+    assert VannaTest(config={"embedding_cache": False}).generate_embeddings(["customers", "orders"]) == [
+        [1.0, 0.0, 0.0],
+        [0.0, 0.0, 1.0],
+    ]
+
+
+def test_response_cache_exact_hit_and_invalidation():
+    vn = VannaTest(config={"response_cache": True})
+    vn.generate_sql("How many customers are there?")
+    vn.generate_sql("How  many customers are there? ")
+    assert vn.prompt_calls == 1
+
+    vn.add_ddl("CREATE TABLE orders (id INT PRIMARY KEY, customer_id INT)")
+    vn.generate_sql("How many customers are there?")
+    assert vn.prompt_calls == 2
+
+
+def test_response_cache_semantic_hit():
+    vn = VannaTest(config={"response_cache": True, "response_cache_similarity_threshold": 0.99})
+    vn.generate_sql("How many customers are there?")
+    vn.generate_sql("How many customers do we have?")
+    assert vn.prompt_calls == 1
+    assert vn.response_cache.semantic_hits == 1
+
+    vn.generate_sql("Count the customers")
+    assert vn.prompt_calls == 2
+
+
+def test_stream_falls_back_to_submit_prompt():
+    vn = VannaTest(config={"response_cache": True})
+    chunks = list(vn.generate_sql_stream("How many customers are there?"))
+
+    assert vn.extract_sql("".join(chunks)) == "SELECT COUNT(*) FROM customers;"
+    assert vn.generate_sql("How many customers are there?") == "SELECT COUNT(*) FROM customers;"
+    assert vn.prompt_calls == 1
+
+
+class AsyncVannaTest(VannaTest):
+    async def asubmit_prompt(self, prompt, **kwargs) -> str:
+        self.prompt_calls += 1
+        return "SELECT COUNT(*) FROM customers;"
+
+
+def test_async_api():
+    vn = VannaTest()
+    assert asyncio.run(vn.agenerate_sql("How many customers are there?")) == "SELECT COUNT(*) FROM customers;"
+
+    vn = AsyncVannaTest(config={"response_cache": True})
+
+    async def ask_concurrently():
+        return await asyncio.gather(*[vn.agenerate_sql("How many customers are there?") for _ in range(3)])
+
+    assert asyncio.run(ask_concurrently()) == ["SELECT COUNT(*) FROM customers;"] * 3
+
+    prompt_calls = vn.prompt_calls
+    assert asyncio.run(vn.agenerate_sql("How many customers are there?")) == "SELECT COUNT(*) FROM customers;"
+    assert vn.prompt_calls == prompt_calls
+
+
+class IntermediateVannaTest(VannaTest):
+    def submit_prompt(self, prompt, **kwargs) -> str:
+        self.prompt_calls += 1
+        if "results of the intermediate SQL query" in prompt[0]["content"]:
+            return "SELECT COUNT(*) FROM customers WHERE country = 'NO';"
+        return "-- intermediate_sql\nSELECT DISTINCT country FROM customers;"
+
+    def run_sql(self, sql, **kwargs):
+        import pandas as pd
+
+        return pd.DataFrame({"country": ["NO"]})
+
+
+def test_sync_and_async_intermediate_sql_agree():
+    question = "How many customers are in Norway?"
+    for generate in (
+        lambda vn, **kwargs: vn.generate_sql(question, **kwargs),
+        lambda vn, **kwargs: asyncio.run(vn.agenerate_sql(question, **kwargs)),
+    ):
+        vn = IntermediateVannaTest()
+        assert generate(vn).startswith("The LLM is not allowed to see the data")
+        assert generate(vn, allow_llm_to_see_data=True) == "SELECT COUNT(*) FROM customers WHERE country = 'NO';"
+        assert vn.prompt_calls == 3
+
+
+def test_hybrid_reranker_prefers_keyword_matches():
+    from vanna.base import HybridReranker
+
+    ddl = [
+        "CREATE TABLE products (id INT, name TEXT)",
+        "CREATE TABLE invoices (id INT, total NUMERIC)",
+        "CREATE TABLE customer_orders (id INT, customer_id INT)",
+    ]
+    reranked = HybridReranker(bm25_weight=0.9).rerank("How many orders per customer?", ddl, top_k=2)
+    assert reranked[0] == "CREATE TABLE customer_orders (id INT, customer_id INT)"
+    assert len(reranked) == 2
+
+
+class StoreVannaTest(VannaTest):
+    def __init__(self, config=None):
+        VannaTest.__init__(self, config=config)
+        # Like the vector stores, copy n_results out of the config after VannaBase.__init__
+        self.n_results = self.config.get("n_results", 10)
+        self.n_results_sql = self.config.get("n_results_sql", self.config.get("n_results", 10))
+
+
+def test_reranker_overfetches_without_changing_the_config():
+    config = {"reranker": "hybrid", "rerank_candidates": 30, "n_results_sql": 5}
+    vn = StoreVannaTest(config=config)
+    assert vn.n_results == 10
+
+    vn.generate_sql("How many customers are there?")
+    assert (vn.n_results, vn.n_results_sql) == (30, 5)
+    assert "n_results" not in config
+    assert StoreVannaTest(config=config).n_results == 10
+
+    vn = StoreVannaTest(config={"reranker": "hybrid", "n_results": 3})
+    vn.generate_sql("How many customers are there?")
+    assert vn.n_results == 3
+
+
+def test_reranker_is_built_once(monkeypatch):
+    import vanna.base.base
+    from vanna.base import HybridReranker
+
+    built = []
+
+    class CountingReranker(HybridReranker):
+        def __init__(self):
+            built.append(self)
+            super().__init__()
+
+    class TwoMixinVannaTest(StoreVannaTest):
+        def __init__(self, config=None):
+            StoreVannaTest.__init__(self, config=config)
+            VannaBase.__init__(self, config=config)
+
+    monkeypatch.setattr(vanna.base.base, "HybridReranker", CountingReranker)
+    vn = TwoMixinVannaTest(config={"reranker": "hybrid"})
+    assert built == []
+
+    vn.generate_sql("How many customers are there?")
+    asyncio.run(vn.agenerate_sql("How many customers are there?"))
+    assert len(built) == 1 and vn.reranker is built[0]
+
+
+def test_reranker_trims_context():
+    vn = VannaTest(config={"reranker": "hybrid", "rerank_top_k": 1, "rerank_candidates": 30})
+
+    question_sql_list, ddl_list, doc_list = vn._rerank_context(
+        "How many customers?",
+        [{"question": "Total sales?", "sql": "SELECT SUM(total) FROM invoices"}, {"question": "How many customers?", "sql": "SELECT COUNT(*) FROM customers"}],
+        ["CREATE TABLE customers (id INT)"],
+        [],
+    )
+    assert question_sql_list == [{"question": "How many customers?", "sql": "SELECT COUNT(*) FROM customers"}]
+    assert ddl_list == ["CREATE TABLE customers (id INT)"]
+    assert doc_list == []
+    assert vn.generate_sql("How many customers are there?") == "SELECT COUNT(*) FROM customers;"
+
+
+class WordTokenizer:
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, text):
+        self.calls += 1
+        return text.split()
+
+
+def test_prompt_budget_uses_tokenizer_and_never_overflows():
+    tokenizer = WordTokenizer()
+    vn = VannaTest(config={"tokenizer": tokenizer, "max_tokens": 400})
+    ddl_list = [f"CREATE TABLE t{i} (id INT, name TEXT)" for i in range(100)]
+
+    prompt = vn.get_sql_prompt(
+        initial_prompt=None,
+        question="How many customers are there?",
+        question_sql_list=[{"question": "How many customers?", "sql": "SELECT COUNT(*) FROM customers"}],
+        ddl_list=ddl_list,
+        doc_list=[],
+    )
+    assert sum(len(message["content"].split()) for message in prompt) <= 400
+    assert prompt[1] == {"role": "user", "content": "How many customers?"}
+    assert "CREATE TABLE t0 " in prompt[0]["content"]
+    assert "CREATE TABLE t99 " not in prompt[0]["content"]
+
+    # Every item is tokenized once and then served from the cache
+    calls = tokenizer.calls
+    vn.add_ddl_to_prompt("", ddl_list, max_tokens=400)
+    assert tokenizer.calls == calls
+
+
+def test_prompt_section_budgets():
+    vn = VannaTest(config={"tokenizer": WordTokenizer(), "max_tokens": 400, "prompt_section_budgets": {"ddl": 0.25}})
+    prompt = vn.get_sql_prompt(
+        initial_prompt=None,
+        question="How many customers are there?",
+        question_sql_list=[],
+        ddl_list=[f"CREATE TABLE t{i} (id INT, name TEXT)" for i in range(100)],
+        doc_list=[f"Table t{i} holds things." for i in range(100)],
+    )
+    system = prompt[0]["content"]
+    ddl = system[system.index("===Tables"):system.index("===Additional Context")]
+    assert len(ddl.split()) <= 100
+    assert "Table t0 holds things." in system
+
+
+def test_examples_leave_room_for_ddl():
+    vn = VannaTest(config={"tokenizer": WordTokenizer(), "max_tokens": 400})
+    prompt = vn.get_sql_prompt(
+        initial_prompt=None,
+        question="How many customers are there?",
+        question_sql_list=[{"question": f"Question {i}?", "sql": f"SELECT {i} FROM customers"} for i in range(100)],
+        ddl_list=["CREATE TABLE customers (id INT, name TEXT)"],
+        doc_list=[],
+    )
+    examples = prompt[1:-1]
+    assert "CREATE TABLE customers (id INT, name TEXT)" in prompt[0]["content"]
+    assert 0 < sum(len(message["content"].split()) for message in examples) <= 100
+
+
+def test_token_counter_falls_back_when_tiktoken_cannot_load(monkeypatch):
+    import sys
+    import types
+
+    from vanna.base.token_budget import resolve_token_counter
+
+    def offline(name):
+        raise OSError("Network is unreachable")
+
+    monkeypatch.setitem(sys.modules, "tiktoken", types.SimpleNamespace(get_encoding=offline, encoding_for_model=offline))
+    assert resolve_token_counter(tokenizer="cl100k_base").approximate
+    assert resolve_token_counter(model="gpt-4o").approximate
+    assert VannaTest(config={"model": "gpt-4o"}).str_to_approx_token_count("12345678") == 2
+
+
+def test_compact_ddl():
+    from vanna.base import compact_ddl
+
+    ddl = """
+    CREATE TABLE IF NOT EXISTS "sales"."orders" (
+        id INTEGER NOT NULL,
+        customer_id INT NOT NULL REFERENCES customers(id) ON DELETE CASCADE,
+        total DECIMAL(10, 2) DEFAULT 0.0 NOT NULL,
+        CONSTRAINT orders_pk PRIMARY KEY (id),
+        UNIQUE (total)
+    );
+    """
+    assert compact_ddl(ddl) == "sales.orders(id INTEGER PK, customer_id INT FK->customers.id, total DECIMAL(10, 2))"
+    assert compact_ddl("CREATE VIEW v AS SELECT 1") == "CREATE VIEW v AS SELECT 1"
+
+
+def test_compact_ddl_drops_sql_comments():
+    from vanna.base import compact_ddl
+
+    ddl = "CREATE TABLE t (a int -- note, with a comma\n, b int /* (c, d) */ NOT NULL, -- trailing\n c int -- last\n)"
+    assert compact_ddl(ddl) == "t(a int, b int, c int)"
+
+
+def test_compact_schema_in_sql_prompt():
+    vn = VannaTest(config={"compact_schema": True})
+    prompt = vn.get_sql_prompt(
+        initial_prompt=None,
+        question="How many customers are there?",
+        question_sql_list=[],
+        ddl_list=["CREATE TABLE customers (id INT NOT NULL PRIMARY KEY, name TEXT NOT NULL)"],
+        doc_list=[
+            "The following columns are in the customers table in the shop database:\n\n"
+            "|    | table_catalog   | table_schema   | table_name   | column_name   | data_type   |\n"
+            "|---:|:----------------|:---------------|:-------------|:--------------|:------------|\n"
+            "|  0 | shop            | public         | customers    | id            | integer     |\n"
+            "|  1 | shop            | public         | customers    | name          | text        |"
+        ],
+    )
+    assert "customers(id INT PK, name TEXT)" in prompt[0]["content"]
+    assert "shop.public.customers(id integer, name text)" in prompt[0]["content"]
+    assert len(vn.schema_compactor.cache) == 2
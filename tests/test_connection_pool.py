@@ -0,0 +1,107 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from vanna.base import ConnectionPool
+from vanna.exceptions import ConnectionError
+
+
+def connect():
+    return sqlite3.connect(":memory:", check_same_thread=False)
+
+
+def test_pool_reuses_connections():
+    pool = ConnectionPool(connect, min_size=1, max_size=2)
+
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+
+    assert first is second
+    assert pool.stats()["created"] == 1
+    assert pool.stats()["borrows"] == 2
+
+
+def test_pool_borrow_timeout_and_wait_time():
+    pool = ConnectionPool(connect, min_size=0, max_size=1, timeout=0.1)
+    entry = pool.acquire()
+
+    with pytest.raises(ConnectionError):
+        pool.acquire()
+
+    threading.Timer(0.05, pool.release, args=(entry,)).start()
+    pool.timeout = 1
+    with pool.connection():
+        pass
+
+    stats = pool.stats()
+    assert stats["timeouts"] == 1
+    assert stats["size"] == 1
+    assert stats["wait_time_max"] >= 0.04
+
+
+def test_pool_replaces_unhealthy_and_expired_connections():
+    broken = set()
+
+    def ping(conn):
+        if conn in broken:
+            raise sqlite3.OperationalError("gone")
+
+    pool = ConnectionPool(connect, ping=ping, min_size=1, max_size=1, recycle=None)
+    with pool.connection() as first:
+        broken.add(first)
+    with pool.connection() as second:
+        pass
+
+    assert second is not first
+    assert pool.stats()["health_check_failures"] == 1
+
+    pool.recycle = 0.01
+    time.sleep(0.02)
+    with pool.connection() as third:
+        pass
+
+    assert third is not second
+    assert pool.stats()["closed"] == 2
+
+
+def test_closed_pool_stops_lending_connections():
+    pool = ConnectionPool(connect, min_size=2, max_size=2)
+    entry = pool.acquire()
+
+    pool.close()
+    assert pool.stats()["idle"] == 0
+
+    with pytest.raises(ConnectionError):
+        pool.acquire()
+
+    pool.release(entry)
+    assert pool.stats()["size"] == 0
+    assert pool.stats()["closed"] == 2
+    with pytest.raises(sqlite3.ProgrammingError):
+        entry[0].execute("SELECT 1")
+
+
+def test_close_wakes_waiting_borrowers():
+    pool = ConnectionPool(connect, min_size=0, max_size=1, timeout=5)
+    entry = pool.acquire()
+    errors = []
+
+    def borrow():
+        try:
+            pool.acquire()
+        except ConnectionError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=borrow)
+    thread.start()
+    time.sleep(0.05)
+    pool.close()
+    thread.join(1)
+
+    assert not thread.is_alive()
+    assert len(errors) == 1
+    pool.release(entry)
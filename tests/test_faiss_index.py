@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+faiss = pytest.importorskip("faiss")
+
+from vanna.faiss.benchmark import benchmark_index_types
+from vanna.faiss.faiss import build_index, index_type_of, set_search_params
+
+
+@pytest.mark.parametrize("index_type", ["flat", "hnsw", "ivf_flat", "ivf_pq"])
+def test_build_index_keeps_ids(index_type):
+    rng = np.random.default_rng(0)
+    vectors = rng.random((500, 16), dtype=np.float32)
+    ids = np.arange(1000, 1500, dtype=np.int64)
+
+    index = build_index(16, index_type, vectors, ids=ids, nlist=8, pq_m=4, pq_nbits=6)
+    set_search_params(index, nprobe=8, ef_search=128)
+
+    assert index_type_of(index) == index_type
+    assert index.ntotal == 500
+    _, found = index.search(vectors[:5], 1)
+    assert set(found[:, 0]) <= set(ids)
+
+
+def test_benchmark_reports_recall_against_flat():
+    rng = np.random.default_rng(0)
+    vectors = rng.random((1000, 16), dtype=np.float32)
+
+    df = benchmark_index_types(
+        vectors,
+        vectors[:20],
+        k=5,
+        settings=[{"index_type": "ivf_flat", "nlist": 4, "nprobe": 4}, {"index_type": "hnsw", "ef_search": 256}],
+    )
+
+    assert list(df["index_type"]) == ["flat", "ivf_flat", "hnsw"]
+    # Probing every list is an exhaustive search
+    assert df["recall"].iloc[1] == 1.0
+    assert df["recall"].iloc[2] > 0.9
@@ -0,0 +1,180 @@
+import hashlib
+import os
+import sys
+import types
+
+import numpy as np
+import pytest
+
+faiss = pytest.importorskip("faiss")
+
+DIM = 8
+
+
+class HashEmbeddings:
+    """
+    Deterministic stand-in for a SentenceTransformer, so the store can be tested without downloading a model.
+    """
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+
+    def _encode(self, text):
+        seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:4], "little")
+        return np.random.default_rng(seed).random(DIM, dtype=np.float32)
+
+    def encode(self, data):
+        if isinstance(data, str):
+            return self._encode(data)
+        return np.array([self._encode(text) for text in data])
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    monkeypatch.setitem(sys.modules, "sentence_transformers", types.SimpleNamespace(SentenceTransformer=HashEmbeddings))
+    from vanna.faiss import FAISS
+
+    class FAISSTest(FAISS):
+        def system_message(self, message):
+            return {"role": "system", "content": message}
+
+        def user_message(self, message):
+            return {"role": "user", "content": message}
+
+        def assistant_message(self, message):
+            return {"role": "assistant", "content": message}
+
+        def submit_prompt(self, prompt, **kwargs):
+            return "SELECT 1"
+
+    def make(**config):
+        return FAISSTest(config={"path": str(tmp_path), "embedding_dim": DIM, "n_results": 2, **config})
+
+    return make
+
+
+def test_ids_are_stable_across_removal(store):
+    vn = store(client="in-memory")
+    first = vn.add_ddl("CREATE TABLE customers (id INT)")
+    vn.add_ddl("CREATE TABLE orders (id INT)")
+    vn.add_ddl("CREATE TABLE products (id INT)")
+
+    assert vn.remove_training_data(first)
+    assert not vn.remove_training_data(first)
+
+    assert vn.ddl_index.ntotal == 2
+    assert [metadata["faiss_id"] for metadata in vn.ddl_metadata] == [1, 2]
+    assert set(vn.get_related_ddl("CREATE TABLE orders (id INT)")) == {
+        "CREATE TABLE orders (id INT)",
+        "CREATE TABLE products (id INT)",
+    }
+
+    # Ids are never reused, so a removed id can't point at a new entry
+    vn.add_ddl("CREATE TABLE customers (id INT)")
+    assert vn.ddl_metadata[-1]["faiss_id"] == 3
+    assert vn.get_related_ddl("CREATE TABLE customers (id INT)")[0] == "CREATE TABLE customers (id INT)"
+
+
+def test_search_maps_ids_to_metadata(store):
+    vn = store(client="in-memory")
+    vn.add_question_sql_batch([("How many customers?", "SELECT COUNT(*) FROM customers"), ("Orders?", "SELECT * FROM orders")])
+
+    similar = vn.get_similar_question_sql("How many customers? SELECT COUNT(*) FROM customers")
+    assert similar[0]["question"] == "How many customers?"
+    assert "faiss_id" not in similar[0]
+
+
+def test_prebuilt_indexes_read_metadata_from_path(store):
+    vn = store()
+    vn.add_question_sql("How many customers?", "SELECT COUNT(*) FROM customers")
+    vn.add_ddl("CREATE TABLE customers (id INT)")
+    vn.add_documentation("Customers are people who buy things.")
+    vn.compact()
+
+    prebuilt = [faiss.read_index(os.path.join(vn.path, f"{name}.faiss")) for name in ("sql_index", "ddl_index", "doc_index")]
+    loaded = store(client=prebuilt)
+    assert loaded.get_related_ddl("CREATE TABLE customers (id INT)") == ["CREATE TABLE customers (id INT)"]
+
+
+def test_prebuilt_indexes_without_metadata_are_rejected(store, tmp_path):
+    index = faiss.IndexFlatL2(DIM)
+    index.add(np.zeros((1, DIM), dtype=np.float32))
+
+    with pytest.raises(ValueError, match="metadata"):
+        store(client=[index, faiss.IndexFlatL2(DIM), faiss.IndexFlatL2(DIM)], path=str(tmp_path / "missing"))
+
+
+def test_wal_replay_after_interrupted_writes(store):
+    vn = store()
+    vn.add_ddl("CREATE TABLE customers (id INT)")
+    log_path, vectors_path = vn._wal_paths("ddl")
+
+    # A crash in the middle of the next add: half a vector and half a record made it to disk
+    with open(vectors_path, "ab") as f:
+        f.write(b"\0" * (2 * DIM + 1))
+    with open(log_path, "a") as f:
+        f.write('{"op": "add", "entry": {"id": "lost", "faiss_')
+
+    reloaded = store()
+    assert [metadata["ddl"] for metadata in reloaded.ddl_metadata] == ["CREATE TABLE customers (id INT)"]
+    assert os.path.getsize(vectors_path) == 4 * DIM
+
+    # Later records land on whole-vector offsets and on their own line
+    reloaded.add_ddl("CREATE TABLE orders (id INT)")
+    reloaded = store()
+    assert reloaded.ddl_index.ntotal == 2
+    assert reloaded.get_related_ddl("CREATE TABLE orders (id INT)")[0] == "CREATE TABLE orders (id INT)"
+
+
+def test_wal_appends_after_interrupted_write_in_process(store):
+    vn = store()
+    vn.add_ddl("CREATE TABLE customers (id INT)")
+    log_path, vectors_path = vn._wal_paths("ddl")
+    with open(vectors_path, "ab") as f:
+        f.write(b"\0" * 3)
+
+    vn.add_ddl("CREATE TABLE orders (id INT)")
+
+    reloaded = store()
+    assert reloaded.get_related_ddl("CREATE TABLE orders (id INT)")[0] == "CREATE TABLE orders (id INT)"
+    assert reloaded.get_related_ddl("CREATE TABLE customers (id INT)")[0] == "CREATE TABLE customers (id INT)"
+
+
+def test_wal_compaction(store):
+    vn = store(wal_compact_every=3)
+    log_path, vectors_path = vn._wal_paths("documentation")
+    vn.add_documentation("Customers buy things.")
+    vn.add_documentation("Orders belong to customers.")
+    assert os.path.exists(log_path)
+
+    vn.add_documentation("Products are sold in orders.")
+    assert not os.path.exists(log_path) and not os.path.exists(vectors_path)
+    assert os.path.exists(os.path.join(vn.path, "doc_metadata.jsonl"))
+
+    vn.add_documentation("Refunds reverse orders.")
+    vn.compact()
+    assert not os.path.exists(log_path)
+
+    reloaded = store()
+    assert len(reloaded.doc_metadata) == 4
+    assert reloaded.get_related_documentation("Refunds reverse orders.")[0] == "Refunds reverse orders."
+
+
+def test_wal_remove_and_re_add(store):
+    vn = store()
+    ddl = "CREATE TABLE customers (id INT)"
+    first = vn.add_ddl(ddl)
+    vn.add_ddl("CREATE TABLE orders (id INT)")
+    vn.remove_training_data(first)
+    second = vn.add_ddl(ddl)
+
+    reloaded = store()
+    assert sorted(metadata["id"] for metadata in reloaded.ddl_metadata) == sorted(
+        metadata["id"] for metadata in vn.ddl_metadata
+    )
+    assert first not in {metadata["id"] for metadata in reloaded.ddl_metadata}
+    assert reloaded.ddl_index.ntotal == 2
+    assert reloaded.get_similar_question_sql("anything") == []
+    assert reloaded.get_related_ddl(ddl)[0] == ddl
+    assert reloaded.remove_training_data(second)
+    assert store().get_related_ddl(ddl) == ["CREATE TABLE orders (id INT)"]
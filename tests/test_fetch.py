@@ -0,0 +1,113 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from vanna.base import VannaBase
+from vanna.base.fetch import fetch_df, iter_fetch
+
+
+class VannaTest(VannaBase):
+    """
+    Only run_sql is exercised here, so the LLM and vector store methods are left empty.
+    """
+
+    def generate_embedding(self, data, **kwargs):
+        return []
+
+    def get_similar_question_sql(self, question, **kwargs):
+        return []
+
+    def get_related_ddl(self, question, **kwargs):
+        return []
+
+    def get_related_documentation(self, question, **kwargs):
+        return []
+
+    def add_question_sql(self, question, sql, **kwargs):
+        return ""
+
+    def add_ddl(self, ddl, **kwargs):
+        return ""
+
+    def add_documentation(self, documentation, **kwargs):
+        return ""
+
+    def get_training_data(self, **kwargs):
+        return pd.DataFrame()
+
+    def remove_training_data(self, id, **kwargs):
+        return False
+
+    def system_message(self, message):
+        return {"role": "system", "content": message}
+
+    def user_message(self, message):
+        return {"role": "user", "content": message}
+
+    def assistant_message(self, message):
+        return {"role": "assistant", "content": message}
+
+    def submit_prompt(self, prompt, **kwargs):
+        return ""
+
+
+def make_cursor(rows):
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE t (id INTEGER, name TEXT)")
+    conn.executemany("INSERT INTO t VALUES (?, ?)", [(i, f"name-{i}") for i in range(rows)])
+    return conn.execute("SELECT id, name FROM t ORDER BY id")
+
+
+def test_fetch_df_in_chunks():
+    chunks = list(iter_fetch(make_cursor(25), chunk_size=10))
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+
+    df = fetch_df(make_cursor(25), chunk_size=10)
+    assert list(df.columns) == ["id", "name"]
+    assert df["id"].tolist() == list(range(25))
+
+
+def test_fetch_df_empty_result_keeps_columns():
+    df = fetch_df(make_cursor(0))
+    assert df.empty
+    assert list(df.columns) == ["id", "name"]
+
+
+def test_duckdb_arrow_fetch():
+    pytest.importorskip("duckdb")
+    pytest.importorskip("pyarrow")
+
+    vn = VannaTest(config={"arrow_fetch": True})
+    vn.connect_to_duckdb(":memory:")
+    df = vn.run_sql("SELECT range AS id FROM range(5)")
+
+    assert df["id"].tolist() == list(range(5))
+    assert isinstance(df["id"].dtype, pd.ArrowDtype)
+
+
+def test_duckdb_run_sql_stream():
+    pytest.importorskip("duckdb")
+
+    vn = VannaTest(config={"fetch_chunk_size": 2})
+    vn.connect_to_duckdb(":memory:")
+
+    chunks = list(vn.run_sql_stream("SELECT range AS id FROM range(5)"))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+
+    chunks = list(vn.run_sql_stream("SELECT range AS id FROM range(5)", max_rows=3))
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+
+    assert vn.run_sql("SELECT range AS id FROM range(5)", max_rows=3)["id"].tolist() == [0, 1, 2]
+
+
+def test_run_sql_stream_falls_back_to_one_chunk(tmp_path):
+    path = str(tmp_path / "test.sqlite")
+    sqlite3.connect(path).close()
+
+    vn = VannaTest()
+    vn.connect_to_sqlite(path)
+
+    chunks = list(vn.run_sql_stream("SELECT 1 AS id UNION ALL SELECT 2", max_rows=1))
+    assert len(chunks) == 1
+    assert chunks[0]["id"].tolist() == [1]
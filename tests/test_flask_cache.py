@@ -0,0 +1,138 @@
+import time
+
+import pandas as pd
+import pytest
+
+from vanna.flask import BoundedMemoryCache, RedisCache, SQLiteCache
+
+
+def test_bounded_cache_lru_eviction():
+    cache = BoundedMemoryCache(max_entries=2)
+    cache.set(id="a", field="question", value="a")
+    cache.set(id="b", field="question", value="b")
+    cache.get(id="a", field="question")
+    cache.set(id="c", field="question", value="c")
+
+    assert cache.get(id="b", field="question") is None
+    assert cache.get(id="a", field="question") == "a"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_bounded_cache_byte_budget_and_ttl():
+    df = pd.DataFrame({"name": [f"customer-{i}" for i in range(1000)]})
+    size = int(df.memory_usage(deep=True).sum())
+
+    cache = BoundedMemoryCache(max_bytes=int(size * 1.5), ttl=0.05, spill_threshold=None)
+    cache.set(id="a", field="df", value=df)
+    cache.set(id="b", field="df", value=df)
+
+    assert cache.get(id="a", field="df") is None
+    assert cache.stats()["bytes"] == size
+
+    time.sleep(0.1)
+    assert cache.get(id="b", field="df") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_bounded_cache_spills_large_dataframes(tmp_path):
+    pytest.importorskip("pyarrow")
+
+    df = pd.DataFrame({"id": range(1000), "name": [f"customer-{i}" for i in range(1000)]})
+    cache = BoundedMemoryCache(spill_threshold=1024, spill_dir=str(tmp_path))
+    cache.set(id="a", field="df", value=df)
+
+    assert cache.stats()["bytes"] == 0
+    assert cache.stats()["spills"] == 1
+    assert len(list(tmp_path.iterdir())) == 1
+    pd.testing.assert_frame_equal(cache.get(id="a", field="df"), df)
+
+    cache.delete(id="a")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_bounded_cache_spill_byte_limit(tmp_path):
+    pytest.importorskip("pyarrow")
+
+    df = pd.DataFrame({"id": range(1000), "name": [f"customer-{i}" for i in range(1000)]})
+    cache = BoundedMemoryCache(spill_threshold=1024, spill_dir=str(tmp_path))
+    cache.set(id="a", field="df", value=df)
+    file_size = cache.stats()["spill_file_bytes"]
+
+    cache = BoundedMemoryCache(spill_threshold=1024, spill_dir=str(tmp_path / "limited"), max_spill_bytes=int(file_size * 2.5))
+    for id in ("a", "b", "c"):
+        cache.set(id=id, field="df", value=df)
+
+    assert cache.get(id="a", field="df") is None
+    assert cache.stats()["spill_file_bytes"] == 2 * file_size
+    assert len(list((tmp_path / "limited").iterdir())) == 2
+    assert cache.stats()["evictions"] == 1
+
+    # A DataFrame whose file alone is over the limit stays in memory
+    cache = BoundedMemoryCache(spill_threshold=1024, spill_dir=str(tmp_path / "tiny"), max_spill_bytes=file_size - 1)
+    cache.set(id="a", field="df", value=df)
+    assert cache.stats()["spills"] == 0
+    assert cache.stats()["bytes"] > 0
+    assert list((tmp_path / "tiny").iterdir()) == []
+
+
+def test_bounded_cache_keeps_frames_arrow_cannot_spill(tmp_path):
+    pytest.importorskip("pyarrow")
+
+    df = pd.DataFrame([[i, f"customer-{i}"] for i in range(1000)], columns=["id", "id"])
+    cache = BoundedMemoryCache(spill_threshold=1024, spill_dir=str(tmp_path))
+    cache.set(id="a", field="df", value=df)
+
+    assert cache.stats()["spills"] == 0
+    assert cache.stats()["bytes"] > 0
+    pd.testing.assert_frame_equal(cache.get(id="a", field="df"), df)
+
+
+def test_sqlite_cache_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    df = pd.DataFrame({"id": [1, 2], "name": ["a", "b"]})
+
+    writer = SQLiteCache(path)
+    writer.set(id="a", field="question", value="How many customers?")
+    writer.set(id="a", field="df", value=df)
+    writer.set(id="a", field="df_truncated", value=False)
+
+    reader = SQLiteCache(path)
+    assert reader.get(id="a", field="question") == "How many customers?"
+    assert reader.get(id="a", field="df_truncated") is False
+    pd.testing.assert_frame_equal(reader.get(id="a", field="df"), df)
+    assert reader.get_all(["question"]) == [{"id": "a", "question": "How many customers?"}]
+
+    reader.delete(id="a")
+    assert writer.get(id="a", field="question") is None
+
+
+@pytest.mark.parametrize(
+    "df",
+    [
+        pd.DataFrame([[1, 2], [3, 4]], columns=["id", "id"]),
+        pd.DataFrame({"value": [1, "two", 3.5]}),
+    ],
+    ids=["duplicate-columns", "mixed-types"],
+)
+def test_sqlite_cache_stores_frames_arrow_cannot(tmp_path, df):
+    pytest.importorskip("pyarrow")
+
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite"))
+    cache.set(id="a", field="df", value=df)
+    pd.testing.assert_frame_equal(cache.get(id="a", field="df"), df)
+
+
+def test_redis_cache():
+    fakeredis = pytest.importorskip("fakeredis")
+
+    cache = RedisCache(client=fakeredis.FakeRedis())
+    df = pd.DataFrame({"id": [1, 2], "name": ["a", "b"]})
+    cache.set(id="a", field="question", value="How many customers?")
+    cache.set(id="a", field="df", value=df)
+    cache.set(id="b", field="question", value="How many orders?")
+
+    pd.testing.assert_frame_equal(cache.get(id="a", field="df"), df)
+    assert [item["id"] for item in cache.get_all(["question"])] == ["a", "b"]
+
+    cache.client.delete("vanna:a")
+    assert cache.get_all(["question"]) == [{"id": "b", "question": "How many orders?"}]
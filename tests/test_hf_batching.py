@@ -0,0 +1,72 @@
+import threading
+
+import pytest
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+from vanna.hf.batching import GenerationBatcher
+
+
+class TinyTokenizer:
+    pad_token_id = None
+    eos_token_id = 0
+
+
+@pytest.fixture(scope="module")
+def tiny_model():
+    torch.manual_seed(0)
+    config = transformers.GPT2Config(vocab_size=64, n_positions=64, n_embd=16, n_layer=1, n_head=2)
+    return transformers.GPT2LMHeadModel(config).eval()
+
+
+def test_batched_generation_matches_single_requests(tiny_model):
+    prompts = [[5, 6, 7], [8, 9], [10, 11, 12, 13], [14]]
+    generate_kwargs = dict(max_new_tokens=5, do_sample=False, eos_token_id=None)
+
+    expected = []
+    for prompt in prompts:
+        output = tiny_model.generate(torch.tensor([prompt]), pad_token_id=0, **generate_kwargs)
+        completion = output[0, len(prompt):].tolist()
+        while completion and completion[-1] == TinyTokenizer.eos_token_id:
+            completion.pop()
+        expected.append(completion)
+
+    batcher = GenerationBatcher(tiny_model, TinyTokenizer(), max_batch_size=4, max_wait_ms=200)
+    results = [None] * len(prompts)
+
+    def run(i):
+        results[i] = batcher.generate(prompts[i], **generate_kwargs)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(prompts))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == expected
+    stats = batcher.stats()
+    assert stats["requests"] == 4
+    assert stats["batches"] < 4
+    assert stats["generated_tokens"] == sum(len(result) for result in expected)
+
+
+class ChatTokenizer:
+    def apply_chat_template(self, prompt, add_generation_prompt=True, return_tensors="pt"):
+        return torch.tensor([[len(message["content"]) % 64 for message in prompt]])
+
+    def decode(self, ids, **kwargs):
+        return "".join(f"{id} " for id in ids)
+
+
+def test_stream_chat_yields_the_completion(tiny_model):
+    from vanna.hf.streaming import stream_chat
+
+    tokenizer = ChatTokenizer()
+    prompt = [{"role": "system", "content": "CREATE TABLE t (id INT)"}, {"role": "user", "content": "How many?"}]
+    generate_kwargs = dict(max_new_tokens=5, do_sample=False, pad_token_id=0)
+
+    input_ids = tokenizer.apply_chat_template(prompt)
+    expected = tiny_model.generate(input_ids, **generate_kwargs)[0, input_ids.shape[-1]:].tolist()
+
+    assert "".join(stream_chat(tiny_model, tokenizer, prompt, **generate_kwargs)) == tokenizer.decode(expected)
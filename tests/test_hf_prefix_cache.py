@@ -0,0 +1,92 @@
+import pytest
+
+from vanna.hf.prefix_cache import PrefixKVCache, split_chat
+from vanna.utils import LRUCache
+
+
+class FakeTensor:
+    def __init__(self, nbytes):
+        self.nbytes = nbytes
+
+    def element_size(self):
+        return 1
+
+    def numel(self):
+        return self.nbytes
+
+
+class ChatTokenizer:
+    """
+    Renders each message as `<role>content</role>` and encodes one id per character.
+    """
+
+    def __init__(self):
+        self.encoded = []
+
+    def apply_chat_template(self, messages, tokenize=False, add_generation_prompt=False):
+        text = "".join(f"<{m['role']}>{m['content']}</{m['role']}>" for m in messages)
+        return text + ("<assistant>" if add_generation_prompt else "")
+
+    def encode(self, text, add_special_tokens=False):
+        self.encoded.append(text)
+        return [ord(c) for c in text]
+
+
+def test_split_chat_prefix_is_the_system_message():
+    tokenizer, token_cache = ChatTokenizer(), LRUCache(max_size=4)
+    system = {"role": "system", "content": "CREATE TABLE customers (id INT)"}
+
+    for example in ("How many?", "Total sales?"):
+        prompt = [
+            system,
+            {"role": "user", "content": example},
+            {"role": "assistant", "content": "SELECT 1"},
+            {"role": "user", "content": "Which customers?"},
+        ]
+        prefix_ids, suffix_ids = split_chat(tokenizer, prompt, token_cache)
+        full = tokenizer.apply_chat_template(prompt, add_generation_prompt=True)
+        assert "".join(map(chr, prefix_ids)) == "<system>CREATE TABLE customers (id INT)</system>"
+        assert "".join(map(chr, prefix_ids + suffix_ids)) == full
+
+    # The example pairs differ between the prompts, the system message is encoded once
+    assert tokenizer.encoded.count("<system>CREATE TABLE customers (id INT)</system>") == 1
+
+
+def test_split_chat_without_system_message():
+    prompt = [{"role": "user", "content": "How many?"}, {"role": "user", "content": "Which customers?"}]
+    prefix_ids, suffix_ids = split_chat(ChatTokenizer(), prompt)
+    assert prefix_ids == []
+    assert "".join(map(chr, suffix_ids)) == "<user>How many?</user><user>Which customers?</user><assistant>"
+
+
+def test_prefix_cache_is_bounded_by_memory():
+    cache = PrefixKVCache(max_bytes=250)
+    cache.set([1, 2, 3], ((FakeTensor(50), FakeTensor(50)),))
+    cache.set([4, 5, 6], ((FakeTensor(50), FakeTensor(50)),))
+    assert cache.get([1, 2, 3]) is not None
+
+    cache.set([7, 8, 9], ((FakeTensor(50), FakeTensor(50)),))
+    assert cache.get([4, 5, 6]) is None
+    assert cache.get([1, 2, 3]) is not None
+    assert cache.stats()["bytes"] == 200
+    assert cache.stats()["evictions"] == 1
+
+
+def test_prefix_cache_generation_matches_full_prefill():
+    torch = pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+
+    torch.manual_seed(0)
+    config = transformers.GPT2Config(vocab_size=64, n_positions=128, n_embd=16, n_layer=1, n_head=2)
+    model = transformers.GPT2LMHeadModel(config).eval()
+
+    prefix_ids = list(range(1, 41))
+    generate_kwargs = dict(max_new_tokens=5, do_sample=False, pad_token_id=0)
+
+    expected = model.generate(torch.tensor([prefix_ids + [41, 42]]), **generate_kwargs)[0, 42:].tolist()
+
+    cache = PrefixKVCache(min_prefix_tokens=8)
+    assert cache.generate(model, prefix_ids, [41, 42], **generate_kwargs) == expected
+    assert cache.generate(model, prefix_ids, [41, 42], **generate_kwargs) == expected
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["reused_tokens"] == 40
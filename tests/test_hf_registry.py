@@ -0,0 +1,40 @@
+from types import SimpleNamespace
+
+import vanna.hf.registry as registry
+from vanna.hf.registry import ModelRegistry
+
+
+class Loader:
+    def __init__(self, loads, kind):
+        self.loads = loads
+        self.kind = kind
+
+    def from_pretrained(self, model_name_or_path, **kwargs):
+        self.loads.append((self.kind, model_name_or_path, kwargs))
+        return SimpleNamespace(name=model_name_or_path, pad_token_id=None, eos_token_id=0)
+
+
+def test_models_load_lazily_and_are_shared(monkeypatch):
+    loads = []
+    fake_transformers = SimpleNamespace(
+        AutoTokenizer=Loader(loads, "tokenizer"), AutoModelForCausalLM=Loader(loads, "model")
+    )
+    monkeypatch.setattr(registry, "_transformers", lambda: fake_transformers)
+
+    models = ModelRegistry()
+    first = models.get("tiny-model", use_safetensors=True)
+    second = models.get("tiny-model", use_safetensors=True)
+    assert first is second
+    assert models.get("tiny-model") is not first
+    assert loads == []
+    assert models.loaded() == []
+
+    first.warmup()
+    assert second.model is first.model
+    assert [kind for kind, _, _ in loads] == ["tokenizer", "model"]
+    assert loads[1][2]["use_safetensors"] is True
+    assert loads[1][2]["low_cpu_mem_usage"] is True
+    assert models.loaded() == ["tiny-model"]
+
+    models.unload("tiny-model")
+    assert models.loaded() == []
@@ -0,0 +1,60 @@
+import time
+
+import pytest
+
+pytest.importorskip("transformers")
+
+from vanna.hf.streaming import stream_chat
+
+
+class Ids(list):
+    @property
+    def shape(self):
+        return (len(self),)
+
+    def tolist(self):
+        return list(self)
+
+    def to(self, device):
+        return self
+
+
+class Tokenizer:
+    def apply_chat_template(self, prompt, add_generation_prompt=True, return_tensors="pt"):
+        return Ids([1, 2])
+
+    def decode(self, ids, **kwargs):
+        return "".join(f"{id} " for id in ids)
+
+
+class FailingModel:
+    device = "cpu"
+
+    def generate(self, input_ids, streamer, **kwargs):
+        streamer.put(input_ids)
+        streamer.put(Ids([3]))
+        streamer.put(Ids([4]))
+        raise RuntimeError("CUDA out of memory")
+
+
+class StalledModel:
+    device = "cpu"
+
+    def generate(self, input_ids, streamer, **kwargs):
+        time.sleep(2)
+
+
+PROMPT = [{"role": "user", "content": "How many customers?"}]
+
+
+def test_stream_chat_reraises_generate_errors():
+    chunks = []
+    with pytest.raises(RuntimeError, match="out of memory"):
+        for chunk in stream_chat(FailingModel(), Tokenizer(), PROMPT):
+            chunks.append(chunk)
+    assert "".join(chunks) == "3 4 "
+
+
+def test_stream_chat_times_out():
+    with pytest.raises(TimeoutError):
+        list(stream_chat(StalledModel(), Tokenizer(), PROMPT, timeout=0.1))
@@ -0,0 +1,16 @@
+import pytest
+
+pytest.importorskip("sentencepiece")
+pytest.importorskip("langchain_postgres")
+
+from vanna.modelo_amb.vector_store import CONNECTION_STRING_ENV, amb_config
+
+
+def test_amb_config_needs_a_connection_string(monkeypatch):
+    monkeypatch.delenv(CONNECTION_STRING_ENV, raising=False)
+    with pytest.raises(ValueError, match=CONNECTION_STRING_ENV):
+        amb_config()
+
+    monkeypatch.setenv(CONNECTION_STRING_ENV, "postgresql://localhost/amb")
+    assert amb_config({"n_results": 5}) == {"n_results": 5, "connection_string": "postgresql://localhost/amb"}
+    assert amb_config({"connection_string": "postgresql://db/other"})["connection_string"] == "postgresql://db/other"
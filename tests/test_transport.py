@@ -0,0 +1,127 @@
+import gzip
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from vanna.transport import HttpTransport, LatencyHistogram, transport_from_config
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    failures = 0
+    status = 503
+    delay = 0
+    connections = set()
+
+    def do_POST(self):
+        Handler.connections.add(self.client_address)
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+
+        if Handler.failures:
+            Handler.failures -= 1
+            time.sleep(Handler.delay)
+            self._reply(Handler.status, {"error": "busy"})
+        else:
+            self._reply(200, {"result": json.loads(body)})
+
+    def _reply(self, status, payload):
+        content = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}/rpc"
+    httpd.shutdown()
+    Handler.failures, Handler.status, Handler.delay = 0, 503, 0
+
+
+def test_retries_keep_alive_and_gzip(server):
+    Handler.failures, Handler.connections = 2, set()
+    transport = HttpTransport(retries=3, backoff=0.01, gzip_min_bytes=10)
+
+    response = transport.post(server, json={"question": "How many customers?"}, endpoint="rpc:test", idempotent=True)
+    assert response.status_code == 200
+    assert response.json() == {"result": {"question": "How many customers?"}}
+
+    transport.post(server, json={"question": "Total sales?"}, endpoint="rpc:test")
+    assert len(Handler.connections) == 1
+
+    stats = transport.latency_stats()["rpc:test"]
+    assert stats["count"] == 4
+    assert stats["errors"] == 2
+
+
+def test_retries_give_up_with_last_response(server):
+    Handler.failures = 5
+    response = HttpTransport(retries=1, backoff=0.01).post(server, json={}, idempotent=True)
+    assert response.status_code == 503
+
+
+def test_5xx_is_not_retried_unless_idempotent(server):
+    Handler.failures = 1
+    transport = HttpTransport(retries=3, backoff=0.01)
+    assert transport.post(server, json={}, endpoint="rpc:write").status_code == 503
+    assert transport.latency_stats()["rpc:write"]["count"] == 1
+
+
+def test_429_is_always_retried(server):
+    Handler.failures, Handler.status = 2, 429
+    transport = HttpTransport(retries=3, backoff=0.01)
+    assert transport.post(server, json={}, endpoint="rpc:write").status_code == 200
+    assert transport.latency_stats()["rpc:write"]["count"] == 3
+
+
+def test_read_timeouts_are_only_retried_when_idempotent(server):
+    transport = HttpTransport(retries=1, backoff=0.01, read_timeout=0.1)
+
+    Handler.failures, Handler.delay = 1, 0.5
+    with pytest.raises(requests.Timeout):
+        transport.post(server, json={}, endpoint="rpc:write")
+    assert transport.latency_stats()["rpc:write"]["count"] == 1
+
+    Handler.failures = 1
+    assert transport.post(server, json={}, endpoint="rpc:read", idempotent=True).status_code == 200
+    assert transport.latency_stats()["rpc:read"]["count"] == 2
+
+
+def test_connect_errors_are_always_retried():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    transport = HttpTransport(retries=2, backoff=0.01, connect_timeout=1)
+    with pytest.raises(requests.ConnectionError):
+        transport.post(f"http://127.0.0.1:{port}/rpc", json={}, endpoint="rpc:write")
+    assert transport.latency_stats()["rpc:write"]["count"] == 3
+
+
+def test_latency_histogram_quantiles():
+    histogram = LatencyHistogram()
+    for latency in range(1, 101):
+        histogram.observe(latency)
+
+    assert 40 <= histogram.quantile(0.5) <= 60
+    assert histogram.stats()["max_ms"] == 100
+
+
+def test_transport_shared_per_settings():
+    assert transport_from_config({"http_retries": 2}) is transport_from_config({"http_retries": 2})
+    assert transport_from_config({"http_retries": 2}) is not transport_from_config({})
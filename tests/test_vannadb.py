@@ -0,0 +1,75 @@
+import asyncio
+import threading
+import time
+
+from vanna.vannadb.vannadb_vector import VannaDB_VectorStore
+
+RELATED = {
+    "questions": [{"question": "How many customers?", "sql": "SELECT COUNT(*) FROM customers"}],
+    "ddl": ["CREATE TABLE customers (id INT)"],
+    "documentation": [],
+}
+
+
+class VannaDBTest(VannaDB_VectorStore):
+    def __init__(self, config=None):
+        VannaDB_VectorStore.__init__(self, vanna_model="test", vanna_api_key="key", config=config)
+        self.rpc_calls = []
+
+    def _rpc_call(self, method, params):
+        self.rpc_calls.append(method)
+        if method == "get_related_training_data":
+            time.sleep(0.2)
+            return {"result": RELATED}
+        return {"result": {"success": True, "message": "", "id": "1-ddl"}}
+
+    async def _arpc_call(self, method, params):
+        return await asyncio.to_thread(self._rpc_call, method, params)
+
+    def system_message(self, message: str) -> any:
+        return {"role": "system", "content": message}
+
+    def user_message(self, message: str) -> any:
+        return {"role": "user", "content": message}
+
+    def assistant_message(self, message: str) -> any:
+        return {"role": "assistant", "content": message}
+
+    def submit_prompt(self, prompt, **kwargs) -> str:
+        return "SELECT COUNT(*) FROM customers;"
+
+
+def test_related_training_data_single_flight():
+    vn = VannaDBTest()
+    threads = [threading.Thread(target=vn.get_related_ddl, args=("How many customers?",)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    async def ask_concurrently():
+        return await asyncio.gather(*[vn.aget_related_context("Total sales?") for _ in range(3)])
+
+    asyncio.run(ask_concurrently())
+
+    assert vn.rpc_calls == ["get_related_training_data"] * 2
+    assert vn.related_training_data_cache_stats()["coalesced"] == 6
+
+    assert vn.get_similar_question_sql("How many customers?") == RELATED["questions"]
+    assert vn.related_training_data_cache_stats()["hits"] == 1
+
+
+def test_related_training_data_invalidation_and_bounds():
+    vn = VannaDBTest(config={"related_training_data_cache_size": 1, "related_training_data_cache_ttl": 0.5})
+    vn.get_related_ddl("How many customers?")
+    vn.add_ddl("CREATE TABLE orders (id INT)")
+    vn.get_related_ddl("How many customers?")
+    assert vn.rpc_calls.count("get_related_training_data") == 2
+
+    vn.get_related_ddl("Total sales?")
+    assert len(vn.related_training_data) == 1
+    assert vn.related_training_data_cache_stats()["evictions"] == 1
+
+    time.sleep(0.5)
+    vn.get_related_ddl("Total sales?")
+    assert vn.rpc_calls.count("get_related_training_data") == 4